@@ -5,12 +5,16 @@ from datetime import datetime
 class AIJob(BaseModel):
     id: str = Field(alias="_id")
     user_id: str
-    status: str
+    status: str  # PENDING -> PROCESSING -> COMPLETED / FAILED
     job_type: str
     query: Optional[str] = None
     video_ids: Optional[List[str]] = []
     source_video_ids: Optional[List[str]] = []
+    progress: int = 0  # percent
+    stage: Optional[str] = None
+    error: Optional[str] = None
     created_at: datetime
+    started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
     
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.auth.routes import get_current_user
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.auth.routes import get_current_user, get_request_context
+from app.auth.context import RequestContext
 from app.ai_insights.service import AIService
+from app.analytics.service import AnalyticsService
 from app.ai_insights.models import AIJob, CommentAnalysisRequest, ChatRequest
 
 router = APIRouter()
 service = AIService()
+analytics_service = AnalyticsService()
 
 @router.get("/available-queries")
 async def get_available_queries():
@@ -35,29 +39,19 @@ async def get_available_queries():
     }
 
 @router.get("/available-videos")
-async def get_available_videos(current_user: dict = Depends(get_current_user)):
-    """Get list of videos available for AI analysis"""
-    from app.db.mongo import get_database
-    from app.creators.service import CreatorService
-    
-    creator_service = CreatorService()
-    creator = await creator_service.get_creator_by_user_id(current_user["_id"])
-    
-    if not creator:
-        return {"videos": []}
-    
-    db = await get_database()
-    # Get social accounts for this creator
-    social_accounts = await db.social_accounts.find({"creator_id": creator["_id"]}).to_list(length=10)
-    
-    if not social_accounts:
-        return {"videos": []}
-    
-    account_ids = [acc["_id"] for acc in social_accounts]
-    
-    # Get videos
-    videos = await db.videos.find({"social_account_id": {"$in": account_ids}}).to_list(length=50)
-    
+async def get_available_videos(
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    context: RequestContext = Depends(get_request_context)
+):
+    """Get list of videos available for AI analysis, newest first"""
+    creator_id = await context.creator_id()
+    if not creator_id:
+        return {"videos": [], "next_cursor": None}
+
+    page = await analytics_service.get_creator_videos(
+        creator_id, "recent", limit, cursor, {"title": 1, "views": 1, "published_at": 1}
+    )
     return {
         "videos": [
             {
@@ -66,8 +60,9 @@ async def get_available_videos(current_user: dict = Depends(get_current_user)):
                 "views": v.get("views", 0),
                 "published_at": v.get("published_at").isoformat() if v.get("published_at") else None
             }
-            for v in videos
-        ]
+            for v in page["items"]
+        ],
+        "next_cursor": page["next_cursor"]
     }
 
 @router.post("/comment-analysis", response_model=AIJob)
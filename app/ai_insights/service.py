@@ -1,33 +1,130 @@
 from app.db.mongo import get_database
 from app.ai_insights.models import CommentAnalysisRequest
+from app.config.settings import settings
+from app.utils.http import http_client
+from app.utils.metrics import metrics
+from fastapi import HTTPException
+from redis import Redis
+from rq import Queue
+import asyncio
 import uuid
 from datetime import datetime
 import random
 
+# Placeholder until comments are stored/fetched per video
+MOCK_COMMENTS = ["Great video!", "I love this content.", "Please make more tutorials."]
+
+
 class AIService:
+    def __init__(self, queue: Queue = None):
+        # Tests can pass a Queue on fakeredis; otherwise ai_jobs on REDIS_URL
+        self._queue = queue
+
+    def queue(self) -> Queue:
+        if self._queue is None:
+            self._queue = Queue("ai_jobs", connection=Redis.from_url(settings.REDIS_URL))
+        return self._queue
+
     async def create_comment_analysis_job(self, user_id: str, request: CommentAnalysisRequest):
-        """Create AI analysis job and process it immediately (mock)"""
+        """Store a PENDING job and hand it to the RQ worker (queue: ai_jobs)"""
+        from app.workers.ai_worker import process_ai_job
+
         db = await get_database()
-        
         job_id = str(uuid.uuid4())
-        
-        # Create job record
         job = {
             "_id": job_id,
             "user_id": user_id,
-            "status": "COMPLETED",  # Complete immediately since it's mock
+            "status": "PENDING",
             "job_type": "COMMENT_ANALYSIS",
             "query": request.query,
             "video_ids": request.video_ids,
-            "source_video_ids": request.video_ids,  # Add this
+            "source_video_ids": request.video_ids,
+            "progress": 0,
+            "stage": "queued",
             "created_at": datetime.utcnow(),
-            "completed_at": datetime.utcnow(),
-            "result": self._generate_mock_result(request.query)
+            "completed_at": None,
+            "result": None
         }
-        
         await db.ai_jobs.insert_one(job)
+
+        try:
+            await asyncio.to_thread(
+                self.queue().enqueue, process_ai_job, job_id,
+                job_id=job_id, job_timeout=settings.AI_JOB_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            print(f"Could not enqueue AI job {job_id}: {e}")
+            await db.ai_jobs.update_one(
+                {"_id": job_id},
+                {"$set": {"status": "FAILED", "stage": "failed", "error": "Could not queue the job"}}
+            )
+            raise HTTPException(status_code=503, detail="Analysis queue unavailable, try again later")
+        metrics.inc("ai.jobs.enqueued")
         return job
-    
+
+    async def run_comment_analysis(self, job_id: str):
+        """Process a queued comment analysis job, recording progress as it goes"""
+        db = await get_database()
+        job = await db.ai_jobs.find_one({"_id": job_id})
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job["status"] == "COMPLETED":
+            return job
+
+        await self._progress(db, job_id, "collecting_comments", 0,
+                             status="PROCESSING", started_at=datetime.utcnow())
+        try:
+            video_ids = job.get("video_ids") or []
+            videos = {}
+            if video_ids:
+                async for video in db.videos.find({"_id": {"$in": video_ids}}, {"title": 1, "comments_count": 1}):
+                    videos[video["_id"]] = video
+
+            comments = []
+            for done, video_id in enumerate(video_ids, 1):
+                if video_id in videos:
+                    comments.extend(MOCK_COMMENTS)
+                # Collecting is the first half of the job
+                await self._progress(db, job_id, "collecting_comments", 50 * done // len(video_ids))
+            if not video_ids:
+                comments = list(MOCK_COMMENTS)
+
+            await self._progress(db, job_id, "analyzing", 60)
+            result = await self._analyze(job.get("query"), comments)
+            result["videos_analyzed"] = len(videos)
+            result["comments_analyzed"] = len(comments)
+
+            await self._progress(db, job_id, "completed", 100, status="COMPLETED",
+                                 result=result, completed_at=datetime.utcnow())
+            metrics.inc("ai.jobs.completed")
+        except Exception as e:
+            # Progress stays where it stopped
+            await db.ai_jobs.update_one(
+                {"_id": job_id},
+                {"$set": {"status": "FAILED", "stage": "failed", "error": str(e)}}
+            )
+            metrics.inc("ai.jobs.failed")
+            raise
+        return await db.ai_jobs.find_one({"_id": job_id})
+
+    async def _progress(self, db, job_id: str, stage: str, progress: int, **fields):
+        await db.ai_jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"stage": stage, "progress": progress, **fields}}
+        )
+
+    async def _analyze(self, query: str, comments: list) -> dict:
+        """GPU worker inference, or the mock result until GPU_WORKER_URL is configured"""
+        if not settings.GPU_WORKER_URL:
+            return self._generate_mock_result(query)
+        response = await http_client.post(
+            f"{settings.GPU_WORKER_URL}/run",
+            json={"model": "sentiment", "input": comments},
+            retry=True  # inference is a pure function of the input
+        )
+        response.raise_for_status()
+        return response.json()
+
     def _generate_mock_result(self, query: str):
         """Generate mock AI analysis results"""
         return {
@@ -61,7 +158,6 @@ class AIService:
         job = await db.ai_jobs.find_one({"_id": job_id})
         
         if not job:
-            from fastapi import HTTPException
             raise HTTPException(status_code=404, detail="Job not found")
         
         return job
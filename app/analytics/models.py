@@ -15,6 +15,62 @@ class ChannelSnapshot(BaseModel):
     class Config:
         populate_by_name = True
 
+class SnapshotGrowth(ChannelSnapshot):
+    """A snapshot with its change from the previous day and trailing averages"""
+    subscriber_change: Optional[int] = None
+    subscriber_growth_rate: Optional[float] = None  # % vs previous snapshot
+    views_growth_rate: Optional[float] = None
+    views_ma_7: Optional[float] = None
+    views_ma_30: Optional[float] = None
+    revenue_ma_7: Optional[float] = None
+    revenue_ma_30: Optional[float] = None
+
+class GrowthTotals(BaseModel):
+    snapshots: int
+    views: int
+    watch_time: int
+    estimated_revenue: float
+    engagement_rate: Optional[float] = None
+    subscribers: Optional[int] = None
+    subscriber_change: Optional[int] = None
+    subscriber_growth_rate: Optional[float] = None
+
+class AccountGrowth(BaseModel):
+    id: str = Field(alias="_id")
+    platform: str
+    external_channel_id: str
+    totals: GrowthTotals
+    snapshots: List[SnapshotGrowth]
+
+    class Config:
+        populate_by_name = True
+
+class CreatorGrowth(BaseModel):
+    creator_id: str
+    accounts: List[AccountGrowth]
+
+class SnapshotPoint(BaseModel):
+    """One period of a creator's snapshot series, summed over their accounts"""
+    period_start: datetime
+    count: int
+    subscribers_open: int
+    subscribers_close: int
+    subscribers_max: int
+    views: int
+    watch_time: int
+    estimated_revenue: float
+    engagement_rate: float  # mean over the period's snapshots
+
+class SnapshotSeries(BaseModel):
+    creator_id: str
+    granularity: str
+    start: datetime = Field(alias="from")
+    end: datetime = Field(alias="to")
+    points: List[SnapshotPoint]
+
+    class Config:
+        populate_by_name = True
+
 class Video(BaseModel):
     id: str = Field(alias="_id")
     social_account_id: str
@@ -25,6 +81,12 @@ class Video(BaseModel):
     likes: int
     comments_count: int
     shares: int
+    like_rate: Optional[float] = None  # likes / views
+    comment_rate: Optional[float] = None  # comments / views
     
     class Config:
         populate_by_name = True
+
+class VideoBatch(BaseModel):
+    items: List[Video]
+    missing: List[str]  # requested ids that don't exist
@@ -0,0 +1,219 @@
+"""
+Daily, weekly and monthly rollups of channel_snapshots.
+
+Raw snapshots stay in channel_snapshots. Each one is also folded into three
+documents in channel_snapshot_rollups (one per granularity), keyed by
+account + granularity + period start, so a long-range chart reads one
+document per period instead of every raw row (five years monthly = 60 docs
+per account).
+
+record_snapshot() keeps the rollups current as snapshots arrive (a day's
+snapshot is overwritten by later syncs that day): each write
+recomputes the three period documents it falls in from the raw rows, then
+marks the snapshot rolled_up. A crash in between leaves it unmarked, and
+roll_up_pending() (or writing the snapshot again) finishes the job.
+rebuild_rollups() recomputes everything from the raw collection with one
+aggregation ($merge), for the first deploy or after a repair:
+
+    python -m app.analytics.rollups [--account ACCOUNT_ID] [--pending]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+GRANULARITIES = ("day", "week", "month")
+DUPLICATE_KEY = 11000
+
+# Summed per period; subscribers is a level, so rollups keep its open/close/max
+ADDITIVE_FIELDS = ("views", "watch_time", "estimated_revenue", "engagement_rate")
+
+
+def period_start(date: datetime, granularity: str) -> datetime:
+    """Start of the period containing date; matches $dateTrunc (weeks start on Monday)"""
+    day = datetime(date.year, date.month, date.day)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown granularity {granularity}")
+
+
+def rollup_id(account_id: str, granularity: str, start: datetime) -> str:
+    return f"{account_id}:{granularity}:{start:%Y-%m-%d}"
+
+
+def period_end(start: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def summarize_period(snapshots: list, granularity: str) -> dict:
+    """A period document from that period's raw snapshots (oldest first)"""
+    first, last = snapshots[0], snapshots[-1]
+    return {
+        "social_account_id": first["social_account_id"],
+        "granularity": granularity,
+        "period_start": period_start(first["date"], granularity),
+        "count": len(snapshots),
+        **{field: sum(s.get(field, 0) for s in snapshots) for field in ADDITIVE_FIELDS},
+        "subscribers_open": first.get("subscribers", 0),
+        "subscribers_close": last.get("subscribers", 0),
+        "subscribers_max": max(s.get("subscribers", 0) for s in snapshots),
+        "first_date": first["date"],
+        "last_date": last["date"],
+        # Only grows as the period's snapshots are written, so an older summary never overwrites a newer one
+        "source_revision": sum(s.get("revision", 0) for s in snapshots),
+    }
+
+
+async def roll_up(database, account_id: str, date: datetime):
+    """
+    Recompute the day, week and month documents containing date from the raw
+    snapshots (at most ~37 rows), then mark that day's snapshot rolled up.
+    Idempotent, so a crash anywhere is repaired by running it again.
+    """
+    periods = {g: period_start(date, g) for g in GRANULARITIES}
+    low = min(periods.values())
+    high = max(period_end(start, g) for g, start in periods.items())
+    rows = await database.channel_snapshots.find(
+        {"social_account_id": account_id, "date": {"$gte": low, "$lt": high}},
+        {"_id": 1, "social_account_id": 1, "date": 1, "subscribers": 1, "revision": 1, **{f: 1 for f in ADDITIVE_FIELDS}}
+    ).sort("date", 1).to_list(length=None)
+    target = next((row for row in rows if row["date"] == date), None)
+    if target is None:
+        return
+
+    operations = []
+    for granularity, start in periods.items():
+        end = period_end(start, granularity)
+        summary = summarize_period([row for row in rows if start <= row["date"] < end], granularity)
+        operations.append(UpdateOne(
+            {"_id": rollup_id(account_id, granularity, start), "$or": [
+                {"source_revision": {"$lt": summary["source_revision"]}},
+                {"source_revision": {"$exists": False}},
+            ]},
+            {"$set": summary},
+            upsert=True
+        ))
+    try:
+        await database.channel_snapshot_rollups.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # A duplicate key means that period already holds a summary at least this new
+        if any(err.get("code") != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+            raise
+
+    # Not if the snapshot changed meanwhile; that write rolls it up again
+    await database.channel_snapshots.update_one(
+        {"_id": target["_id"], "revision": target.get("revision")}, {"$set": {"rolled_up": True}}
+    )
+
+
+async def record_snapshot(database, snapshot: dict) -> bool:
+    """
+    Store an account's snapshot for a date, replacing that day's values if it
+    already has one (a later sync the same day), and fold it into every rollup
+    tier. Returns False if the stored values were already these.
+    """
+    key = {"social_account_id": snapshot["social_account_id"], "date": snapshot["date"]}
+    values = {k: v for k, v in snapshot.items() if k != "_id"}
+    update = {
+        "$set": {**values, "rolled_up": False, "updated_at": datetime.utcnow()},
+        "$setOnInsert": {"_id": snapshot["_id"]},
+        "$inc": {"revision": 1},
+    }
+    try:
+        before = await database.channel_snapshots.find_one_and_update(key, update, upsert=True)
+    except DuplicateKeyError:
+        # Lost an insert race on the unique (account, date) index; the document exists now
+        before = await database.channel_snapshots.find_one_and_update(key, update, upsert=True)
+    await roll_up(database, snapshot["social_account_id"], snapshot["date"])
+    return before is None or any(before.get(k) != v for k, v in values.items())
+
+
+async def roll_up_pending(database, older_than: timedelta = timedelta(minutes=5)) -> int:
+    """Roll up snapshots left unmarked by a crash between the write and its rollup"""
+    cutoff = datetime.utcnow() - older_than
+    pending = database.channel_snapshots.find(
+        {"rolled_up": False, "updated_at": {"$lt": cutoff}}, {"social_account_id": 1, "date": 1}
+    )
+    count = 0
+    async for snapshot in pending:
+        await roll_up(database, snapshot["social_account_id"], snapshot["date"])
+        count += 1
+    return count
+
+
+async def rebuild_rollups(database, account_ids: Optional[list] = None):
+    """Recompute rollups from channel_snapshots (idempotent: period documents are replaced)"""
+    match = {"social_account_id": {"$in": account_ids}} if account_ids else {}
+    for granularity in GRANULARITIES:
+        trunc = {"date": "$date", "unit": granularity}
+        if granularity == "week":
+            trunc["startOfWeek"] = "monday"
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"social_account_id": 1, "date": 1}},
+            {"$group": {
+                "_id": {"account": "$social_account_id", "start": {"$dateTrunc": trunc}},
+                "count": {"$sum": 1},
+                **{field: {"$sum": f"${field}"} for field in ADDITIVE_FIELDS},
+                "subscribers_open": {"$first": "$subscribers"},
+                "subscribers_close": {"$last": "$subscribers"},
+                "subscribers_max": {"$max": "$subscribers"},
+                "first_date": {"$min": "$date"},
+                "last_date": {"$max": "$date"},
+                "source_revision": {"$sum": {"$ifNull": ["$revision", 0]}},
+            }},
+            {"$set": {
+                "social_account_id": "$_id.account",
+                "granularity": granularity,
+                "period_start": "$_id.start",
+                "_id": {"$concat": [
+                    "$_id.account", f":{granularity}:",
+                    {"$dateToString": {"date": "$_id.start", "format": "%Y-%m-%d"}}
+                ]}
+            }},
+            {"$merge": {"into": "channel_snapshot_rollups", "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ]
+        await database.channel_snapshots.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+
+
+def pick_granularity(start: datetime, end: datetime, max_points: int) -> str:
+    """Finest tier that keeps a chart under max_points points"""
+    days = max((end - start).days, 1)
+    if days <= max_points:
+        return "day"
+    if days / 7 <= max_points:
+        return "week"
+    return "month"
+
+
+async def _main(account: Optional[str], pending: bool):
+    from app.db.mongo import db
+
+    db.connect()
+    try:
+        if pending:
+            print(f"Rolled up {await roll_up_pending(db.db)} pending snapshots.")
+            return
+        await rebuild_rollups(db.db, [account] if account else None)
+        count = await db.db.channel_snapshot_rollups.count_documents({})
+    finally:
+        db.close()
+    print(f"Rollups rebuilt ({count} period documents).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild channel snapshot rollups from raw snapshots")
+    parser.add_argument("--account", help="Only this social account")
+    parser.add_argument("--pending", action="store_true", help="Only roll up snapshots a crash left unmarked")
+    args = parser.parse_args()
+    asyncio.run(_main(args.account, args.pending))
@@ -1,16 +1,56 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
 from app.auth.routes import get_current_user
 from app.analytics.service import AnalyticsService
-from app.analytics.models import ChannelSnapshot, Video
-from typing import List
+from app.analytics.models import CreatorGrowth, SnapshotGrowth, SnapshotSeries, Video, VideoBatch
+from app.utils.fields import Fields, FieldSelector
+from app.utils.pagination import Page
+from typing import List, Optional
 
 router = APIRouter()
 service = AnalyticsService()
+video_fields = FieldSelector(Video)
 
-@router.get("/creator/{creator_id}", response_model=List[ChannelSnapshot])
+@router.get("/creator/{creator_id}", response_model=List[SnapshotGrowth])
 async def get_creator_analytics(creator_id: str, current_user: dict = Depends(get_current_user)):
     return await service.get_creator_analytics(creator_id)
 
+@router.get("/creator/{creator_id}/growth", response_model=CreatorGrowth)
+async def get_creator_growth(creator_id: str, current_user: dict = Depends(get_current_user)):
+    return await service.get_creator_growth(creator_id)
+
+@router.get("/creator/{creator_id}/snapshots", response_model=SnapshotSeries)
+async def get_snapshot_series(
+    creator_id: str,
+    start: Optional[datetime] = Query(None, alias="from", description="Defaults to 30 days before `to`"),
+    end: Optional[datetime] = Query(None, alias="to", description="Defaults to now"),
+    granularity: str = Query("auto", description="auto, day, week or month"),
+    current_user: dict = Depends(get_current_user)
+):
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    return await service.get_snapshot_series(creator_id, start, end, granularity)
+
+@router.get("/creator/{creator_id}/top-videos", response_model=Page[Video])
+async def get_top_videos(
+    creator_id: str,
+    sort_by: str = Query("views", description="views, like_rate or comment_rate"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Fields = Depends(video_fields),
+    current_user: dict = Depends(get_current_user)
+):
+    return fields.page(await service.get_creator_videos(creator_id, sort_by, limit, cursor, fields.projection))
+
+@router.get("/videos", response_model=VideoBatch)
+async def get_videos(
+    ids: str = Query(..., description="Comma-separated video ids"),
+    fields: Fields = Depends(video_fields),
+    current_user: dict = Depends(get_current_user)
+):
+    video_ids = [video_id.strip() for video_id in ids.split(",") if video_id.strip()]
+    return fields.page(await service.get_videos(video_ids, fields.projection))
+
 @router.get("/video/{video_id}", response_model=Video)
-async def get_video_analytics(video_id: str, current_user: dict = Depends(get_current_user)):
-    return await service.get_video_analytics(video_id)
+async def get_video_analytics(video_id: str, fields: Fields = Depends(video_fields), current_user: dict = Depends(get_current_user)):
+    return fields.one(await service.get_video_analytics(video_id, fields.projection))
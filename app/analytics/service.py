@@ -1,25 +1,193 @@
+from datetime import datetime, timezone
 from app.db.mongo import get_database
+from app.analytics.rollups import GRANULARITIES, pick_granularity, period_start, record_snapshot
+from app.config.settings import settings
+from app.utils.cache import create_cache
+from app.utils.pagination import paginate
 from fastapi import HTTPException
 
+GROWTH_DAYS = 30
+
+# Entries only go stale when snapshots arrive; ingest_snapshot drops them then,
+# the TTL covers snapshots written some other way (seed, bulk loads)
+growth_cache = create_cache("creator_growth", ttl_seconds=settings.GROWTH_CACHE_TTL_SECONDS)
+
+async def invalidate_growth(*creator_ids: str):
+    await growth_cache.delete(*(f"growth:{creator_id}" for creator_id in creator_ids))
+
+# sort_by -> keyset sort for a creator's videos (each has a matching index)
+VIDEO_SORTS = {
+    "recent": [("published_at", -1), ("_id", -1)],
+    "views": [("views", -1), ("_id", -1)],
+    "like_rate": [("like_rate", -1), ("_id", -1)],
+    "comment_rate": [("comment_rate", -1), ("_id", -1)],
+}
+
+def engagement_rates(video: dict) -> dict:
+    """like_rate / comment_rate stored on each video; recompute whenever counts change"""
+    views = video.get("views") or 0
+    if not views:
+        return {"like_rate": 0.0, "comment_rate": 0.0}
+    return {
+        "like_rate": round((video.get("likes") or 0) / views, 6),
+        "comment_rate": round((video.get("comments_count") or 0) / views, 6),
+    }
+
+def _percent_change(current, previous):
+    return {"$cond": [
+        {"$gt": [previous, 0]},
+        {"$round": [{"$multiply": [{"$divide": [{"$subtract": [current, previous]}, previous]}, 100]}, 2]},
+        None
+    ]}
+
+def _naive_utc(value: datetime) -> datetime:
+    # Snapshot dates are stored as naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
 class AnalyticsService:
+    async def get_creator_growth(self, creator_id: str):
+        """
+        Per-account growth for the last GROWTH_DAYS snapshots in one aggregation:
+        day-over-day changes, 7/30-day moving averages and window totals.
+        Cached until a snapshot for one of the creator's accounts is ingested.
+        """
+        key = f"growth:{creator_id}"
+        growth = await growth_cache.get(key)
+        if growth is not None:
+            return growth
+
+        db = await get_database()
+        pipeline = [
+            {"$match": {"creator_id": creator_id}},
+            {"$project": {"platform": 1, "external_channel_id": 1}},
+            {"$lookup": {
+                "from": "channel_snapshots",
+                "localField": "_id",
+                "foreignField": "social_account_id",
+                "pipeline": [
+                    {"$sort": {"date": -1}},
+                    # Extra rows so the oldest one returned still has a full 30-day window
+                    {"$limit": GROWTH_DAYS + 29},
+                    {"$setWindowFields": {
+                        "sortBy": {"date": 1},
+                        "output": {
+                            "previous_subscribers": {"$shift": {"output": "$subscribers", "by": -1}},
+                            "previous_views": {"$shift": {"output": "$views", "by": -1}},
+                            "views_ma_7": {"$avg": "$views", "window": {"range": [-6, 0], "unit": "day"}},
+                            "views_ma_30": {"$avg": "$views", "window": {"range": [-29, 0], "unit": "day"}},
+                            "revenue_ma_7": {"$avg": "$estimated_revenue", "window": {"range": [-6, 0], "unit": "day"}},
+                            "revenue_ma_30": {"$avg": "$estimated_revenue", "window": {"range": [-29, 0], "unit": "day"}}
+                        }
+                    }},
+                    {"$sort": {"date": -1}},
+                    {"$limit": GROWTH_DAYS},
+                    {"$set": {
+                        "subscriber_change": {"$subtract": ["$subscribers", "$previous_subscribers"]},
+                        "subscriber_growth_rate": _percent_change("$subscribers", "$previous_subscribers"),
+                        "views_growth_rate": _percent_change("$views", "$previous_views")
+                    }},
+                    {"$unset": ["previous_subscribers", "previous_views"]}
+                ],
+                "as": "snapshots"
+            }},
+            {"$set": {"totals": {
+                "snapshots": {"$size": "$snapshots"},
+                "views": {"$sum": "$snapshots.views"},
+                "watch_time": {"$sum": "$snapshots.watch_time"},
+                "estimated_revenue": {"$sum": "$snapshots.estimated_revenue"},
+                "engagement_rate": {"$avg": "$snapshots.engagement_rate"},
+                "subscribers": {"$first": "$snapshots.subscribers"},
+                "subscriber_change": {"$subtract": [{"$first": "$snapshots.subscribers"}, {"$last": "$snapshots.subscribers"}]},
+                "subscriber_growth_rate": _percent_change({"$first": "$snapshots.subscribers"}, {"$last": "$snapshots.subscribers"})
+            }}},
+            {"$sort": {"_id": 1}}
+        ]
+        accounts = await db.social_accounts.aggregate(pipeline).to_list(length=100)
+        growth = {"creator_id": creator_id, "accounts": accounts}
+        await growth_cache.set(key, growth)
+        return growth
+
     async def get_creator_analytics(self, creator_id: str):
+        """The creator's latest GROWTH_DAYS snapshots across accounts, newest first"""
+        growth = await self.get_creator_growth(creator_id)
+        snapshots = [snap for account in growth["accounts"] for snap in account["snapshots"]]
+        snapshots.sort(key=lambda snap: snap["date"], reverse=True)
+        return snapshots[:GROWTH_DAYS]
+
+    async def ingest_snapshot(self, snapshot: dict, database=None) -> bool:
+        """Store (or update) a day's channel snapshot and fold it into the rollups; False if nothing changed"""
+        db = database if database is not None else await get_database()
+        stored = await record_snapshot(db, snapshot)
+        if stored:
+            account = await db.social_accounts.find_one({"_id": snapshot["social_account_id"]}, {"creator_id": 1})
+            if account:
+                await invalidate_growth(account["creator_id"])
+        return stored
+
+    async def get_snapshot_series(self, creator_id: str, start: datetime, end: datetime, granularity: str = "auto"):
+        start, end = _naive_utc(start), _naive_utc(end)
+        if start > end:
+            raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+        if granularity == "auto":
+            granularity = pick_granularity(start, end, settings.SNAPSHOT_SERIES_MAX_POINTS)
+        elif granularity not in GRANULARITIES:
+            raise HTTPException(status_code=400, detail=f"granularity must be auto, {', '.join(GRANULARITIES)}")
+
         db = await get_database()
-        # Get all social accounts for creator
-        accounts = await db.social_accounts.find({"creator_id": creator_id}).to_list(length=100)
-        account_ids = [acc["_id"] for acc in accounts]
-        
-        # Aggregate snapshots
+        accounts = await db.social_accounts.find({"creator_id": creator_id}, {"_id": 1}).to_list(length=100)
+
+        # One rollup document per account per period, summed into one point per period
         pipeline = [
-            {"$match": {"social_account_id": {"$in": account_ids}}},
-            {"$sort": {"date": -1}},
-            {"$limit": 30} # Last 30 snapshots
+            {"$match": {
+                "social_account_id": {"$in": [acc["_id"] for acc in accounts]},
+                "granularity": granularity,
+                "period_start": {"$gte": period_start(start, granularity), "$lte": end}
+            }},
+            {"$group": {
+                "_id": "$period_start",
+                "count": {"$sum": "$count"},
+                "subscribers_open": {"$sum": "$subscribers_open"},
+                "subscribers_close": {"$sum": "$subscribers_close"},
+                "subscribers_max": {"$sum": "$subscribers_max"},
+                "views": {"$sum": "$views"},
+                "watch_time": {"$sum": "$watch_time"},
+                "estimated_revenue": {"$sum": "$estimated_revenue"},
+                "engagement_rate": {"$sum": "$engagement_rate"}
+            }},
+            {"$sort": {"_id": 1}}
         ]
-        snapshots = await db.channel_snapshots.aggregate(pipeline).to_list(length=30)
-        return snapshots
+        points = await db.channel_snapshot_rollups.aggregate(pipeline).to_list(length=None)
+        for point in points:
+            point["period_start"] = point.pop("_id")
+            point["engagement_rate"] = point["engagement_rate"] / point["count"] if point["count"] else 0.0
+        return {"creator_id": creator_id, "granularity": granularity, "from": start, "to": end, "points": points}
+
+    async def get_videos(self, video_ids: list, projection: dict = None):
+        """Several videos in one query, in the order asked for"""
+        video_ids = list(dict.fromkeys(video_ids))
+        if len(video_ids) > settings.VIDEO_BATCH_MAX_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {settings.VIDEO_BATCH_MAX_IDS} ids per request")
+        db = await get_database()
+        found = {v["_id"]: v async for v in db.videos.find({"_id": {"$in": video_ids}}, projection)}
+        return {
+            "items": [found[video_id] for video_id in video_ids if video_id in found],
+            "missing": [video_id for video_id in video_ids if video_id not in found]
+        }
+
+    async def get_creator_videos(self, creator_id: str, sort_by: str = "recent", limit: int = 20,
+                                 cursor: str = None, projection: dict = None):
+        if sort_by not in VIDEO_SORTS:
+            raise HTTPException(status_code=400, detail=f"sort_by must be one of {', '.join(VIDEO_SORTS)}")
+        db = await get_database()
+        accounts = await db.social_accounts.find({"creator_id": creator_id}, {"_id": 1}).to_list(length=100)
+        if not accounts:
+            return {"items": [], "next_cursor": None}
+        query = {"social_account_id": {"$in": [acc["_id"] for acc in accounts]}}
+        return await paginate(db.videos, query, VIDEO_SORTS[sort_by], limit, cursor, projection)
 
-    async def get_video_analytics(self, video_id: str):
+    async def get_video_analytics(self, video_id: str, projection: dict = None):
         db = await get_database()
-        video = await db.videos.find_one({"_id": video_id})
+        video = await db.videos.find_one({"_id": video_id}, projection)
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
         return video
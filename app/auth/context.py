@@ -0,0 +1,68 @@
+from typing import Optional
+from fastapi import HTTPException
+from app.brands.service import BrandService
+from app.creators.service import CreatorService
+from app.utils.metrics import metrics
+
+_UNSET = object()
+
+class RequestContext:
+    """
+    The authenticated user for one request plus their creator/brand profile,
+    each resolved at most once no matter how many routes or services ask.
+    Access tokens may carry creator_id/brand_id claims (see AuthService.login),
+    in which case the id is known without any lookup.
+    """
+
+    def __init__(self, user: dict, claims: dict = None):
+        self.user = user
+        self.claims = claims or {}
+        self._creator = _UNSET
+        self._brand = _UNSET
+
+    @property
+    def user_id(self) -> str:
+        return self.user["_id"]
+
+    async def creator_id(self) -> Optional[str]:
+        if self._creator is _UNSET and self.claims.get("creator_id"):
+            metrics.inc("auth.context.profile_claims")
+            return self.claims["creator_id"]
+        creator = await self.creator()
+        return creator["_id"] if creator else None
+
+    async def creator(self) -> Optional[dict]:
+        if self._creator is _UNSET:
+            self._creator = await self._load(CreatorService(), "creator_id")
+        return self._creator
+
+    async def brand_id(self) -> Optional[str]:
+        if self._brand is _UNSET and self.claims.get("brand_id"):
+            metrics.inc("auth.context.profile_claims")
+            return self.claims["brand_id"]
+        brand = await self.brand()
+        return brand["_id"] if brand else None
+
+    async def brand(self) -> Optional[dict]:
+        if self._brand is _UNSET:
+            self._brand = await self._load(BrandService(), "brand_id")
+        return self._brand
+
+    def set_creator(self, creator: dict):
+        """Record a profile created during this request"""
+        self._creator = creator
+
+    async def _load(self, service, claim: str):
+        metrics.inc("auth.context.profile_lookups")
+        profile_id = self.claims.get(claim)
+        if profile_id:
+            try:
+                # By id goes through the profile cache
+                if claim == "creator_id":
+                    return await service.get_creator(profile_id)
+                return await service.get_brand(profile_id)
+            except HTTPException:
+                pass  # stale claim; fall back to the user_id lookup
+        if claim == "creator_id":
+            return await service.get_creator_by_user_id(self.user_id)
+        return await service.get_brand_by_user_id(self.user_id)
@@ -0,0 +1,113 @@
+"""
+Revoked refresh tokens.
+
+Every refresh token carries a jti. Refreshing revokes the presented jti (a
+rotation) and /auth/logout revokes it outright. Revocations are stored in the
+revoked_tokens collection (TTL-expired when the token would have expired
+anyway) and mirrored into an in-process Bloom filter, so checking a token that
+was never revoked, which is nearly every check, costs no I/O. A Bloom hit is
+confirmed against Mongo before a token is rejected.
+
+Each worker rebuilds its filter at startup and polls for revocations made by
+other workers every REVOCATION_POLL_SECONDS. Reuse of a rotated token is still
+caught between polls because the rotation insert is keyed by jti and fails on
+a duplicate.
+"""
+import asyncio
+import hashlib
+import math
+from datetime import datetime
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+from app.config.settings import settings
+from app.utils.metrics import metrics
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity or settings.REVOCATION_BLOOM_CAPACITY
+        self.bloom = BloomFilter(self.capacity)
+        self.ready = False
+        self._last_seen: Optional[datetime] = None
+
+    async def load(self, database):
+        """Rebuild the filter from every unexpired revocation"""
+        count = await database.revoked_tokens.count_documents({})
+        bloom = BloomFilter(max(self.capacity, 2 * count))
+        last_seen = None
+        async for doc in database.revoked_tokens.find({}, {"revoked_at": 1}).batch_size(10_000):
+            bloom.add(doc["_id"])
+            if last_seen is None or doc["revoked_at"] > last_seen:
+                last_seen = doc["revoked_at"]
+        self.bloom, self._last_seen, self.ready = bloom, last_seen, True
+        return bloom.count
+
+    async def poll(self, database):
+        """Pick up revocations made by other workers since the last load/poll"""
+        query = {"revoked_at": {"$gte": self._last_seen}} if self._last_seen else {}
+        async for doc in database.revoked_tokens.find(query, {"revoked_at": 1}).sort("revoked_at", 1):
+            if doc["_id"] not in self.bloom:
+                self.bloom.add(doc["_id"])
+            self._last_seen = doc["revoked_at"]
+        if self.bloom.count > self.bloom.capacity:
+            await self.load(database)
+
+    async def watch(self, database):
+        while True:
+            await asyncio.sleep(settings.REVOCATION_POLL_SECONDS)
+            try:
+                await self.poll(database)
+            except Exception as e:
+                print(f"Revocation poll failed: {e}")
+
+    async def is_revoked(self, database, jti: str) -> bool:
+        if jti not in self.bloom:
+            metrics.inc("auth.revocation.bloom_negative")
+            return False
+        metrics.inc("auth.revocation.confirmations")
+        return await database.revoked_tokens.find_one({"_id": jti}, {"_id": 1}) is not None
+
+    async def revoke(self, database, jti: str, user_id: str, expires_at: datetime) -> bool:
+        """Record jti as revoked; False if it already was (a reused refresh token)"""
+        now = datetime.utcnow()
+        try:
+            await database.revoked_tokens.insert_one({
+                "_id": jti, "user_id": user_id, "revoked_at": now, "expires_at": expires_at
+            })
+        except DuplicateKeyError:
+            revoked = False
+        else:
+            revoked = True
+        if jti not in self.bloom:
+            self.bloom.add(jti)
+        return revoked
+
+    def stats(self) -> dict:
+        return {"ready": self.ready, "entries": self.bloom.count, "capacity": self.bloom.capacity, "bits": self.bloom.size}
+
+
+revocation_list = RevocationList()
+metrics.register_collector("refresh_token_revocation", revocation_list.stats)
@@ -3,14 +3,16 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from app.auth.models import UserCreate, UserLogin, Token, UserResponse
 from app.auth.service import AuthService
+from app.auth.context import RequestContext
 from app.config.settings import settings
-from app.db.mongo import get_database
 
 router = APIRouter()
 auth_service = AuthService()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_request_context(token: str = Depends(oauth2_scheme)) -> RequestContext:
+    """Resolved once per request (FastAPI caches dependencies); routes that need
+    the user's creator/brand profile should take this instead of looking it up"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -21,14 +23,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         user_id: str = payload.get("id")
         if user_id is None:
             raise credentials_exception
+        # Only access tokens carry a role; refresh tokens (typed or from before rotation) don't
+        if payload.get("type") == "refresh" or not payload.get("role"):
+            raise credentials_exception
     except JWTError:
         raise credentials_exception
         
-    db = await get_database()
-    user = await db.users.find_one({"_id": user_id})
+    user = await auth_service.get_principal(user_id, payload)
     if user is None:
         raise credentials_exception
-    return user
+    return RequestContext(user, payload)
+
+async def get_current_user(context: RequestContext = Depends(get_request_context)):
+    return context.user
 
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate):
@@ -44,4 +51,10 @@ async def read_users_me(current_user: dict = Depends(get_current_user)):
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(refresh_token: str):
+    """Returns a new refresh token too; the one sent is revoked"""
     return await auth_service.refresh_token(refresh_token)
+
+@router.post("/logout")
+async def logout(refresh_token: str):
+    """Revoke a refresh token"""
+    return await auth_service.logout(refresh_token)
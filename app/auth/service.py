@@ -1,13 +1,99 @@
 from app.db.mongo import get_database
 from app.auth.models import UserCreate, UserLogin
-from app.auth.utils import get_password_hash, verify_password, create_access_token, create_refresh_token
+from app.auth.utils import password_hasher, create_access_token, create_refresh_token
+from app.auth.revocation import revocation_list
 from jose import JWTError, jwt
 from app.config.settings import settings
+from app.utils.cache import create_cache
+from app.utils.metrics import metrics
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
+import hashlib
 import uuid
 from datetime import datetime
 
+# What get_current_user hands to routes; never includes the password hash
+PRINCIPAL_PROJECTION = {"password_hash": 0}
+
+principal_cache = create_cache(
+    "principals",
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+def principal_from_claims(payload: dict):
+    """Principal built from a signed access token, or None if the token lacks the claims"""
+    if not all(payload.get(k) for k in ("id", "sub", "role")):
+        return None
+    return {"_id": payload["id"], "email": payload["sub"], "role": payload["role"]}
+
+def principal_stats() -> dict:
+    counters = metrics.snapshot_counters("auth.principal.")
+    requests = counters.get("requests", 0)
+    saved = counters.get("cache_hits", 0) + counters.get("trusted_claims", 0)
+    return {
+        **counters,
+        "saved_round_trips": saved,
+        "saved_round_trips_per_request": round(saved / requests, 4) if requests else 0.0
+    }
+
+metrics.register_collector("auth_principals", principal_stats)
+
+def is_legacy_refresh_token(payload: dict) -> bool:
+    """A refresh token issued before rotation (no type, jti or role), accepted only
+    until LEGACY_REFRESH_TOKENS_UNTIL"""
+    cutoff = settings.LEGACY_REFRESH_TOKENS_UNTIL
+    if cutoff is None or datetime.utcnow() >= cutoff:
+        return False
+    return not any(payload.get(k) for k in ("type", "jti", "role"))
+
 class AuthService:
+    async def get_principal(self, user_id: str, claims: dict = None):
+        """The user for an authenticated request: from token claims (if trusted), the cache, or Mongo"""
+        metrics.inc("auth.principal.requests")
+        if settings.AUTH_TRUST_TOKEN_CLAIMS and claims:
+            principal = principal_from_claims(claims)
+            if principal is not None:
+                metrics.inc("auth.principal.trusted_claims")
+                return principal
+
+        principal = await principal_cache.get(user_id)
+        if principal is not None:
+            metrics.inc("auth.principal.cache_hits")
+            return principal
+
+        metrics.inc("auth.principal.db_lookups")
+        db = await get_database()
+        principal = await db.users.find_one({"_id": user_id}, PRINCIPAL_PROJECTION)
+        if principal is not None:
+            await principal_cache.set(user_id, principal)
+        return principal
+
+    async def access_token_claims(self, db_user: dict) -> dict:
+        claims = {"sub": db_user["email"], "id": str(db_user["_id"]), "role": db_user["role"]}
+        if settings.AUTH_TOKEN_PROFILE_CLAIMS:
+            # One lookup here saves one on every request that needs the profile
+            db = await get_database()
+            if db_user["role"] == "CREATOR":
+                creator = await db.creators.find_one({"user_id": db_user["_id"]}, {"_id": 1})
+                if creator:
+                    claims["creator_id"] = creator["_id"]
+            elif db_user["role"] == "BRAND":
+                brand = await db.brands.find_one({"user_id": db_user["_id"]}, {"_id": 1})
+                if brand:
+                    claims["brand_id"] = brand["_id"]
+        return claims
+
+    async def invalidate_principal(self, user_id: str):
+        await principal_cache.delete(user_id)
+
+    async def update_user(self, user_id: str, changes: dict):
+        """Every write to a user (role, password, email) goes through here so cached principals are dropped"""
+        db = await get_database()
+        result = await db.users.update_one({"_id": user_id}, {"$set": changes})
+        await self.invalidate_principal(user_id)
+        return result.matched_count > 0
+
     async def register(self, user: UserCreate):
         db = await get_database()
         existing_user = await db.users.find_one({"email": user.email})
@@ -15,26 +101,31 @@ class AuthService:
             raise HTTPException(status_code=400, detail="Email already registered")
         
         user_dict = user.dict()
-        user_dict["password_hash"] = get_password_hash(user_dict.pop("password"))
+        user_dict["password_hash"] = await password_hasher.hash(user_dict.pop("password"))
         user_dict["_id"] = str(uuid.uuid4())
         user_dict["created_at"] = datetime.utcnow()
         
-        await db.users.insert_one(user_dict)
+        try:
+            await db.users.insert_one(user_dict)
+        except DuplicateKeyError:
+            # A concurrent registration got the email first (email_unique index)
+            raise HTTPException(status_code=400, detail="Email already registered")
         return user_dict
 
     async def login(self, user: UserLogin):
         db = await get_database()
         db_user = await db.users.find_one({"email": user.email})
-        print(f"DEBUG: Login attempt for {user.email}")
-        print(f"DEBUG: User found in DB: {db_user is not None}")
-        if db_user:
-            print(f"DEBUG: Password verification result: {verify_password(user.password, db_user['password_hash'])}")
+        if not db_user:
+            raise HTTPException(status_code=401, detail="Invalid credentials")
         
-        if not db_user or not verify_password(user.password, db_user["password_hash"]):
-            print("DEBUG: Login failed - Invalid credentials")
+        valid, new_hash = await password_hasher.verify_and_update(user.password, db_user["password_hash"])
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid credentials")
+        if new_hash:
+            # Stored with outdated bcrypt parameters; upgrade while we have the plain password
+            await self.update_user(db_user["_id"], {"password_hash": new_hash})
         
-        access_token = create_access_token(data={"sub": db_user["email"], "id": str(db_user["_id"]), "role": db_user["role"]})
+        access_token = create_access_token(data=await self.access_token_claims(db_user))
         refresh_token = create_refresh_token(data={"sub": db_user["email"], "id": str(db_user["_id"])})
         
         return {
@@ -43,24 +134,54 @@ class AuthService:
             "token_type": "bearer"
         }
 
-    async def refresh_token(self, refresh_token: str):
+    async def _decode_refresh_token(self, refresh_token: str) -> dict:
         try:
             payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            user_id: str = payload.get("id")
-            if user_id is None:
-                raise HTTPException(status_code=401, detail="Invalid refresh token")
         except JWTError:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
-            
+        if payload.get("id") is None:
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+        if payload.get("type") == "refresh" and payload.get("jti"):
+            return payload
+        if is_legacy_refresh_token(payload):
+            # Single-use like the rest: revoked under a jti derived from the token itself
+            metrics.inc("auth.legacy_refresh_tokens")
+            return {**payload, "jti": "legacy:" + hashlib.sha256(refresh_token.encode()).hexdigest()}
+        # Access tokens and anything else signed with our key
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    async def _revoke(self, db, payload: dict) -> bool:
+        """Revoke a refresh token's jti; False if it was already revoked"""
+        expires_at = datetime.utcfromtimestamp(payload["exp"])
+        return await revocation_list.revoke(db, payload["jti"], payload["id"], expires_at)
+
+    async def refresh_token(self, refresh_token: str):
+        """Swap a refresh token for a new access token and a new refresh token; the old one stops working"""
+        payload = await self._decode_refresh_token(refresh_token)
         db = await get_database()
-        db_user = await db.users.find_one({"_id": user_id})
+        # Usually answered by the Bloom filter without touching Mongo
+        if await revocation_list.is_revoked(db, payload["jti"]):
+            raise HTTPException(status_code=401, detail="Refresh token has been revoked")
+            
+        db_user = await db.users.find_one({"_id": payload["id"]})
         if not db_user:
             raise HTTPException(status_code=401, detail="User not found")
+        
+        # The insert is keyed by jti, so two concurrent refreshes with the same token can't both win
+        if not await self._revoke(db, payload):
+            raise HTTPException(status_code=401, detail="Refresh token has been revoked")
             
-        access_token = create_access_token(data={"sub": db_user["email"], "id": str(db_user["_id"]), "role": db_user["role"]})
+        access_token = create_access_token(data=await self.access_token_claims(db_user))
+        new_refresh_token = create_refresh_token(data={"sub": db_user["email"], "id": str(db_user["_id"])})
         
         return {
             "access_token": access_token,
-            "refresh_token": refresh_token, # Return same refresh token or rotate if needed
+            "refresh_token": new_refresh_token,
             "token_type": "bearer"
         }
+
+    async def logout(self, refresh_token: str):
+        payload = await self._decode_refresh_token(refresh_token)
+        db = await get_database()
+        await self._revoke(db, payload)
+        return {"message": "Logged out"}
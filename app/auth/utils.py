@@ -1,9 +1,21 @@
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
 from app.config.settings import settings
+from app.utils.metrics import metrics
+import asyncio
+import time
+import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below BCRYPT_ROUNDS are flagged by verify_and_update and rehashed at login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS
+)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -11,6 +23,67 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a small thread pool (bcrypt releases the
+    GIL). At most `workers` hashes run at once; up to `max_queue` more wait
+    their turn, and anything beyond that gets a 503 right away so a login
+    storm can't pile up unbounded work.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = None
+        self._slots = None
+        self.waiting = 0
+        self.running = 0
+
+    async def _run(self, fn, *args):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            self._slots = asyncio.Semaphore(self.workers)
+        if self.waiting >= self.max_queue:
+            metrics.inc("auth.password_pool.rejected")
+            raise HTTPException(status_code=503, detail="Too many login attempts, try again shortly",
+                                headers={"Retry-After": "1"})
+
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        metrics.observe("auth.password_pool.wait", time.perf_counter() - queued_at)
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.running -= 1
+            self._slots.release()
+            metrics.observe("auth.password_pool.hash", time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple:
+        """(valid, new_hash); new_hash is set when the stored hash uses outdated parameters"""
+        return await self._run(pwd_context.verify_and_update, password, hashed)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "max_queue": self.max_queue, "queue_depth": self.waiting, "running": self.running}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+metrics.register_collector("password_pool", password_hasher.stats)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -22,8 +95,9 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 def create_refresh_token(data: dict):
+    """Single-use: the jti is revoked when the token is refreshed (see app/auth/revocation.py)"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
@@ -1,19 +1,24 @@
 from fastapi import APIRouter, Depends
-from app.auth.routes import get_current_user
+from app.auth.routes import get_current_user, get_request_context
+from app.auth.context import RequestContext
 from app.brands.models import BrandProfile, BrandUpdate
 from app.brands.service import BrandService
+from app.utils.fields import Fields, FieldSelector
 
 router = APIRouter()
 service = BrandService()
+brand_fields = FieldSelector(BrandProfile)
 
 @router.get("/me", response_model=BrandProfile)
-async def get_my_profile(current_user: dict = Depends(get_current_user)):
-    return await service.get_brand_by_user_id(current_user["_id"])
+async def get_my_profile(fields: Fields = Depends(brand_fields), context: RequestContext = Depends(get_request_context)):
+    if fields.full:
+        return await context.brand()
+    return fields.one(await service.get_brand_by_user_id(context.user_id, fields.projection))
 
 @router.put("/me", response_model=BrandProfile)
 async def update_my_profile(update_data: BrandUpdate, current_user: dict = Depends(get_current_user)):
     return await service.update_profile(current_user["_id"], update_data)
 
 @router.get("/{brand_id}", response_model=BrandProfile)
-async def get_brand(brand_id: str):
-    return await service.get_brand(brand_id)
+async def get_brand(brand_id: str, fields: Fields = Depends(brand_fields)):
+    return fields.one(await service.get_brand(brand_id, fields.projection))
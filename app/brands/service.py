@@ -4,16 +4,16 @@ from fastapi import HTTPException
 import uuid
 
 class BrandService:
-    async def get_brand(self, brand_id: str):
+    async def get_brand(self, brand_id: str, projection: dict = None):
         db = await get_database()
-        brand = await db.brands.find_one({"_id": brand_id})
+        brand = await db.brands.find_one({"_id": brand_id}, projection)
         if not brand:
             raise HTTPException(status_code=404, detail="Brand not found")
         return brand
 
-    async def get_brand_by_user_id(self, user_id: str):
+    async def get_brand_by_user_id(self, user_id: str, projection: dict = None):
         db = await get_database()
-        brand = await db.brands.find_one({"user_id": user_id})
+        brand = await db.brands.find_one({"user_id": user_id}, projection)
         return brand
 
     async def create_profile(self, user_id: str, data: dict):
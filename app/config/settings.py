@@ -1,22 +1,123 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
+from datetime import datetime
 
 class Settings(BaseSettings):
     MONGODB_URL: str = "mongodb://localhost:27017"
     DB_NAME: str = "tapp_db"
+    ENSURE_INDEXES_ON_STARTUP: bool = True
     SECRET_KEY: str = "supersecretkey"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Authenticated user lookups: cached per user id for a short TTL, or (if
+    # AUTH_TRUST_TOKEN_CLAIMS) taken from the signed access token without a DB read
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    # Put creator_id/brand_id in access tokens so requests can skip the profile lookup
+    AUTH_TOKEN_PROFILE_CLAIMS: bool = True
+    # Refresh-token revocation (Bloom filter per worker, backed by revoked_tokens)
+    REVOCATION_BLOOM_CAPACITY: int = 1_000_000
+    REVOCATION_POLL_SECONDS: int = 30
+    # Refresh tokens issued before rotation (no jti) are accepted once each until
+    # this UTC time, then rejected; unset = rejected. They expire REFRESH_TOKEN_EXPIRE_DAYS after issue anyway.
+    LEGACY_REFRESH_TOKENS_UNTIL: Optional[datetime] = None
+    # bcrypt runs in a thread pool; logins beyond the queue limit get a 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
     
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Response caches: "memory" (per worker) or "redis" (shared, uses REDIS_URL)
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 10000
+    
     STRICT_PRIVACY_MODE: bool = True
     
+    # Creator search
+    CREATOR_SEARCH_INDEX_ENABLED: bool = True
+    CREATOR_SEARCH_MAX_RESULTS: int = 1000
+    DISCOVER_FACET_CACHE_TTL_SECONDS: int = 60
+    DISCOVER_FACET_CACHE_SIZE: int = 1000
+    # Facets for a text search count at most this many matches (facets_truncated=true beyond)
+    DISCOVER_FACET_MAX_MATCHES: int = 50_000
+    
+    # Snapshot charts: granularity=auto picks the finest rollup under this many points
+    SNAPSHOT_SERIES_MAX_POINTS: int = 120
+    GROWTH_CACHE_TTL_SECONDS: int = 3600
+    VIDEO_BATCH_MAX_IDS: int = 100
+    
+    # Bulk exports (/exports/*); disabled while the key is empty
+    EXPORT_API_KEY: str = ""
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # GET /metrics; disabled while the key is empty
+    METRICS_API_KEY: str = ""
+    
+    # Revenue payouts
+    PAYOUT_BATCH_SIZE: int = 1000
+    PAYOUT_INLINE_MAX_INVESTMENTS: int = 5000
+    
+    # Data migrations (python -m app.migrations.runner); 0 = unthrottled
+    MIGRATION_BATCH_SIZE: int = 500
+    MIGRATION_OPS_PER_SECOND: float = 1000
+    
     # YouTube OAuth
     YOUTUBE_CLIENT_ID: Optional[str] = None
     YOUTUBE_CLIENT_SECRET: Optional[str] = None
     YOUTUBE_REDIRECT_URI: str = "http://localhost:8000/social/youtube/callback"
+    YOUTUBE_API_KEY: Optional[str] = None  # for accounts without an access token
+    # Point at app.social.youtube_stub for local runs
+    YOUTUBE_API_BASE_URL: str = "https://www.googleapis.com/youtube/v3"
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    
+    # Channel sync (app/social/sync.py)
+    SYNC_ACCOUNT_CONCURRENCY: int = 4  # videos.list calls in flight per account
+    SYNC_REFRESH_DAYS: int = 30  # re-read statistics of videos published this recently
+    # Scheduled syncs: every SYNC_MIN_INTERVAL_SECONDS for channels with SYNC_POPULAR_SUBSCRIBERS,
+    # stretching to SYNC_MAX_INTERVAL_SECONDS for SYNC_DORMANT_SUBSCRIBERS and below
+    SYNC_MIN_INTERVAL_SECONDS: int = 300
+    SYNC_MAX_INTERVAL_SECONDS: int = 86400
+    SYNC_POPULAR_SUBSCRIBERS: int = 1_000_000
+    SYNC_DORMANT_SUBSCRIBERS: int = 1_000
+    SYNC_INTERVAL_JITTER: float = 0.1
+    SYNC_RETRY_BASE_SECONDS: int = 60  # doubles per consecutive failure
+    # Scheduler (app/social/scheduler.py): "inline" syncs in-process, "rq" enqueues on the sync queue
+    SYNC_SCHEDULER_ENABLED: bool = False
+    SYNC_SCHEDULER_MODE: str = "inline"
+    SYNC_GLOBAL_CONCURRENCY: int = 8
+    SYNC_SCHEDULER_POLL_SECONDS: float = 15.0
+    SYNC_SCHEDULER_BATCH: int = 200
+    SYNC_DISPATCH_JITTER_SECONDS: float = 2.0
+    # rq mode: RQ timeout of a sync job; an enqueued account isn't due again before it has passed
+    SYNC_JOB_TIMEOUT_SECONDS: int = 600
+
+    # Creator analytics materialization (app/workers/analytics_worker.py) on the analytics queue
+    ANALYTICS_SCHEDULER_ENABLED: bool = False
+    ANALYTICS_MATERIALIZE_INTERVAL_SECONDS: int = 300
+    ANALYTICS_MATERIALIZE_TIMEOUT_SECONDS: int = 3600
+    
+    # Outbound HTTP (app/utils/http.py)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_HTTP2: bool = False  # needs httpx[http2]
+    HTTP_PER_HOST_CONCURRENCY: int = 20
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_RETRY_BASE_SECONDS: float = 0.2
+    HTTP_RETRY_MAX_SECONDS: float = 5.0
+    HTTP_BREAKER_FAILURES: int = 5
+    HTTP_BREAKER_RESET_SECONDS: float = 30.0
+    
+    # GPU inference service for comment analysis; unset = mock results
+    GPU_WORKER_URL: Optional[str] = None
+    # RQ timeout for one comment analysis job (queue: ai_jobs)
+    AI_JOB_TIMEOUT_SECONDS: int = 600
 
     class Config:
         env_file = ".env"
@@ -24,6 +24,8 @@ class CreatorProfile(BaseModel):
     performance_trend: str = "stable"
     audience_demographics: Dict = {}
     last_analytics_update: Optional[str] = None
+    # "pending" until app.workers.analytics_worker has materialized the fields above
+    analytics_status: str = "ready"
     
     class Config:
         populate_by_name = True
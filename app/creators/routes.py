@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends
-from app.auth.routes import get_current_user
+from app.auth.routes import get_current_user, get_request_context
+from app.auth.context import RequestContext
 from app.creators.models import CreatorProfile, CreatorUpdate
 from app.creators.service import CreatorService
+from app.utils.fields import Fields, FieldSelector
 
 router = APIRouter()
 service = CreatorService()
+creator_fields = FieldSelector(CreatorProfile)
 
 @router.get("/me", response_model=CreatorProfile)
-async def get_my_profile(current_user: dict = Depends(get_current_user)):
-    return await service.get_creator_by_user_id(current_user["_id"])
+async def get_my_profile(fields: Fields = Depends(creator_fields), context: RequestContext = Depends(get_request_context)):
+    if fields.full:
+        return await context.creator()
+    return fields.one(await service.get_creator_by_user_id(context.user_id, fields.projection))
 
 @router.put("/me")
 async def update_creator_profile(profile: CreatorUpdate, current_user: dict = Depends(get_current_user)):
@@ -20,5 +25,6 @@ async def get_creator_analytics(creator_id: str):
     return await service.get_creator_analytics(creator_id)
 
 @router.get("/{creator_id}", response_model=CreatorProfile)
-async def get_creator(creator_id: str):
-    return await service.get_creator(creator_id)
+async def get_creator(creator_id: str, fields: Fields = Depends(creator_fields)):
+    """Pass fields=display_name,avatar_url,... to get only those fields"""
+    return fields.one(await service.get_creator(creator_id, fields.projection))
@@ -1,13 +1,43 @@
 from app.db.mongo import get_database
-from app.creators.models import CreatorUpdate
+from app.creators.models import CreatorProfile, CreatorUpdate
+from app.discover.search_index import creator_search_index
+from app.utils.cache import create_cache
 from fastapi import HTTPException
 import uuid
 import random
 from datetime import datetime
 
+# GETs read only the fields the API exposes
+CREATOR_PROJECTION = {
+    (field.alias or name): 1 for name, field in CreatorProfile.model_fields.items()
+}
+
+# Needed to derive analytics_status, whatever fields were asked for
+STATUS_FIELDS = {"analytics_status": 1, "total_videos": 1, "ad_revenue": 1}
+
+def creator_projection(projection: dict = None) -> dict:
+    return {**projection, **STATUS_FIELDS} if projection else CREATOR_PROJECTION
+
+# Public profile/analytics reads; invalidated by update_profile
+creator_cache = create_cache("creators")
+
+def creator_cache_keys(creator_id: str) -> tuple:
+    return (f"profile:{creator_id}", f"analytics:{creator_id}")
+
+def analytics_ready(creator: dict) -> bool:
+    if creator.get("analytics_status") == "ready":
+        return True
+    # Documents written before analytics_status existed
+    return bool(creator.get("total_videos")) and bool(creator.get("ad_revenue"))
+
+def with_analytics_status(creator: dict) -> dict:
+    """Mark creators whose analytics haven't been materialized yet instead of generating them on read"""
+    creator["analytics_status"] = "ready" if analytics_ready(creator) else "pending"
+    return creator
+
 class CreatorService:
     def generate_mock_analytics(self) -> dict:
-        """Generate realistic analytics for creators"""
+        """Generate realistic analytics for creators (write paths and the batch job only)"""
         subscribers = random.randint(1000, 500000)
         total_videos = random.randint(10, 500)
         total_videos = random.randint(10, 500)
@@ -42,61 +72,26 @@ class CreatorService:
             "last_analytics_update": datetime.utcnow().isoformat()
         }
     
-    async def get_creator(self, creator_id: str):
+    async def get_creator(self, creator_id: str, projection: dict = None):
+        """projection limits the fields read on a cache miss; only full profiles are cached"""
+        key = creator_cache_keys(creator_id)[0]
+        creator = await creator_cache.get(key)
+        if creator is not None:
+            return creator
+        
         db = await get_database()
-        creator = await db.creators.find_one({"_id": creator_id})
+        creator = await db.creators.find_one({"_id": creator_id}, creator_projection(projection))
         if not creator:
             raise HTTPException(status_code=404, detail="Creator not found")
-        
-        # Generate analytics if missing
-        if not creator.get("total_videos"):
-            analytics = self.generate_mock_analytics()
-            await db.creators.update_one(
-                {"_id": creator_id},
-                {"$set": analytics}
-            )
-            creator.update(analytics)
-        elif not creator.get("ad_revenue"):
-            # Backfill ad_revenue if missing
-            total_views = creator.get("total_views", 0)
-            ad_revenue = round(total_views * random.uniform(0.001, 0.005), 2)
-            if ad_revenue == 0 and total_views > 0:
-                 ad_revenue = round(total_views * 0.003, 2) # Fallback
-            
-            await db.creators.update_one(
-                {"_id": creator_id},
-                {"$set": {"ad_revenue": ad_revenue}}
-            )
-            creator["ad_revenue"] = ad_revenue
-        
+        creator = with_analytics_status(creator)
+        if not projection:
+            await creator_cache.set(key, creator)
         return creator
 
-    async def get_creator_by_user_id(self, user_id: str):
+    async def get_creator_by_user_id(self, user_id: str, projection: dict = None):
         db = await get_database()
-        creator = await db.creators.find_one({"user_id": user_id})
-        
-        # Generate analytics if creator exists but has no analytics
-        if creator and not creator.get("total_videos"):
-            analytics = self.generate_mock_analytics()
-            await db.creators.update_one(
-                {"_id": creator["_id"]},
-                {"$set": analytics}
-            )
-            creator.update(analytics)
-        elif creator and not creator.get("ad_revenue"):
-             # Backfill ad_revenue if missing
-            total_views = creator.get("total_views", 0)
-            ad_revenue = round(total_views * random.uniform(0.001, 0.005), 2)
-            if ad_revenue == 0 and total_views > 0:
-                 ad_revenue = round(total_views * 0.003, 2) # Fallback
-
-            await db.creators.update_one(
-                {"_id": creator["_id"]},
-                {"$set": {"ad_revenue": ad_revenue}}
-            )
-            creator["ad_revenue"] = ad_revenue
-        
-        return creator
+        creator = await db.creators.find_one({"user_id": user_id}, creator_projection(projection))
+        return with_analytics_status(creator) if creator else None
 
     async def create_profile(self, user_id: str, data: dict):
         db = await get_database()
@@ -106,8 +101,10 @@ class CreatorService:
         # Add analytics for new creators
         analytics = self.generate_mock_analytics()
         data.update(analytics)
+        data["analytics_status"] = "ready"
         
         await db.creators.insert_one(data)
+        creator_search_index.add(data)
         return data
 
     async def update_profile(self, user_id: str, update_data: CreatorUpdate):
@@ -121,14 +118,21 @@ class CreatorService:
         
         if result.matched_count == 0:
             return await self.create_profile(user_id, update_dict)
-            
-        return await self.get_creator_by_user_id(user_id)
+        
+        creator = await self.get_creator_by_user_id(user_id)
+        creator_search_index.add(creator)
+        await creator_cache.delete(*creator_cache_keys(creator["_id"]))
+        return creator
     
     async def get_creator_analytics(self, creator_id: str):
         """Get detailed analytics for a creator"""
-        creator = await self.get_creator(creator_id)
+        key = creator_cache_keys(creator_id)[1]
+        analytics = await creator_cache.get(key)
+        if analytics is not None:
+            return analytics
         
-        return {
+        creator = await self.get_creator(creator_id)
+        analytics = {
             "overview": {
                 "subscribers": creator.get("subscribers", 0),
                 "total_videos": creator.get("total_videos", 0),
@@ -148,5 +152,8 @@ class CreatorService:
                 "top_performing_genre": creator.get("top_performing_genre", "")
             },
             "audience": creator.get("audience_demographics", {}),
-            "last_updated": creator.get("last_analytics_update")
+            "last_updated": creator.get("last_analytics_update"),
+            "status": creator["analytics_status"]
         }
+        await creator_cache.set(key, analytics)
+        return analytics
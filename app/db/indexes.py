@@ -0,0 +1,188 @@
+"""
+Declared MongoDB indexes for every collection the services query.
+
+`ensure_indexes` creates anything missing and reports indexes whose
+definition changed ("drift"). It runs at startup (see app/main.py), where it
+never drops anything: with several API workers starting at once, a rebuild
+would race and leave e.g. users without a unique email index meanwhile.
+Changed indexes are rebuilt explicitly, once, from the CLI:
+
+    python -m app.db.indexes [--rebuild] [--prune] [--dry-run]
+"""
+import argparse
+import asyncio
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Case-insensitive equality for genre/region; queries must pass the same collation
+CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+# Discovery filter/sort shapes: each sort field alone, after genre and after region
+DISCOVERY_SORT_FIELDS = ("subscribers", "engagement_rate", "subscriber_growth_rate")
+
+
+def _discovery_indexes():
+    models = []
+    for field in DISCOVERY_SORT_FIELDS:
+        for prefix in ((), ("primary_genre",), ("region",)):
+            keys = [(p, ASCENDING) for p in prefix] + [(field, DESCENDING), ("_id", DESCENDING)]
+            name = "discover_" + "_".join(prefix + (field,))
+            models.append(IndexModel(keys, name=name, collation=CASE_INSENSITIVE))
+    return models
+
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "creators": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+        *_discovery_indexes(),
+    ],
+    "brands": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "social_accounts": [
+        IndexModel([("creator_id", ASCENDING), ("_id", ASCENDING)], name="creator_id"),
+        # Sync scheduler: most overdue first
+        IndexModel([("next_sync_at", ASCENDING)], name="next_sync_at"),
+    ],
+    "videos": [
+        # Sync upserts by the platform's id
+        IndexModel([("social_account_id", ASCENDING), ("external_video_id", ASCENDING)], name="social_account_id_external_video_id", unique=True),
+        # Per-creator catalog and top-video rankings; $in over a creator's accounts merges these without a sort
+        IndexModel([("social_account_id", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)], name="social_account_id_published_at"),
+        IndexModel([("social_account_id", ASCENDING), ("views", DESCENDING), ("_id", DESCENDING)], name="social_account_id_views"),
+        IndexModel([("social_account_id", ASCENDING), ("like_rate", DESCENDING), ("_id", DESCENDING)], name="social_account_id_like_rate"),
+        IndexModel([("social_account_id", ASCENDING), ("comment_rate", DESCENDING), ("_id", DESCENDING)], name="social_account_id_comment_rate"),
+    ],
+    "channel_snapshots": [
+        # One snapshot per account per day; record_snapshot upserts on it
+        IndexModel([("social_account_id", ASCENDING), ("date", DESCENDING)], name="social_account_id_date", unique=True),
+        IndexModel([("updated_at", ASCENDING)], name="rollup_pending",
+                   partialFilterExpression={"rolled_up": False}),
+    ],
+    "channel_snapshot_rollups": [
+        IndexModel([("social_account_id", ASCENDING), ("granularity", ASCENDING), ("period_start", ASCENDING)],
+                   name="social_account_id_granularity_period"),
+    ],
+    "projects": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created_at"),
+        IndexModel([("status", ASCENDING), ("goal_amount", DESCENDING), ("_id", DESCENDING)], name="status_goal_amount"),
+        IndexModel([("creator_id", ASCENDING)], name="creator_id"),
+    ],
+    "investments": [
+        IndexModel([("project_id", ASCENDING), ("_id", ASCENDING)], name="project_id"),
+        IndexModel([("investor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="investor_id_created_at"),
+    ],
+    "revenue_reports": [
+        IndexModel([("project_id", ASCENDING)], name="project_id"),
+    ],
+    "revenue_payouts": [
+        IndexModel([("report_id", ASCENDING)], name="report_id"),
+        IndexModel([("investor_id", ASCENDING)], name="investor_id"),
+    ],
+    "ai_jobs": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "revoked_tokens": [
+        # Drop revocations once the token would have expired anyway
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+    ],
+    "compatibility": [
+        IndexModel([("creator_id", ASCENDING)], name="creator_id"),
+    ],
+}
+
+# Options that make two index definitions with the same name different
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "collation")
+
+
+def _definition(spec: dict) -> dict:
+    key = spec["key"]
+    key = list(key.items()) if isinstance(key, dict) else list(key)
+    definition = {"key": [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in key]}
+    for option in _COMPARED_OPTIONS:
+        if option in spec:
+            definition[option] = spec[option]
+    if "collation" in definition:
+        # Servers echo back every collation default; compare only what we declare
+        definition["collation"] = {k: definition["collation"][k] for k in ("locale", "strength") if k in definition["collation"]}
+    return definition
+
+
+async def ensure_indexes(database, rebuild: bool = False, prune: bool = False, dry_run: bool = False) -> dict:
+    """Create missing indexes; changed ones are rebuilt with rebuild=True, otherwise
+    reported under "drift". Returns what was done."""
+    report = {"created": [], "drift": [], "rebuilt": [], "dropped": [], "errors": []}
+
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            label = f"{collection_name}.{name}"
+            current = existing.get(name)
+
+            if current is not None and _definition(current) == _definition(spec):
+                continue
+            if current is not None and not rebuild:
+                report["drift"].append(label)
+                continue
+            try:
+                if current is not None:
+                    report["rebuilt"].append(label)
+                    if not dry_run:
+                        await collection.drop_index(name)
+                else:
+                    report["created"].append(label)
+                if not dry_run:
+                    await collection.create_indexes([model])
+            except OperationFailure as e:
+                # e.g. duplicate emails blocking the unique index; keep going and report it
+                report["errors"].append(f"{label}: {e}")
+
+        if prune:
+            declared = {model.document["name"] for model in models}
+            for name in existing:
+                if name != "_id_" and name not in declared:
+                    report["dropped"].append(f"{collection_name}.{name}")
+                    if not dry_run:
+                        await collection.drop_index(name)
+
+    return report
+
+
+async def _main(rebuild: bool, prune: bool, dry_run: bool):
+    from app.db.mongo import db
+
+    db.connect()
+    try:
+        report = await ensure_indexes(db.db, rebuild=rebuild, prune=prune, dry_run=dry_run)
+    finally:
+        db.close()
+
+    prefix = "Would have " if dry_run else ""
+    for action in ("created", "rebuilt", "dropped"):
+        for label in report[action]:
+            print(f"{prefix}{action}: {label}")
+    for label in report["drift"]:
+        print(f"changed (run with --rebuild): {label}")
+    for error in report["errors"]:
+        print(f"ERROR: {error}")
+    if not any(report.values()):
+        print("All indexes up to date.")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or reconcile the declared MongoDB indexes")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and recreate indexes whose definition changed")
+    parser.add_argument("--prune", action="store_true", help="Drop indexes that are not declared")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.rebuild, args.prune, args.dry_run)))
@@ -0,0 +1,167 @@
+"""
+Query plan checks for the service queries.
+
+Runs explain() for each query in SERVICE_QUERIES against a local mongod and
+fails if any winning plan contains a collection scan, or a blocking in-memory
+sort for queries that ask for an order. Meant for CI / local
+verification after touching a query or app/db/indexes.py:
+
+    python -m app.db.query_plans [--db tapp_plan_check]
+
+SERVICE_QUERIES is written by hand, so test_query_plans.py also records the
+find commands the services really send (QueryRecorder, a pymongo command
+listener) while calling them, and explains those.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from pymongo import monitoring
+from app.db.indexes import CASE_INSENSITIVE
+
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+SAMPLE_DATE = datetime(2024, 1, 1)
+
+# (label, collection, filter, sort[, collation]) mirroring what the services send
+SERVICE_QUERIES = [
+    ("auth: user by email", "users", {"email": "user0@example.com"}, None),
+    ("creators: by user_id", "creators", {"user_id": SAMPLE_ID}, None),
+    ("discover: top subscribers", "creators", {}, [("subscribers", -1), ("_id", -1)], CASE_INSENSITIVE),
+    ("discover: genre by engagement", "creators", {"primary_genre": "tech", "subscribers": {"$gte": 1000}},
+     [("engagement_rate", -1), ("_id", -1)], CASE_INSENSITIVE),
+    ("discover: region by growth", "creators", {"region": "india"}, [("subscriber_growth_rate", -1), ("_id", -1)], CASE_INSENSITIVE),
+    ("discover: genre+region by subscribers", "creators", {"primary_genre": "tech", "region": "usa"},
+     [("subscribers", -1), ("_id", -1)], CASE_INSENSITIVE),
+    ("brands: by user_id", "brands", {"user_id": SAMPLE_ID}, None),
+    ("social: accounts due for sync", "social_accounts", {"next_sync_at": {"$not": {"$gt": SAMPLE_DATE}}}, [("next_sync_at", 1)]),
+    ("social: accounts for creator", "social_accounts", {"creator_id": SAMPLE_ID}, [("_id", 1)]),
+    ("analytics: videos for accounts", "videos", {"social_account_id": {"$in": [SAMPLE_ID]}}, None),
+    ("sync: video by external id", "videos", {"social_account_id": SAMPLE_ID, "external_video_id": "VID"}, None),
+    ("sync: recent videos", "videos", {"social_account_id": SAMPLE_ID, "published_at": {"$gte": SAMPLE_DATE}}, None),
+    ("analytics: videos by id", "videos", {"_id": {"$in": [SAMPLE_ID]}}, None),
+    ("analytics: latest videos", "videos", {"social_account_id": {"$in": [SAMPLE_ID]}}, [("published_at", -1), ("_id", -1)]),
+    ("analytics: top videos by views", "videos", {"social_account_id": {"$in": [SAMPLE_ID]}}, [("views", -1), ("_id", -1)]),
+    ("analytics: top videos by like rate", "videos", {"social_account_id": {"$in": [SAMPLE_ID]}}, [("like_rate", -1), ("_id", -1)]),
+    ("analytics: top videos by comment rate", "videos", {"social_account_id": {"$in": [SAMPLE_ID]}}, [("comment_rate", -1), ("_id", -1)]),
+    ("analytics: snapshots for accounts", "channel_snapshots", {"social_account_id": {"$in": [SAMPLE_ID]}}, [("date", -1)]),
+    ("sync: latest snapshot for account", "channel_snapshots", {"social_account_id": SAMPLE_ID}, [("date", -1)]),
+    ("rollups: account snapshots in period", "channel_snapshots",
+     {"social_account_id": SAMPLE_ID, "date": {"$gte": SAMPLE_DATE, "$lt": SAMPLE_DATE}}, [("date", 1)]),
+    ("rollups: pending snapshots", "channel_snapshots", {"rolled_up": False, "updated_at": {"$lt": SAMPLE_DATE}}, None),
+    ("analytics: snapshot rollups in range", "channel_snapshot_rollups",
+     {"social_account_id": {"$in": [SAMPLE_ID]}, "granularity": "month", "period_start": {"$gte": SAMPLE_DATE, "$lte": SAMPLE_DATE}},
+     [("period_start", 1)]),
+    ("projects: all, recent first", "projects", {}, [("created_at", -1), ("_id", -1)]),
+    ("projects: public, recent first", "projects", {"status": "LIVE"}, [("created_at", -1), ("_id", -1)]),
+    ("projects: public, by goal", "projects", {"status": "LIVE"}, [("goal_amount", -1), ("_id", -1)]),
+    ("projects: public, next page", "projects",
+     {"$and": [{"status": "LIVE"}, {"$or": [{"created_at": {"$lt": SAMPLE_DATE}}, {"created_at": SAMPLE_DATE, "_id": {"$lt": SAMPLE_ID}}]}]},
+     [("created_at", -1), ("_id", -1)]),
+    ("investments: for project", "investments", {"project_id": SAMPLE_ID}, [("_id", 1)]),
+    ("investments: mine", "investments", {"investor_id": SAMPLE_ID}, [("created_at", -1), ("_id", -1)]),
+    ("payouts: for report", "revenue_payouts", {"report_id": SAMPLE_ID}, None),
+    ("ai: jobs for user", "ai_jobs", {"user_id": SAMPLE_ID}, None),
+    ("compatibility: for creator", "compatibility", {"creator_id": SAMPLE_ID}, None),
+]
+
+
+def _stages(plan: dict):
+    """Yield every stage name in an explain plan tree (classic and SBE layouts)"""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan", "winningPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+async def explain_stages(collection, query: dict, sort: list = None, collation: dict = None) -> list:
+    cursor = collection.find(query, collation=collation)
+    if sort:
+        cursor = cursor.sort(sort)
+    explanation = await cursor.explain()
+    return list(_stages(explanation["queryPlanner"]["winningPlan"]))
+
+
+async def assert_no_collscan(collection, query: dict, sort: list = None, label: str = None, collation: dict = None):
+    """Raise AssertionError if the winning plan for query/sort scans the collection or sorts in memory"""
+    stages = await explain_stages(collection, query, sort, collation)
+    if "COLLSCAN" in stages:
+        raise AssertionError(f"{label or collection.name}: COLLSCAN in plan {stages}")
+    if sort and "SORT" in stages:
+        raise AssertionError(f"{label or collection.name}: in-memory SORT in plan {stages}")
+    return stages
+
+
+class QueryRecorder(monitoring.CommandListener):
+    """Pass as event_listeners=[recorder] to a client; collects each distinct find it sends"""
+
+    def __init__(self):
+        self.queries = {}
+
+    def started(self, event):
+        if event.command_name != "find":
+            return
+        command = event.command
+        sort = list(command.get("sort", {}).items()) or None
+        query = (command["find"], command.get("filter", {}), sort, command.get("collation"))
+        # One entry per shape; repr is good enough to tell filters apart
+        self.queries.setdefault(repr(query), query)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def check_recorded_queries(database, recorder: QueryRecorder) -> list:
+    """Explain every find the recorder saw; returns a list of failure messages"""
+    failures = []
+    for collection_name, query, sort, collation in recorder.queries.values():
+        label = f"{collection_name} {query} sort={sort}"
+        try:
+            await assert_no_collscan(database[collection_name], query, sort, label, collation)
+        except AssertionError as e:
+            failures.append(str(e))
+    return failures
+
+
+async def check_service_queries(database) -> list:
+    """Explain every SERVICE_QUERIES entry; returns a list of failure messages"""
+    failures = []
+    for label, collection_name, query, sort, *options in SERVICE_QUERIES:
+        collation = options[0] if options else None
+        try:
+            await assert_no_collscan(database[collection_name], query, sort, label, collation)
+        except AssertionError as e:
+            failures.append(str(e))
+    return failures
+
+
+async def _main(db_name: str):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.config.settings import settings
+    from app.db.indexes import ensure_indexes
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    database = client[db_name]
+    try:
+        await ensure_indexes(database)
+        failures = await check_service_queries(database)
+    finally:
+        client.close()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(SERVICE_QUERIES) - len(failures)}/{len(SERVICE_QUERIES)} queries use an index.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if any service query plans a collection scan")
+    parser.add_argument("--db", default="tapp_plan_check", help="Scratch database to check against")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.db)))
@@ -0,0 +1,15 @@
+from enum import Enum
+
+class CreatorSort(str, Enum):
+    RELEVANCE = "relevance"
+    SUBSCRIBERS = "subscribers"
+    ENGAGEMENT = "engagement"
+    GROWTH = "growth"
+
+# Field each sort orders by (descending, ties broken by _id). Every one is
+# backed by compound indexes in app/db/indexes.py, alone and after genre/region.
+SORT_FIELDS = {
+    CreatorSort.SUBSCRIBERS: "subscribers",
+    CreatorSort.ENGAGEMENT: "engagement_rate",
+    CreatorSort.GROWTH: "subscriber_growth_rate",
+}
@@ -1,22 +1,49 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from app.discover.service import DiscoverService
+from app.discover.models import CreatorSort
+from app.creators.models import CreatorProfile
+from app.brands.models import BrandProfile
+from app.utils.fields import Fields, FieldSelector
 from typing import Optional
 
 router = APIRouter()
 service = DiscoverService()
+# Result lists leave out the demographics blob unless it is asked for in ?fields=
+creator_fields = FieldSelector(CreatorProfile, exclude={"audience_demographics"})
+brand_fields = FieldSelector(BrandProfile)
 
 @router.get("/creators")
 async def discover_creators(
     genre: Optional[str] = None,
     region: Optional[str] = None,
     search: Optional[str] = None,
-    min_subs: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 20,
-    sort_by: Optional[str] = "relevance"
+    min_subs: Optional[int] = Query(None, ge=0),
+    max_subs: Optional[int] = Query(None, ge=0),
+    min_engagement: Optional[float] = None,
+    max_engagement: Optional[float] = None,
+    min_avg_views: Optional[float] = None,
+    max_avg_views: Optional[float] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort_by: CreatorSort = CreatorSort.RELEVANCE,
+    include_facets: bool = False,
+    fields: Fields = Depends(creator_fields)
 ):
-    return await service.search_creators(genre, region, search, min_subs, skip, limit)
+    """Search creators. genre/region match case-insensitively; sort_by is one of
+    relevance, subscribers, engagement or growth (highest first).
+    With include_facets=true the response also carries counts per genre,
+    region, subscriber bucket and performance trend.
+    fields=display_name,avatar_url,subscribers returns only those fields."""
+    page = await service.search_creators(
+        genre, region, search, min_subs, limit, cursor, include_facets, sort_by,
+        max_subs, min_engagement, max_engagement, min_avg_views, max_avg_views, fields.projection
+    )
+    return fields.page(page)
 
 @router.get("/brands")
-async def discover_brands():
-    return await service.search_brands()
+async def discover_brands(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Fields = Depends(brand_fields)
+):
+    return fields.page(await service.search_brands(limit, cursor, fields.projection))
@@ -0,0 +1,297 @@
+"""
+In-process trigram index over creator text fields.
+
+Substring queries intersect trigram posting lists and verify the hits, with
+display-name matches ranked ahead of bio/genre matches. Misspelt queries are
+corrected word by word against the indexed vocabulary (edit distance 1-2)
+before looking up documents. Work stops as soon as enough hits are found, so
+a search costs about the same whatever the collection size; Mongo is only
+used to hydrate the ids of the page being returned.
+
+The index lives in each API worker. It is built from the creators collection
+at startup and updated by CreatorService on create/update, so with several
+workers a profile edit shows up in other workers' search results after their
+next restart or rebuild. The build runs in a thread into a separate index that
+is swapped in when complete, with writes made meanwhile replayed on top.
+"""
+import asyncio
+import re
+from typing import Dict, List, Optional, Set
+
+TEXT_FIELDS = ("display_name", "bio", "primary_genre")
+FILTER_FIELDS = ("primary_genre", "region")
+
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\w+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _word_grams(text: str) -> Set[str]:
+    """Padded grams marking word starts, so 1-2 character queries can match prefixes"""
+    grams = set()
+    for word in text.split(" "):
+        if word:
+            padded = f"  {word}"
+            grams.add(padded[:3])
+            grams.add(padded[1:4])
+    return grams
+
+
+def _grams(text: str) -> Set[str]:
+    return _trigrams(text) | _word_grams(text)
+
+
+def _query_grams(q: str) -> Set[str]:
+    if len(q) < 3:
+        padded = "  " + q.split(" ")[0]
+        return {padded[:3], padded[1:4]} if len(padded) > 3 else {padded}
+    return _trigrams(q)
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (transpositions count as one edit), capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.ready = False
+        # While a rebuild runs: doc id -> latest doc written (None = removed), replayed after the swap
+        self._pending: Optional[Dict[str, Optional[dict]]] = None
+
+        # trigram -> doc numbers, for all text and for display names alone
+        self._postings: Dict[str, Set[int]] = {}
+        self._name_postings: Dict[str, Set[int]] = {}
+        # word -> doc numbers, and (trigram, word length) -> words, for typo correction
+        self._word_docs: Dict[str, Set[int]] = {}
+        self._vocab: Dict[tuple, Set[str]] = {}
+
+        self._ids: List[Optional[str]] = []
+        self._numbers: Dict[str, int] = {}
+        self._texts: List[Optional[str]] = []
+        self._names: List[Optional[str]] = []
+        self._filters: List[Optional[tuple]] = []
+        self._free: List[int] = []
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def add(self, doc: dict):
+        """Index (or re-index) a creator document"""
+        if self._pending is not None:
+            self._pending[doc["_id"]] = {f: doc.get(f) for f in ("_id", *TEXT_FIELDS, *FILTER_FIELDS)}
+        self._add(doc)
+
+    def remove(self, doc_id: str):
+        if self._pending is not None:
+            self._pending[doc_id] = None
+        self._remove(doc_id)
+
+    def _add(self, doc: dict):
+        doc_id = doc["_id"]
+        if doc_id in self._numbers:
+            self._remove(doc_id)
+
+        text = _normalize(" | ".join(str(doc.get(f) or "") for f in TEXT_FIELDS))
+        name = _normalize(str(doc.get("display_name") or ""))
+        number = self._free.pop() if self._free else len(self._ids)
+        if number == len(self._ids):
+            self._ids.append(None)
+            self._texts.append(None)
+            self._names.append(None)
+            self._filters.append(None)
+        self._ids[number] = doc_id
+        self._texts[number] = text
+        self._names[number] = name
+        self._filters[number] = tuple(_normalize(str(doc.get(f) or "")) for f in FILTER_FIELDS)
+        self._numbers[doc_id] = number
+
+        for gram in _grams(text):
+            self._postings.setdefault(gram, set()).add(number)
+        for gram in _grams(name):
+            self._name_postings.setdefault(gram, set()).add(number)
+        for word in set(_WORD.findall(text)):
+            docs = self._word_docs.get(word)
+            if docs is None:
+                docs = self._word_docs[word] = set()
+                for gram in _trigrams(f" {word} "):
+                    self._vocab.setdefault((gram, len(word)), set()).add(word)
+            docs.add(number)
+
+    def _remove(self, doc_id: str):
+        number = self._numbers.pop(doc_id, None)
+        if number is None:
+            return
+        text = self._texts[number]
+        _discard(self._postings, _grams(text), number)
+        _discard(self._name_postings, _grams(self._names[number]), number)
+        for word in set(_WORD.findall(text)):
+            docs = self._word_docs.get(word)
+            if docs is not None:
+                docs.discard(number)
+                if not docs:
+                    del self._word_docs[word]
+                    _discard(self._vocab, {(g, len(word)) for g in _trigrams(f" {word} ")}, word)
+
+        self._ids[number] = None
+        self._texts[number] = None
+        self._names[number] = None
+        self._filters[number] = None
+        self._free.append(number)
+
+    def search(self, query: str, genre: Optional[str] = None, region: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """
+        Ids of up to `limit` creators matching query, best first: display-name
+        substring hits, then other substring hits, then typo-corrected hits.
+        genre/region are case-insensitive equality filters, like the Mongo path.
+        """
+        q = _normalize(query)
+        if not q:
+            return []
+        wanted = [_normalize(v) if v else None for v in (genre, region)]
+
+        def allowed(number: int) -> bool:
+            values = self._filters[number]
+            return all(w is None or w == v for w, v in zip(wanted, values))
+
+        results: List[str] = []
+        seen: Set[int] = set()
+        for postings, texts in ((self._name_postings, self._names), (self._postings, self._texts)):
+            self._collect_substring(q, postings, texts, allowed, results, seen, limit)
+            if len(results) >= limit:
+                return results
+
+        if len(q) >= 4:
+            self._collect_fuzzy(q, allowed, results, seen, limit)
+        return results
+
+    def _collect_substring(self, q, postings_map, texts, allowed, results, seen, limit):
+        postings = [postings_map.get(g) for g in _query_grams(q)]
+        if not all(postings):
+            return
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+        verify = len(q) >= 3
+        for n in smallest:
+            if n in seen or not all(n in p for p in others):
+                continue
+            if (verify and q not in texts[n]) or not allowed(n):
+                continue
+            results.append(self._ids[n])
+            seen.add(n)
+            if len(results) >= limit:
+                return
+
+    def _corrections(self, token: str) -> List[Set[int]]:
+        """Posting sets of vocabulary words within a small edit distance of token, closest first"""
+        if len(token) < 4:
+            return [self._word_docs[token]] if token in self._word_docs else []
+        max_edits = 1 if len(token) <= 6 else 2
+        grams = _trigrams(f" {token} ")
+        needed = max(1, len(grams) - 3 * max_edits)
+
+        shared: Dict[str, int] = {}
+        for length in range(len(token) - max_edits, len(token) + max_edits + 1):
+            for gram in grams:
+                for word in self._vocab.get((gram, length), ()):
+                    shared[word] = shared.get(word, 0) + 1
+
+        scored = []
+        for word, count in shared.items():
+            if count >= needed:
+                distance = _edit_distance(token, word, max_edits)
+                if distance <= max_edits:
+                    scored.append((distance, word))
+        scored.sort()
+        return [self._word_docs[word] for _, word in scored]
+
+    def _collect_fuzzy(self, q, allowed, results, seen, limit):
+        tokens = _WORD.findall(q)
+        per_token = [self._corrections(t) for t in tokens]
+        if not per_token or not all(per_token):
+            return
+        # Walk the rarest token's matches and require every other token to match too
+        order = sorted(range(len(tokens)), key=lambda i: sum(len(s) for s in per_token[i]))
+        lead, rest = per_token[order[0]], [per_token[i] for i in order[1:]]
+        for docs in lead:
+            for n in docs:
+                if n in seen or not all(any(n in s for s in sets) for sets in rest) or not allowed(n):
+                    continue
+                results.append(self._ids[n])
+                seen.add(n)
+                if len(results) >= limit:
+                    return
+
+
+def _discard(mapping: dict, keys, value):
+    for key in keys:
+        members = mapping.get(key)
+        if members is not None:
+            members.discard(value)
+            if not members:
+                del mapping[key]
+
+
+creator_search_index = TrigramIndex()
+
+
+async def build_creator_index(database, index: TrigramIndex = creator_search_index, batch_size: int = 5000):
+    """
+    Rebuild the index from every creator. Mongo is read on the event loop, but
+    the indexing (CPU-bound, minutes for 1M creators) runs in a worker thread
+    on a fresh TrigramIndex, so requests keep being served from the current
+    one. Writes that land meanwhile are journaled and replayed after the swap,
+    so a stale cursor document never wins over a newer profile edit.
+    """
+    projection = {f: 1 for f in set(TEXT_FIELDS) | set(FILTER_FIELDS)}
+    fresh = TrigramIndex()
+    index._pending = {}
+    try:
+        cursor = database.creators.find({}, projection).batch_size(batch_size)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                await asyncio.to_thread(_add_all, fresh, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(_add_all, fresh, batch)
+
+        # No awaits from here on: the swap and replay are atomic for the event loop
+        pending, index._pending = index._pending, None
+        for doc_id, doc in pending.items():
+            if doc is None:
+                fresh._remove(doc_id)
+            else:
+                fresh._add(doc)
+        index.__dict__.update(fresh.__dict__)
+    finally:
+        index._pending = None
+    index.ready = True
+    return len(index)
+
+
+def _add_all(index: TrigramIndex, docs: list):
+    for doc in docs:
+        index._add(doc)
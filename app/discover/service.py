@@ -1,35 +1,185 @@
+import asyncio
 from app.db.mongo import get_database
+from app.db.indexes import CASE_INSENSITIVE
+from app.config.settings import settings
+from app.discover.models import CreatorSort, SORT_FIELDS
+from app.discover.search_index import creator_search_index
+from app.utils.cache import TTLCache
+from app.utils.pagination import paginate, encode_cursor, decode_cursor
+from fastapi import HTTPException
 from typing import Optional
 
+SUBSCRIBER_BUCKETS = [0, 1_000, 10_000, 100_000, 1_000_000, 10**12]
+SUBSCRIBER_BUCKET_LABELS = {0: "0-1K", 1_000: "1K-10K", 10_000: "10K-100K", 100_000: "100K-1M", 1_000_000: "1M+"}
+
+# Facet counts per filter combination; results pages are never cached
+facet_cache = TTLCache(max_size=settings.DISCOVER_FACET_CACHE_SIZE, ttl_seconds=settings.DISCOVER_FACET_CACHE_TTL_SECONDS)
+
+def facet_stages() -> dict:
+    """$facet sub-pipelines producing the counts shown next to discovery filters"""
+    return {
+        "genre": [{"$sortByCount": "$primary_genre"}],
+        "region": [{"$sortByCount": "$region"}],
+        "performance_trend": [{"$sortByCount": "$performance_trend"}],
+        "subscribers": [{"$bucket": {
+            "groupBy": "$subscribers",
+            "boundaries": SUBSCRIBER_BUCKETS,
+            "default": "unknown",
+            "output": {"count": {"$sum": 1}}
+        }}]
+    }
+
+def format_facets(raw: dict) -> dict:
+    facets = {
+        name: [{"value": row["_id"], "count": row["count"]} for row in raw.get(name, [])]
+        for name in ("genre", "region", "performance_trend")
+    }
+    facets["subscribers"] = [
+        {"value": SUBSCRIBER_BUCKET_LABELS.get(row["_id"], row["_id"]), "count": row["count"]}
+        for row in raw.get("subscribers", [])
+    ]
+    return facets
+
+def range_filters(ranges: dict) -> dict:
+    """{"subscribers": (min, max), ...} -> Mongo range conditions, skipping open ends"""
+    query = {}
+    for field, (low, high) in ranges.items():
+        condition = {}
+        if low is not None:
+            condition["$gte"] = low
+        if high is not None:
+            condition["$lte"] = high
+        if condition:
+            query[field] = condition
+    return query
+
 class DiscoverService:
-    async def search_creators(self, 
-                            genre: Optional[str] = None, 
+    async def search_creators(self,
+                            genre: Optional[str] = None,
                             region: Optional[str] = None,
                             search: Optional[str] = None,
                             min_subs: Optional[int] = None,
-                            skip: int = 0,
-                            limit: int = 20):
+                            limit: int = 20,
+                            cursor: Optional[str] = None,
+                            include_facets: bool = False,
+                            sort_by: CreatorSort = CreatorSort.RELEVANCE,
+                            max_subs: Optional[int] = None,
+                            min_engagement: Optional[float] = None,
+                            max_engagement: Optional[float] = None,
+                            min_avg_views: Optional[float] = None,
+                            max_avg_views: Optional[float] = None,
+                            projection: Optional[dict] = None):
+        """projection (from ?fields=) limits what is read for the returned page"""
         db = await get_database()
-        
-        query = {}
-        
-        # Add filters
+        ranges = range_filters({
+            "subscribers": (min_subs, max_subs),
+            "engagement_rate": (min_engagement, max_engagement),
+            "avg_views_per_video": (min_avg_views, max_avg_views)
+        })
+        facet_key = tuple((v or "").strip().lower() for v in (genre, region, search)) + (repr(sorted(ranges.items())),)
+        facets = facet_cache.get(facet_key) if include_facets else None
+
+        if search and creator_search_index.ready:
+            search_page = self._search_indexed(db, search, genre, region, ranges, sort_by, limit, cursor, projection)
+        else:
+            search_page = self._search_mongo(db, genre, region, search, ranges, sort_by, limit, cursor, projection)
+        if include_facets and facets is None:
+            # Separate queries: the page keeps its index, the counts cover the whole match set
+            page, facets = await asyncio.gather(search_page, self._facet_counts(db, genre, region, search, ranges))
+            facet_cache.set(facet_key, facets)
+        else:
+            page = await search_page
+
+        page.setdefault("results_truncated", False)
+        if include_facets:
+            page["facets"] = facets["counts"]
+            page["facets_truncated"] = facets["truncated"]
+        return page
+
+    def _mongo_query(self, genre, region, search, ranges) -> dict:
+        # Equality under a case-insensitive collation so the discover_* compound indexes apply
+        query = dict(ranges)
         if genre:
-            query["primary_genre"] = {"$regex": genre, "$options": "i"}
+            query["primary_genre"] = genre
         if region:
-            query["region"] = {"$regex": region, "$options": "i"}
-        
-        # Add text search
+            query["region"] = region
+
+        # Add text search (only used until the trigram index is ready)
         if search:
             query["$or"] = [
                 {"display_name": {"$regex": search, "$options": "i"}},
                 {"bio": {"$regex": search, "$options": "i"}},
                 {"primary_genre": {"$regex": search, "$options": "i"}}
             ]
-        
-        creators = await db.creators.find(query).skip(skip).limit(limit).to_list(length=limit)
-        return creators
+        return query
+
+    async def _facet_counts(self, db, genre, region, search, ranges) -> dict:
+        """Facet counts over every match. With the search index, matches beyond
+        DISCOVER_FACET_MAX_MATCHES are not counted and truncated is set."""
+        truncated = False
+        collation = CASE_INSENSITIVE
+        if search and creator_search_index.ready:
+            cap = settings.DISCOVER_FACET_MAX_MATCHES
+            ids = creator_search_index.search(search, genre, region, limit=cap + 1)
+            truncated = len(ids) > cap
+            query = {"_id": {"$in": ids[:cap]}, **ranges}
+            collation = None
+        else:
+            query = self._mongo_query(genre, region, search, ranges)
+        raw = await db.creators.aggregate(
+            [{"$match": query}, {"$facet": facet_stages()}], collation=collation
+        ).to_list(length=1)
+        return {"counts": format_facets(raw[0] if raw else {}), "truncated": truncated}
+
+    async def _search_mongo(self, db, genre, region, search, ranges, sort_by, limit, cursor, projection=None):
+        """Filter and sort in Mongo"""
+        query = self._mongo_query(genre, region, search, ranges)
+        # Without a ranked text match, relevance means most-subscribed first
+        sort = [(SORT_FIELDS.get(sort_by, "subscribers"), -1), ("_id", -1)]
+        return await paginate(db.creators, query, sort, limit, cursor, projection, collation=CASE_INSENSITIVE)
+
+    async def _search_indexed(self, db, search, genre, region, ranges, sort_by, limit, cursor, projection=None):
+        """
+        Match in the in-process trigram index; Mongo applies ranges/sorts and
+        hydrates the page. Only the CREATOR_SEARCH_MAX_RESULTS best text
+        matches are considered; results_truncated is set when there were more,
+        since a sort other than relevance then only orders that subset.
+        """
+        cap = settings.CREATOR_SEARCH_MAX_RESULTS
+        if sort_by != CreatorSort.RELEVANCE:
+            # Bounded candidate set from the index, then a normal keyset page over it
+            ranked = creator_search_index.search(search, genre, region, limit=cap + 1)
+            query = {"_id": {"$in": ranked[:cap]}, **ranges}
+            page = await paginate(db.creators, query, [(SORT_FIELDS[sort_by], -1), ("_id", -1)], limit, cursor, projection)
+            page["results_truncated"] = len(ranked) > cap
+            return page
+
+        offset = 0
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            offset = values[0]
+
+        # Only rank as far as this page (plus one to know if there is a next page), unless ranges filter the matches
+        wanted = cap + 1 if ranges else min(offset + limit + 1, cap + 1)
+        ranked = creator_search_index.search(search, genre, region, limit=wanted)
+        truncated = len(ranked) > cap
+        ranked = ranked[:cap]
+        if ranges:
+            in_range = await db.creators.find({"_id": {"$in": ranked}, **ranges}, {"_id": 1}).to_list(length=len(ranked))
+            keep = {doc["_id"] for doc in in_range}
+            ranked = [i for i in ranked if i in keep]
+        page_ids = ranked[offset:offset + limit]
+
+        docs = await db.creators.find({"_id": {"$in": page_ids}}, projection).to_list(length=len(page_ids))
+        by_id = {doc["_id"]: doc for doc in docs}
+        return {
+            "items": [by_id[i] for i in page_ids if i in by_id],
+            "next_cursor": encode_cursor([offset + limit]) if len(ranked) > offset + limit else None,
+            "results_truncated": truncated
+        }
 
-    async def search_brands(self):
+    async def search_brands(self, limit: int = 20, cursor: Optional[str] = None, projection: Optional[dict] = None):
         db = await get_database()
-        return await db.brands.find().to_list(length=50)
+        return await paginate(db.brands, {}, [("_id", 1)], limit, cursor, projection)
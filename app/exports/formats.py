@@ -0,0 +1,176 @@
+"""
+Row writers for exports. Each turns batches of Mongo documents into bytes
+as they arrive, so an export never holds more than one batch in memory.
+Arrow IPC and Parquet need pyarrow, which is optional.
+
+A complete export is recognisable: NDJSON ends with a {"_export": "end"}
+line carrying the row count, an Arrow stream with its end-of-stream marker
+and Parquet with its footer. CSV has no such marker.
+"""
+import abc
+import csv
+import io
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from app.utils.metrics import metrics
+
+
+def _cell(value, kind):
+    """
+    Coerce a Mongo value to its column type; nested values become JSON text.
+    A value that doesn't fit its column (a string in a numeric field, say)
+    is exported as null rather than failing the rest of the export.
+    """
+    if value is None:
+        return None
+    if kind is dict:
+        return json.dumps(value, default=str)
+    if kind is datetime:
+        return value if isinstance(value, datetime) else None
+    try:
+        return kind(value)
+    except (TypeError, ValueError, OverflowError):
+        metrics.inc("exports.bad_values")
+        return None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class NdjsonWriter:
+    content_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+
+    def begin(self) -> bytes:
+        return b""
+
+    def write(self, docs: list) -> bytes:
+        lines = (json.dumps({c: doc.get(c) for c in self.columns}, default=_json_default) for doc in docs)
+        return "".join(line + "\n" for line in lines).encode()
+
+    def end(self, rows: int) -> bytes:
+        return (json.dumps({"_export": "end", "rows": rows}) + "\n").encode()
+
+
+class CsvWriter:
+    content_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        self._csv.writerow(self.columns)
+        return self._drain()
+
+    def write(self, docs: list) -> bytes:
+        for doc in docs:
+            row = (_cell(doc.get(c), kind) for c, kind in self.columns.items())
+            self._csv.writerow(v.isoformat() if isinstance(v, datetime) else v for v in row)
+        return self._drain()
+
+    def end(self, rows: int) -> bytes:
+        return b""
+
+
+class _Chunks(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet records absolute offsets in its footer
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+class _ArrowWriter(abc.ABC):
+    def __init__(self, columns: dict):
+        try:
+            import pyarrow
+        except ImportError:
+            raise HTTPException(status_code=400, detail=f"{self.extension} exports need pyarrow installed on the server")
+        self.pa = pyarrow
+        self.columns = columns
+        types = {str: pyarrow.string(), int: pyarrow.int64(), float: pyarrow.float64(),
+                 datetime: pyarrow.timestamp("ms"), dict: pyarrow.string()}
+        self.schema = pyarrow.schema([(c, types[kind]) for c, kind in columns.items()])
+        self._sink = _Chunks()
+        self._writer = None
+
+    @abc.abstractmethod
+    def _open(self):
+        """Create the pyarrow writer on self._sink"""
+
+    def begin(self) -> bytes:
+        self._writer = self._open()
+        return self._sink.drain()
+
+    def write(self, docs: list) -> bytes:
+        data = {c: [_cell(doc.get(c), kind) for doc in docs] for c, kind in self.columns.items()}
+        self._write_batch(self.pa.RecordBatch.from_pydict(data, schema=self.schema))
+        return self._sink.drain()
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+
+    def end(self, rows: int) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class ArrowWriter(_ArrowWriter):
+    content_type = "application/vnd.apache.arrow.stream"
+    extension = "arrow"
+
+    def _open(self):
+        return self.pa.ipc.new_stream(self._sink, self.schema)
+
+
+class ParquetWriter(_ArrowWriter):
+    content_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def _open(self):
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(self._sink, self.schema)
+
+    def _write_batch(self, batch):
+        # One row group per batch
+        self._writer.write_table(self.pa.Table.from_batches([batch]))
+
+
+WRITERS = {
+    "ndjson": NdjsonWriter,
+    "csv": CsvWriter,
+    "arrow": ArrowWriter,
+    "parquet": ParquetWriter,
+}
@@ -0,0 +1,41 @@
+import hmac
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.config.settings import settings
+from app.exports.service import ExportService
+
+router = APIRouter()
+service = ExportService()
+
+# Query params that are not equality filters
+EXPORT_PARAMS = {"format", "fields", "from", "to", "after", "limit"}
+
+def require_export_key(x_export_key: Optional[str] = Header(None)):
+    """Exports cover every user's data, so they take a separate key rather than a user token"""
+    if not settings.EXPORT_API_KEY:
+        raise HTTPException(status_code=403, detail="Exports are disabled")
+    if not x_export_key or not hmac.compare_digest(x_export_key, settings.EXPORT_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid export key")
+
+@router.get("/{dataset}", dependencies=[Depends(require_export_key)])
+async def export_dataset(
+    dataset: str,
+    request: Request,
+    format: str = Query("ndjson", description="ndjson, csv, arrow or parquet"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns (default: all)"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    after: Optional[str] = Query(None, description="Resume after this _id (rows come in _id order)"),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Stream a dataset; any other query param is an equality filter (e.g. ?social_account_id=...)"""
+    filters = {k: v for k, v in request.query_params.items() if k not in EXPORT_PARAMS}
+    names = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    source, columns, query, writer = service.prepare(dataset, format, names, filters, start, end, after)
+    return StreamingResponse(
+        service.stream(source, columns, query, writer, limit),
+        media_type=writer.content_type,
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{writer.extension}"'}
+    )
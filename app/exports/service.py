@@ -0,0 +1,119 @@
+"""
+Bulk exports for BI: creators, videos, channel snapshots and investments,
+streamed from a Mongo cursor in _id order. Filters and the column selection
+go to Mongo; the response is written batch by batch, so memory stays flat
+however large the export. A cut-off export resumes with ?after=<last _id>.
+"""
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import HTTPException
+from pymongo import ReadPreference
+from app.config.settings import settings
+from app.db.mongo import get_database
+from app.exports.formats import WRITERS
+from app.utils.metrics import metrics
+
+
+class Dataset:
+    def __init__(self, collection: str, columns: Dict[str, type], filters: tuple = (), date_field: str = None):
+        self.collection = collection
+        # column -> str/int/float/datetime, or dict for nested values (JSON text in CSV/Arrow)
+        self.columns = columns
+        # equality filters accepted as query params
+        self.filters = filters
+        # filtered by ?from=&to= when set
+        self.date_field = date_field
+
+
+DATASETS = {
+    "creators": Dataset("creators", {
+        "_id": str, "user_id": str, "display_name": str, "primary_genre": str, "region": str,
+        "subscribers": int, "total_videos": int, "total_views": int, "ad_revenue": float,
+        "avg_views_per_video": float, "engagement_rate": float, "subscriber_growth_rate": float,
+        "posting_frequency": float, "performance_trend": str, "audience_demographics": dict,
+        "analytics_status": str,
+    }, filters=("primary_genre", "region", "analytics_status")),
+    "videos": Dataset("videos", {
+        "_id": str, "social_account_id": str, "external_video_id": str, "title": str,
+        "published_at": datetime, "views": int, "likes": int, "comments_count": int, "shares": int,
+        "like_rate": float, "comment_rate": float,
+    }, filters=("social_account_id",), date_field="published_at"),
+    "channel_snapshots": Dataset("channel_snapshots", {
+        "_id": str, "social_account_id": str, "date": datetime, "subscribers": int, "views": int,
+        "watch_time": int, "estimated_revenue": float, "engagement_rate": float,
+    }, filters=("social_account_id",), date_field="date"),
+    "investments": Dataset("investments", {
+        "_id": str, "project_id": str, "investor_id": str, "amount": float, "status": str,
+        "created_at": datetime,
+    }, filters=("project_id", "investor_id", "status"), date_field="created_at"),
+}
+
+
+class ExportService:
+    def prepare(self, name: str, format: str = "ndjson", fields: list = None, filters: dict = None,
+                start: datetime = None, end: datetime = None, after: str = None):
+        """Validate an export request; returns (dataset, columns, query, writer)"""
+        dataset = DATASETS.get(name)
+        if not dataset:
+            raise HTTPException(status_code=404, detail=f"Unknown export {name!r}; one of {', '.join(DATASETS)}")
+        if format not in WRITERS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(WRITERS)}")
+
+        columns = dataset.columns
+        if fields:
+            unknown = [f for f in fields if f not in columns]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+            # _id always comes first so any row can be used to resume
+            columns = {c: kind for c, kind in columns.items() if c == "_id" or c in fields}
+
+        filters = filters or {}
+        unknown = [f for f in filters if f not in dataset.filters]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown filters: {', '.join(unknown)}")
+        query = dict(filters)
+        if start or end:
+            if not dataset.date_field:
+                raise HTTPException(status_code=400, detail=f"{name} has no date range filter")
+            date_range = {}
+            if start:
+                date_range["$gte"] = start
+            if end:
+                date_range["$lt"] = end
+            query[dataset.date_field] = date_range
+        if after:
+            query["_id"] = {"$gt": after}
+
+        return dataset, columns, query, WRITERS[format](columns)
+
+    async def stream(self, dataset: Dataset, columns: dict, query: dict, writer, limit: Optional[int] = None):
+        """Yield the export as bytes, one cursor batch at a time"""
+        db = await get_database()
+        # Exports are long scans; let a replica set serve them from a secondary
+        collection = db[dataset.collection].with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+        cursor = collection.find(query, {c: 1 for c in columns}).sort("_id", 1).batch_size(settings.EXPORT_BATCH_SIZE)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        yield writer.begin()
+        batch = []
+        rows = 0
+        try:
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= settings.EXPORT_BATCH_SIZE:
+                    rows += len(batch)
+                    yield writer.write(batch)
+                    batch = []
+            if batch:
+                rows += len(batch)
+                yield writer.write(batch)
+        except Exception:
+            # The 200 is already sent; ending without the writer's end marker
+            # (and with the connection dropped mid-body) is how the client
+            # learns the export is incomplete
+            metrics.inc(f"exports.{dataset.collection}.failed")
+            raise
+        finally:
+            metrics.inc(f"exports.{dataset.collection}.rows", rows)
+        yield writer.end(rows)
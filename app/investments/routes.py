@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from app.auth.routes import get_current_user
 from app.investments.service import InvestmentService
 from app.investments.models import Investment, InvestmentCreate
-from typing import List
+from app.utils.pagination import Page
+from app.utils.fields import Fields, FieldSelector
+from typing import Optional
 
 router = APIRouter()
 service = InvestmentService()
+investment_fields = FieldSelector(Investment)
 
-@router.get("/me", response_model=List[Investment])
-async def get_my_investments(current_user: dict = Depends(get_current_user)):
-    return await service.get_my_investments(current_user["_id"])
+@router.get("/me", response_model=Page[Investment])
+async def get_my_investments(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Fields = Depends(investment_fields),
+    current_user: dict = Depends(get_current_user)
+):
+    page = await service.get_my_investments(current_user["_id"], limit, cursor, fields.projection)
+    return fields.page(page)
@@ -1,11 +1,29 @@
 from app.db.mongo import get_database
 from app.investments.models import InvestmentCreate
+from app.utils.pagination import paginate
+from fastapi import HTTPException
+import math
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+
+# Investment amounts are in rupees; counters within half a paisa of the
+# recomputed sum are float rounding, not drift
+AMOUNT_TOLERANCE = 0.005
 
 class InvestmentService:
     async def invest(self, user_id: str, project_id: str, investment: InvestmentCreate):
         db = await get_database()
+        # Keep the project's funding counters current with a single atomic $inc,
+        # so project reads never have to scan the investments collection.
+        # funding_updated_at tells the reconciler the insert below may still be in flight.
+        result = await db.projects.update_one(
+            {"_id": project_id},
+            {"$inc": {"total_invested": investment.amount, "investor_count": 1},
+             "$set": {"funding_updated_at": datetime.utcnow()}}
+        )
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Project not found")
+
         data = {
             "_id": str(uuid.uuid4()),
             "project_id": project_id,
@@ -14,9 +32,93 @@ class InvestmentService:
             "status": "SUCCESS",
             "created_at": datetime.utcnow()
         }
-        await db.investments.insert_one(data)
+        try:
+            await db.investments.insert_one(data)
+        except Exception:
+            # Roll the counters back; reconcile_funding_counters catches anything this misses
+            await db.projects.update_one(
+                {"_id": project_id},
+                {"$inc": {"total_invested": -investment.amount, "investor_count": -1},
+                 "$set": {"funding_updated_at": datetime.utcnow()}}
+            )
+            raise
         return data
 
-    async def get_my_investments(self, user_id: str):
+    async def get_my_investments(self, user_id: str, limit: int = 20, cursor: str = None, projection: dict = None):
         db = await get_database()
-        return await db.investments.find({"investor_id": user_id}).to_list(length=100)
+        return await paginate(db.investments, {"investor_id": user_id}, [("created_at", -1), ("_id", -1)], limit, cursor, projection)
+
+    async def reconcile_funding_counters(self, batch_size: int = 500, fix: bool = True,
+                                         settle_seconds: int = 60, max_drift: int = 100):
+        """
+        Recompute project funding counters from investments and report drift.
+        Projects whose counters moved in the last `settle_seconds` are left
+        alone: invest() bumps the counters before its investment is inserted,
+        so their investments may not all be visible yet. Only the first
+        `max_drift` drifted projects are listed; all of them are counted.
+        """
+        db = await get_database()
+        checked = 0
+        drifted = 0
+        settling = 0
+        drift = []
+        last_id = None
+
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            settled_before = datetime.utcnow() - timedelta(seconds=settle_seconds)
+            projects = await db.projects.find(
+                query, {"total_invested": 1, "investor_count": 1, "funding_updated_at": 1}
+            ).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not projects:
+                break
+            last_id = projects[-1]["_id"]
+
+            project_ids = [p["_id"] for p in projects]
+            summaries = await db.investments.aggregate([
+                {"$match": {"project_id": {"$in": project_ids}}},
+                {"$group": {"_id": "$project_id", "total": {"$sum": "$amount"}, "count": {"$sum": 1}}}
+            ]).to_list(length=None)
+            actual = {s["_id"]: s for s in summaries}
+
+            for project in projects:
+                updated_at = project.get("funding_updated_at")
+                if updated_at is not None and updated_at >= settled_before:
+                    settling += 1
+                    continue
+                summary = actual.get(project["_id"], {})
+                expected_total = round(summary.get("total", 0), 2)
+                expected_count = summary.get("count", 0)
+                stored_total = project.get("total_invested")
+                stored_count = project.get("investor_count")
+                if _same_amount(stored_total, expected_total) and stored_count == expected_count:
+                    continue
+                drifted += 1
+                if len(drift) < max_drift:
+                    drift.append({
+                        "project_id": project["_id"],
+                        "stored_total_invested": stored_total,
+                        "actual_total_invested": expected_total,
+                        "stored_investor_count": stored_count,
+                        "actual_investor_count": expected_count
+                    })
+                if fix:
+                    # Only overwrite if no investment started since we read the counters
+                    await db.projects.update_one(
+                        {"_id": project["_id"], "total_invested": stored_total,
+                         "investor_count": stored_count, "funding_updated_at": updated_at},
+                        {"$set": {"total_invested": expected_total, "investor_count": expected_count}}
+                    )
+            checked += len(projects)
+
+        return {
+            "projects_checked": checked,
+            "projects_drifted": drifted,
+            "projects_settling": settling,
+            "fixed": fix,
+            "drift": drift,
+            "drift_truncated": drifted > len(drift)
+        }
+
+def _same_amount(stored, expected) -> bool:
+    return isinstance(stored, (int, float)) and math.isclose(stored, expected, abs_tol=AMOUNT_TOLERANCE)
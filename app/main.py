@@ -1,6 +1,18 @@
-from fastapi import FastAPI # Trigger reload
+from fastapi import Depends, FastAPI, Header, HTTPException # Trigger reload
+import asyncio
+import hmac
+from typing import Optional
 from app.config.settings import settings
 from app.db.mongo import db
+from app.db.indexes import ensure_indexes
+from app.discover.search_index import build_creator_index
+from app.utils.cache import close_caches
+from app.utils.http import http_client
+from app.auth.utils import password_hasher
+from app.auth.revocation import revocation_list
+from app.social.scheduler import sync_scheduler
+from app.workers.analytics_worker import schedule_materialize
+from app.utils.metrics import metrics
 from app.auth.routes import router as auth_router
 from app.users.routes import router as users_router
 from app.creators.routes import router as creators_router
@@ -12,6 +24,7 @@ from app.discover.routes import router as discover_router
 from app.projects.routes import router as projects_router
 from app.investments.routes import router as investments_router
 from app.compatibility.routes import router as compatibility_router
+from app.exports.routes import router as exports_router
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -28,9 +41,37 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_db_client():
     db.connect()
+    http_client.open()
+    if settings.ENSURE_INDEXES_ON_STARTUP:
+        # Creates missing indexes only; changed ones are rebuilt with python -m app.db.indexes --rebuild
+        report = await ensure_indexes(db.db)
+        for label in report["drift"]:
+            print(f"Index out of date (run python -m app.db.indexes --rebuild): {label}")
+        for error in report["errors"]:
+            print(f"Index error: {error}")
+    # Refresh-token revocations: load once, then follow other workers' revocations
+    await revocation_list.load(db.db)
+    app.state.revocation_task = asyncio.create_task(revocation_list.watch(db.db))
+    if settings.CREATOR_SEARCH_INDEX_ENABLED:
+        # Built in the background; discovery uses the Mongo regex path until it is ready
+        app.state.search_index_task = asyncio.create_task(build_creator_index(db.db))
+    if settings.SYNC_SCHEDULER_ENABLED:
+        # Run it in one API worker only (or use python -m app.social.scheduler instead)
+        app.state.sync_scheduler_task = asyncio.create_task(sync_scheduler.run(db.db))
+    if settings.ANALYTICS_SCHEDULER_ENABLED:
+        # One API worker only; the job itself runs in `rq worker analytics`
+        app.state.analytics_scheduler_task = asyncio.create_task(schedule_materialize())
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.revocation_task.cancel()
+    if getattr(app.state, "sync_scheduler_task", None):
+        app.state.sync_scheduler_task.cancel()
+    if getattr(app.state, "analytics_scheduler_task", None):
+        app.state.analytics_scheduler_task.cancel()
+    await close_caches()
+    await http_client.close()
+    password_hasher.close()
     db.close()
 
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
@@ -44,7 +85,19 @@ app.include_router(discover_router, prefix="/discover", tags=["Discover"])
 app.include_router(projects_router, prefix="/projects", tags=["Projects"])
 app.include_router(investments_router, prefix="/investments", tags=["Investments"])
 app.include_router(compatibility_router, prefix="/compatibility", tags=["Compatibility"])
+app.include_router(exports_router, prefix="/exports", tags=["Exports"])
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to TAPP API"}
+
+def require_metrics_key(x_metrics_key: Optional[str] = Header(None)):
+    """Metrics expose internals (queues, upstreams, cache sizes); like exports they take their own key"""
+    if not settings.METRICS_API_KEY:
+        raise HTTPException(status_code=403, detail="Metrics are disabled")
+    if not x_metrics_key or not hmac.compare_digest(x_metrics_key, settings.METRICS_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid metrics key")
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_key)])
+async def read_metrics():
+    return await metrics.snapshot()
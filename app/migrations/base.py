@@ -0,0 +1,161 @@
+"""
+Batch data migrations.
+
+A Migration streams one collection in _id order and turns each document into
+write operations; MigrationRunner applies them with bulk_write, one batch at a
+time, and records the last _id it finished in the `migrations` collection so a
+stopped run resumes where it left off. Writes are throttled to a target ops/sec
+so a migration can run next to production traffic.
+
+A batch whose writes were applied but whose checkpoint was not saved is
+replayed on resume, so each migration's writes must be safe to apply twice
+(guard the update filter on the condition being fixed).
+
+Each run owns its checkpoint through a random owner id; a run whose lease
+was taken over (it stalled for longer than LEASE) stops at its next
+checkpoint instead of writing over the new run's progress.
+"""
+import abc
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# A "running" checkpoint not updated for this long is treated as abandoned
+LEASE = timedelta(minutes=10)
+
+
+class MigrationLeaseLost(RuntimeError):
+    """Another run took over this migration's checkpoint"""
+
+
+class Migration(abc.ABC):
+    name: str = ""
+    collection: str = ""
+    description: str = ""
+
+    def query(self) -> dict:
+        """Documents to visit"""
+        return {}
+
+    def projection(self) -> Optional[dict]:
+        return None
+
+    @abc.abstractmethod
+    def changes(self, doc: dict) -> List:
+        """pymongo write operations (UpdateOne, ...) for one document"""
+
+
+class MigrationRunner:
+    def __init__(self, database, batch_size: int = 500, ops_per_second: float = 0):
+        self.database = database
+        self.batch_size = batch_size
+        self.ops_per_second = ops_per_second
+
+    async def status(self, name: str) -> Optional[dict]:
+        return await self.database.migrations.find_one({"_id": name})
+
+    async def _claim(self, migration: Migration, restart: bool, owner: str) -> dict:
+        """Mark the migration running (fails if another run holds it) and return its checkpoint"""
+        now = datetime.utcnow()
+        fresh = {"last_id": None, "processed": 0, "writes": 0, "modified": 0, "started_at": now, "completed_at": None}
+        update = {"$set": {"status": "running", "owner": owner, "updated_at": now,
+                           "description": migration.description}}
+        if restart:
+            update["$set"].update(fresh)
+        else:
+            update["$setOnInsert"] = fresh
+        try:
+            checkpoint = await self.database.migrations.find_one_and_update(
+                {"_id": migration.name, "$or": [{"status": {"$ne": "running"}}, {"updated_at": {"$lt": now - LEASE}}]},
+                update,
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The document exists but didn't match: someone else is running it
+            raise RuntimeError(f"Migration {migration.name} is already running")
+        return checkpoint
+
+    async def _save(self, migration: Migration, owner: str, fields: dict):
+        """Write checkpoint fields if this run still holds the lease"""
+        result = await self.database.migrations.update_one(
+            {"_id": migration.name, "owner": owner},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}}
+        )
+        if result.matched_count == 0:
+            raise MigrationLeaseLost(f"Migration {migration.name} was taken over by another run")
+
+    async def run(self, migration: Migration, restart: bool = False, dry_run: bool = False, progress=None) -> dict:
+        """Apply a migration from its checkpoint (or from the start). Returns the final checkpoint."""
+        checkpoint = await self.status(migration.name) or {}
+        if checkpoint.get("status") == "completed" and not restart:
+            return checkpoint
+        owner = uuid.uuid4().hex
+        if dry_run:
+            checkpoint = {} if restart else checkpoint
+        else:
+            checkpoint = await self._claim(migration, restart, owner)
+
+        query = migration.query()
+        if checkpoint.get("last_id") is not None:
+            query = {"$and": [query, {"_id": {"$gt": checkpoint["last_id"]}}]}
+        cursor = self.database[migration.collection].find(query, migration.projection())
+        cursor = cursor.sort("_id", 1).batch_size(self.batch_size)
+
+        totals = {k: checkpoint.get(k, 0) for k in ("processed", "writes", "modified")}
+        started = time.monotonic()
+        throttled_writes = 0
+        ops, last_id, seen = [], None, 0
+
+        async def flush():
+            nonlocal ops, seen, throttled_writes
+            modified = 0
+            if ops and not dry_run:
+                result = await self.database[migration.collection].bulk_write(ops, ordered=False)
+                modified = result.modified_count + result.upserted_count
+            totals["processed"] += seen
+            totals["writes"] += len(ops)
+            totals["modified"] += modified
+            if not dry_run:
+                await self._save(migration, owner, {"last_id": last_id, **totals})
+            if progress:
+                progress(migration.name, totals, last_id)
+
+            # Throttle: don't get ahead of ops_per_second since this run started
+            throttled_writes += len(ops)
+            if self.ops_per_second and throttled_writes:
+                ahead = throttled_writes / self.ops_per_second - (time.monotonic() - started)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+            ops, seen = [], 0
+
+        try:
+            async for doc in cursor:
+                ops.extend(migration.changes(doc))
+                last_id = doc["_id"]
+                seen += 1
+                if seen >= self.batch_size or len(ops) >= self.batch_size:
+                    await flush()
+            if seen:
+                await flush()
+        except MigrationLeaseLost:
+            raise
+        except BaseException:
+            if not dry_run:
+                await self.database.migrations.update_one(
+                    {"_id": migration.name, "owner": owner}, {"$set": {"status": "failed"}}
+                )
+            raise
+
+        checkpoint.update(totals)
+        if last_id is not None:
+            checkpoint["last_id"] = last_id
+        if not dry_run:
+            now = datetime.utcnow()
+            await self._save(migration, owner, {"status": "completed", "completed_at": now})
+            checkpoint.update(status="completed", completed_at=now)
+        return checkpoint
@@ -0,0 +1,81 @@
+"""
+Run data migrations by hand:
+
+    python -m app.migrations.runner                      # every pending migration, in order
+    python -m app.migrations.runner 0001_backfill_ad_revenue --ops-per-second 200
+    python -m app.migrations.runner --status
+
+Progress is checkpointed in the `migrations` collection; stopping and
+re-running picks up after the last finished batch. --restart starts over.
+"""
+import argparse
+import asyncio
+from app.config.settings import settings
+from app.migrations.base import MigrationRunner
+from app.migrations.backfill_ad_revenue import BackfillAdRevenue
+from app.migrations.video_engagement_rates import VideoEngagementRates
+
+# In the order they should run
+MIGRATIONS = [
+    BackfillAdRevenue(),
+    VideoEngagementRates(),
+]
+
+
+def get_migration(name: str):
+    for migration in MIGRATIONS:
+        if migration.name == name:
+            return migration
+    raise SystemExit(f"Unknown migration {name!r}; known: {', '.join(m.name for m in MIGRATIONS)}")
+
+
+def print_progress(name: str, totals: dict, last_id):
+    print(f"  {name}: {totals['processed']} docs, {totals['writes']} writes, {totals['modified']} modified (last _id {last_id})")
+
+
+async def run_migrations(database, names: list = None, batch_size: int = None, ops_per_second: float = None,
+                         restart: bool = False, dry_run: bool = False, progress=None) -> list:
+    runner = MigrationRunner(
+        database,
+        batch_size=batch_size or settings.MIGRATION_BATCH_SIZE,
+        ops_per_second=settings.MIGRATION_OPS_PER_SECOND if ops_per_second is None else ops_per_second
+    )
+    migrations = [get_migration(n) for n in names] if names else MIGRATIONS
+    return [await runner.run(m, restart=restart, dry_run=dry_run, progress=progress) for m in migrations]
+
+
+async def _main(args):
+    from app.db.mongo import db
+
+    db.connect()
+    try:
+        if args.status:
+            for migration in MIGRATIONS:
+                checkpoint = await db.db.migrations.find_one({"_id": migration.name}) or {}
+                print(f"{migration.name}: {checkpoint.get('status', 'pending')} "
+                      f"({checkpoint.get('processed', 0)} docs, {checkpoint.get('modified', 0)} modified)")
+            return 0
+        results = await run_migrations(
+            db.db, args.names, args.batch_size, args.ops_per_second,
+            restart=args.restart, dry_run=args.dry_run, progress=print_progress
+        )
+    finally:
+        db.close()
+
+    prefix = "Dry run: " if args.dry_run else ""
+    for name, result in zip(args.names or [m.name for m in MIGRATIONS], results):
+        print(f"{prefix}{name}: {result.get('status', 'pending')}, "
+              f"{result.get('processed', 0)} docs, {result.get('modified', 0)} modified")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run resumable batch data migrations")
+    parser.add_argument("names", nargs="*", help="Migrations to run (default: all, in order)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Documents per bulk_write")
+    parser.add_argument("--ops-per-second", type=float, default=None, help="Write rate cap (0 = unthrottled)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the beginning")
+    parser.add_argument("--dry-run", action="store_true", help="Walk the documents without writing anything")
+    parser.add_argument("--status", action="store_true", help="Show each migration's checkpoint and exit")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args)))
@@ -0,0 +1,20 @@
+from pymongo import UpdateOne
+from app.analytics.service import engagement_rates
+from app.migrations.base import Migration
+
+MISSING_RATES = {"like_rate": {"$exists": False}}
+
+
+class VideoEngagementRates(Migration):
+    name = "0002_video_engagement_rates"
+    collection = "videos"
+    description = "Store like_rate and comment_rate on videos so top-video rankings can use an index"
+
+    def query(self) -> dict:
+        return MISSING_RATES
+
+    def projection(self) -> dict:
+        return {"views": 1, "likes": 1, "comments_count": 1}
+
+    def changes(self, doc: dict) -> list:
+        return [UpdateOne({"_id": doc["_id"], **MISSING_RATES}, {"$set": engagement_rates(doc)})]
@@ -13,10 +13,16 @@ class Project(BaseModel):
     projected_roi: float
     created_at: datetime
     total_invested: float = 0
+    investor_count: int = 0
     
     class Config:
         populate_by_name = True
 
+class PublicProject(Project):
+    creator_name: Optional[str] = None
+    creator_avatar: Optional[str] = None
+    funding_percentage: float = 0
+
 class ProjectCreate(BaseModel):
     title: str
     description: str
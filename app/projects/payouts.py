@@ -0,0 +1,189 @@
+from app.db.mongo import get_database
+from app.config.settings import settings
+from bson.decimal128 import Decimal128
+from decimal import Decimal, ROUND_DOWN
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import uuid
+from datetime import datetime
+
+CENT = Decimal("0.01")
+DUPLICATE_KEY = 11000
+
+
+def _to_decimal(value) -> Decimal:
+    if isinstance(value, Decimal128):
+        return value.to_decimal()
+    return Decimal(str(value))
+
+
+class PayoutEngine:
+    """
+    Streams a project's investments and writes revenue_payouts in bounded batches.
+
+    Each run belongs to a revenue report (stored in `revenue_reports`) that
+    holds the revenue, the invested total it is split against and a checkpoint
+    (last investment _id paid). Payout ids are derived from the report and
+    investment ids, so re-running a report after a crash resumes from the
+    checkpoint and can never pay the same investment twice.
+    """
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or settings.PAYOUT_BATCH_SIZE
+
+    async def create_report(self, project_id: str, total_revenue: float, report_id: str = None):
+        """Create a revenue report, or return the existing one for report_id"""
+        db = await get_database()
+        if report_id:
+            existing = await db.revenue_reports.find_one({"_id": report_id})
+            if existing:
+                return self._resume(existing, project_id, total_revenue)
+
+        cutoff = datetime.utcnow()
+        # Exact invested total as of the cutoff; later investments are not part of this report
+        summary = await db.investments.aggregate([
+            {"$match": {"project_id": project_id, "created_at": {"$lte": cutoff}}},
+            {"$group": {"_id": None, "total": {"$sum": {"$toDecimal": "$amount"}}, "count": {"$sum": 1}}}
+        ]).to_list(length=1)
+        total_invested = summary[0]["total"].to_decimal() if summary else Decimal(0)
+        if total_invested == 0:
+            raise HTTPException(status_code=400, detail="No investments to distribute")
+
+        report = {
+            "_id": report_id or str(uuid.uuid4()),
+            "project_id": project_id,
+            "total_revenue": Decimal128(_to_decimal(total_revenue)),
+            "total_invested": Decimal128(total_invested),
+            "investment_count": summary[0]["count"],
+            "cutoff": cutoff,
+            "status": "PENDING",
+            "checkpoint": None,
+            "payouts_created": 0,
+            "amount_distributed": Decimal128(Decimal(0)),
+            "created_at": cutoff,
+            "completed_at": None
+        }
+        try:
+            await db.revenue_reports.insert_one(report)
+        except DuplicateKeyError:
+            # A concurrent request created the same report_id first
+            existing = await db.revenue_reports.find_one({"_id": report["_id"]})
+            return self._resume(existing, project_id, total_revenue)
+        return report
+
+    def _resume(self, existing: dict, project_id: str, total_revenue: float) -> dict:
+        """An existing report may only be resumed by the same request"""
+        if existing["project_id"] != project_id:
+            raise HTTPException(status_code=409, detail="Report id belongs to another project")
+        if _to_decimal(existing["total_revenue"]) != _to_decimal(total_revenue):
+            raise HTTPException(status_code=409, detail="Report id was already used with a different total_revenue")
+        return existing
+
+    async def run(self, report_id: str):
+        """Distribute a report's revenue, resuming from its checkpoint"""
+        db = await get_database()
+        report = await db.revenue_reports.find_one({"_id": report_id})
+        if not report:
+            raise HTTPException(status_code=404, detail="Revenue report not found")
+        if report["status"] == "COMPLETED":
+            return report
+
+        await db.revenue_reports.update_one({"_id": report_id}, {"$set": {"status": "PROCESSING"}})
+
+        total_revenue = _to_decimal(report["total_revenue"])
+        total_invested = _to_decimal(report["total_invested"])
+
+        query = {"project_id": report["project_id"], "created_at": {"$lte": report["cutoff"]}}
+        if report.get("checkpoint") is not None:
+            query["_id"] = {"$gt": report["checkpoint"]}
+        cursor = db.investments.find(
+            query, {"investor_id": 1, "amount": 1}
+        ).sort("_id", 1).batch_size(self.batch_size)
+
+        batch = []
+        async for inv in cursor:
+            # Round down to the cent; the undistributed remainder is reported, never overpaid
+            amount = (total_revenue * _to_decimal(inv["amount"]) / total_invested).quantize(CENT, rounding=ROUND_DOWN)
+            batch.append({
+                "_id": f"{report_id}:{inv['_id']}",
+                "report_id": report_id,
+                "project_id": report["project_id"],
+                "investor_id": inv["investor_id"],
+                "investment_id": inv["_id"],
+                "amount": float(amount),
+                "created_at": datetime.utcnow()
+            })
+            if len(batch) >= self.batch_size:
+                await self._flush(db, report_id, batch)
+                batch = []
+        if batch:
+            await self._flush(db, report_id, batch)
+
+        # The running totals miss payouts written before a crash and replayed as
+        # duplicates; the final numbers come from the payouts themselves
+        totals = await db.revenue_payouts.aggregate([
+            {"$match": {"report_id": report_id}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "amount": {"$sum": {"$toDecimal": "$amount"}}}}
+        ]).to_list(length=1)
+        completed_at = datetime.utcnow()
+        await db.revenue_reports.update_one(
+            {"_id": report_id},
+            {"$set": {
+                "status": "COMPLETED",
+                "completed_at": completed_at,
+                "payouts_created": totals[0]["count"] if totals else 0,
+                "amount_distributed": totals[0]["amount"] if totals else Decimal128(Decimal(0))
+            }}
+        )
+        await db.projects.update_one(
+            {"_id": report["project_id"]},
+            {"$set": {
+                "status": "COMPLETED",
+                "total_revenue": float(total_revenue),
+                "completed_at": completed_at
+            }}
+        )
+        return await db.revenue_reports.find_one({"_id": report_id})
+
+    async def _flush(self, db, report_id: str, batch: list):
+        """
+        Insert one batch of payouts and advance the checkpoint past it. The
+        running totals only count new rows; run() recomputes them at the end.
+        """
+        failed = set()
+        try:
+            await db.revenue_payouts.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates are payouts written before a crash; anything else is a real failure
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+            failed = {err["index"] for err in errors}
+
+        inserted = [p for i, p in enumerate(batch) if i not in failed]
+        distributed = sum((Decimal(str(p["amount"])) for p in inserted), Decimal(0))
+        await db.revenue_reports.update_one(
+            {"_id": report_id},
+            {
+                "$set": {"checkpoint": batch[-1]["investment_id"]},
+                "$inc": {"payouts_created": len(inserted), "amount_distributed": Decimal128(distributed)}
+            }
+        )
+
+
+def report_summary(report: dict) -> dict:
+    """API-friendly view of a revenue report"""
+    total_revenue = _to_decimal(report["total_revenue"])
+    distributed = _to_decimal(report["amount_distributed"])
+    return {
+        "report_id": report["_id"],
+        "project_id": report["project_id"],
+        "status": report["status"],
+        "total_revenue": float(total_revenue),
+        "total_invested": float(_to_decimal(report["total_invested"])),
+        "payouts_created": report["payouts_created"],
+        "amount_distributed": float(distributed),
+        "undistributed_remainder": float(total_revenue - distributed) if report["status"] == "COMPLETED" else None,
+        "created_at": report["created_at"],
+        "completed_at": report.get("completed_at")
+    }
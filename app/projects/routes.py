@@ -1,56 +1,73 @@
-from fastapi import APIRouter, Depends
-from app.auth.routes import get_current_user
+from fastapi import APIRouter, Depends, Query
+from app.auth.routes import get_current_user, get_request_context
+from app.auth.context import RequestContext
 from app.projects.service import ProjectService
-from app.projects.models import Project, ProjectCreate
+from app.projects.models import Project, ProjectCreate, PublicProject
 from app.investments.service import InvestmentService
 from app.investments.models import Investment, InvestmentCreate
-from typing import List
+from app.utils.pagination import Page
+from app.utils.fields import Fields, FieldSelector
+from typing import List, Optional
 
 router = APIRouter()
 service = ProjectService()
 investment_service = InvestmentService()
+project_fields = FieldSelector(Project)
+public_project_fields = FieldSelector(PublicProject)
 
-@router.get("/public")
+@router.get("/public", response_model=Page[PublicProject])
 async def list_public_projects(
-    skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: str = "LIVE",
-    sort_by: str = "recent"
+    sort_by: str = "recent",
+    fields: Fields = Depends(public_project_fields)
 ):
-    """List all public projects available for investment"""
-    return await service.list_public_projects(skip, limit, status, sort_by)
+    """List all public projects available for investment.
+    Pass the returned next_cursor to fetch the following page."""
+    return fields.page(await service.list_public_projects(limit, cursor, status, sort_by, fields.projection))
 
 @router.post("/", response_model=Project)
-async def create_project(project: ProjectCreate, current_user: dict = Depends(get_current_user)):
-    # Get creator_id from user
-    from app.creators.service import CreatorService
-    creator_service = CreatorService()
-    creator = await creator_service.get_creator_by_user_id(current_user["_id"])
+async def create_project(project: ProjectCreate, context: RequestContext = Depends(get_request_context)):
+    creator_id = await context.creator_id()
     
     # If creator profile doesn't exist, create a basic one
-    if not creator:
-        creator = await creator_service.create_profile(current_user["_id"], {
-            "display_name": current_user.get("email", "Creator").split("@")[0],
+    if not creator_id:
+        from app.creators.service import CreatorService
+        creator = await CreatorService().create_profile(context.user_id, {
+            "display_name": context.user.get("email", "Creator").split("@")[0],
             "bio": "New creator on TAPP",
             "primary_genre": "General",
             "region": "Global"
         })
+        context.set_creator(creator)
+        creator_id = creator["_id"]
     
-    return await service.create_project(creator["_id"], project)
+    return await service.create_project(creator_id, project)
 
-@router.get("/", response_model=List[Project])
-async def list_projects():
-    return await service.get_projects()
+@router.get("/", response_model=Page[Project])
+async def list_projects(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Fields = Depends(project_fields)
+):
+    return fields.page(await service.get_projects(limit, cursor, fields.projection))
 
 @router.get("/{project_id}", response_model=Project)
-async def get_project(project_id: str):
-    return await service.get_project(project_id)
+async def get_project(project_id: str, fields: Fields = Depends(project_fields)):
+    return fields.one(await service.get_project(project_id, fields.projection))
 
 @router.post("/{project_id}/invest", response_model=Investment)
 async def invest_in_project(project_id: str, investment: InvestmentCreate, current_user: dict = Depends(get_current_user)):
     return await investment_service.invest(current_user["_id"], project_id, investment)
 
 @router.post("/{project_id}/revenue-report")
-async def add_revenue_report(project_id: str, total_revenue: float, current_user: dict = Depends(get_current_user)):
-    """Add revenue report and distribute payouts to investors"""
-    return await service.add_revenue_report(project_id, total_revenue)
+async def add_revenue_report(project_id: str, total_revenue: float, report_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Add revenue report and distribute payouts to investors.
+    Passing the report_id of an unfinished report resumes it instead of paying twice."""
+    return await service.add_revenue_report(project_id, total_revenue, report_id)
+
+@router.get("/{project_id}/revenue-reports/{report_id}")
+async def get_revenue_report(project_id: str, report_id: str, current_user: dict = Depends(get_current_user)):
+    """Progress of a revenue report's payout run"""
+    return await service.get_revenue_report(project_id, report_id)
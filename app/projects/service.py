@@ -1,6 +1,13 @@
 from app.db.mongo import get_database
 from app.projects.models import ProjectCreate
+from app.projects.payouts import PayoutEngine, report_summary
+from app.workers.payout_worker import process_payout_report
+from app.config.settings import settings
+from app.utils.pagination import paginate, keyset_query, build_page, with_sort_fields
 from fastapi import HTTPException
+from redis import Redis
+from rq import Queue
+import asyncio
 import uuid
 from datetime import datetime
 
@@ -13,23 +20,20 @@ class ProjectService:
         data["status"] = "LIVE"
         data["created_at"] = datetime.utcnow()
         data["total_invested"] = 0
+        data["investor_count"] = 0
         
         await db.projects.insert_one(data)
         return data
 
-    async def get_projects(self):
+    async def get_projects(self, limit: int = 20, cursor: str = None, projection: dict = None):
         db = await get_database()
-        projects = await db.projects.find().to_list(length=100)
-        
-        # Add total_invested for each project
-        for project in projects:
-            investments = await db.investments.find({"project_id": project["_id"]}).to_list(length=1000)
-            project["total_invested"] = sum(inv.get("amount", 0) for inv in investments)
-        
-        return projects
+        # Funding counters are maintained by InvestmentService.invest
+        return await paginate(db.projects, {}, [("created_at", -1), ("_id", -1)], limit, cursor, projection)
     
-    async def list_public_projects(self, skip: int = 0, limit: int = 20, status: str = "LIVE", sort_by: str = "recent"):
-        """List all public projects with creator info"""
+    async def list_public_projects(self, limit: int = 20, cursor: str = None, status: str = "LIVE", sort_by: str = "recent",
+                                   projection: dict = None):
+        """List all public projects with creator info.
+        With a projection, the creator join and funding percentage are only done if asked for."""
         db = await get_database()
         
         # Build query
@@ -37,85 +41,84 @@ class ProjectService:
         if status:
             query["status"] = status
         
-        # Build sort
+        # Build sort; the trailing _id makes the keyset unique
         sort_field = "created_at" if sort_by == "recent" else "goal_amount"
-        sort_direction = -1
-        
-        # Get projects
-        projects = await db.projects.find(query).sort(sort_field, sort_direction).skip(skip).limit(limit).to_list(length=limit)
+        sort = [(sort_field, -1), ("_id", -1)]
+        
+        def wanted(field):
+            return projection is None or field in projection
+        with_creator = wanted("creator_name") or wanted("creator_avatar")
+        
+        # Single round trip: page of projects joined with creator info. Funding
+        # counters live on the project document (see InvestmentService.invest)
+        pipeline = [
+            {"$match": keyset_query(query, sort, cursor)},
+            {"$sort": dict(sort)},
+            {"$limit": limit + 1}
+        ]
+        if with_creator:
+            pipeline.append({"$lookup": {
+                "from": "creators",
+                "localField": "creator_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"display_name": 1, "avatar_url": 1}}],
+                "as": "creator"
+            }})
+            pipeline.append({"$set": {"creator": {"$first": "$creator"}}})
+        pipeline.append({"$set": {
+            "total_invested": {"$ifNull": ["$total_invested", 0]},
+            "investor_count": {"$ifNull": ["$investor_count", 0]}
+        }})
+        if wanted("funding_percentage"):
+            pipeline.append({"$set": {
+                "funding_percentage": {
+                    "$cond": [
+                        {"$gt": ["$goal_amount", 0]},
+                        {"$round": [{"$multiply": [{"$divide": ["$total_invested", "$goal_amount"]}, 100]}, 2]},
+                        0
+                    ]
+                }
+            }})
+        if projection:
+            pipeline.append({"$project": {**with_sort_fields(projection, sort), **({"creator": 1} if with_creator else {})}})
+        projects = await db.projects.aggregate(pipeline).to_list(length=limit + 1)
         
-        # Enrich with creator info and investment stats
         for project in projects:
-            # Get creator
-            creator = await db.creators.find_one({"_id": project["creator_id"]})
+            creator = project.pop("creator", None)
             if creator:
                 project["creator_name"] = creator.get("display_name", "Unknown")
                 project["creator_avatar"] = creator.get("avatar_url", "")
-            
-            # Get investment stats
-            investments = await db.investments.find({"project_id": project["_id"]}).to_list(length=1000)
-            project["total_invested"] = sum(inv.get("amount", 0) for inv in investments)
-            project["investor_count"] = len(investments)
-            project["funding_percentage"] = round((project["total_invested"] / project["goal_amount"]) * 100, 2) if project["goal_amount"] > 0 else 0
         
-        return projects
+        return build_page(projects, sort, limit)
 
-    async def get_project(self, project_id: str):
+    async def get_project(self, project_id: str, projection: dict = None):
         db = await get_database()
-        project = await db.projects.find_one({"_id": project_id})
+        project = await db.projects.find_one({"_id": project_id}, projection)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
-        
-        # Add total_invested
-        investments = await db.investments.find({"project_id": project_id}).to_list(length=1000)
-        project["total_invested"] = sum(inv.get("amount", 0) for inv in investments)
-        
         return project
     
-    async def add_revenue_report(self, project_id: str, total_revenue: float):
-        """Add revenue report and calculate payouts"""
-        db = await get_database()
+    async def add_revenue_report(self, project_id: str, total_revenue: float, report_id: str = None):
+        """Add revenue report and distribute payouts, inline or as a background job"""
         project = await self.get_project(project_id)
         
-        # Get all investments
-        investments = await db.investments.find({"project_id": project_id}).to_list(length=1000)
+        engine = PayoutEngine()
+        report = await engine.create_report(project_id, total_revenue, report_id)
         
-        total_invested = sum(inv.get("amount", 0) for inv in investments)
+        if report["status"] != "COMPLETED":
+            if report["investment_count"] <= settings.PAYOUT_INLINE_MAX_INVESTMENTS:
+                report = await engine.run(report["_id"])
+            else:
+                # Large projects are paid out by the RQ worker (queue: payouts)
+                queue = Queue("payouts", connection=Redis.from_url(settings.REDIS_URL))
+                await asyncio.to_thread(queue.enqueue, process_payout_report, report["_id"], job_timeout=3600)
+                report["status"] = "QUEUED"
         
-        if total_invested == 0:
-            raise HTTPException(status_code=400, detail="No investments to distribute")
-        
-        # Calculate payouts
-        payouts = []
-        for inv in investments:
-            share = inv["amount"] / total_invested
-            payout_amount = total_revenue * share
-            payouts.append({
-                "_id": str(uuid.uuid4()),
-                "project_id": project_id,
-                "investor_id": inv["investor_id"],
-                "investment_id": inv["_id"],
-                "amount": payout_amount,
-                "created_at": datetime.utcnow()
-            })
-        
-        # Store payouts
-        if payouts:
-            await db.revenue_payouts.insert_many(payouts)
-        
-        # Update project
-        await db.projects.update_one(
-            {"_id": project_id},
-            {"$set": {
-                "status": "COMPLETED",
-                "total_revenue": total_revenue,
-                "completed_at": datetime.utcnow()
-            }}
-        )
-        
-        return {
-            "project_id": project_id,
-            "total_revenue": total_revenue,
-            "total_invested": total_invested,
-            "payouts_created": len(payouts)
-        }
+        return report_summary(report)
+
+    async def get_revenue_report(self, project_id: str, report_id: str):
+        db = await get_database()
+        report = await db.revenue_reports.find_one({"_id": report_id, "project_id": project_id})
+        if not report:
+            raise HTTPException(status_code=404, detail="Revenue report not found")
+        return report_summary(report)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, Request
-from app.auth.routes import get_current_user
+from fastapi import APIRouter, Depends, Query, Request
+from app.auth.routes import get_current_user, get_request_context
+from app.auth.context import RequestContext
 from app.social.service import SocialService
 from app.config.settings import settings
-from typing import List
+from typing import Optional
 from app.social.models import SocialAccount
+from app.utils.pagination import Page
 
 router = APIRouter()
 service = SocialService()
@@ -22,17 +24,17 @@ async def callback_youtube(code: str, current_user: dict = Depends(get_current_u
     # For MVP API design, we assume the frontend handles the redirect and sends the code here authenticated.
     return await service.link_account(current_user["_id"], code)
 
-@router.get("/accounts", response_model=List[SocialAccount])
-async def get_accounts(current_user: dict = Depends(get_current_user)):
-    # Need to find the creator profile for this user first
-    # For simplicity, assuming we can look up by user_id or we store creator_id in token
-    # Let's fetch creator profile first
-    from app.creators.service import CreatorService
-    creator_service = CreatorService()
-    creator = await creator_service.get_creator_by_user_id(current_user["_id"])
-    if not creator:
-        return []
-    return await service.get_accounts(creator["_id"])
+@router.get("/accounts", response_model=Page[SocialAccount])
+async def get_accounts(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    context: RequestContext = Depends(get_request_context)
+):
+    # creator_id comes from the token when it has one
+    creator_id = await context.creator_id()
+    if not creator_id:
+        return {"items": [], "next_cursor": None}
+    return await service.get_accounts(creator_id, limit, cursor)
 
 @router.post("/sync/{account_id}")
 async def sync_account(account_id: str, current_user: dict = Depends(get_current_user)):
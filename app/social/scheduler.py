@@ -0,0 +1,210 @@
+"""
+Background scheduler that keeps every social account synced.
+
+Each sync stores the account's next_sync_at (see sync_interval in
+app/social/sync.py): minutes away for big channels, up to a day for
+dormant ones, and exponentially later after failures. Accounts never synced
+have none and are due at once. The scheduler polls the next_sync_at index
+for due accounts, keeps them in a heap ordered by how overdue they are, and
+dispatches the most overdue first with at most SYNC_GLOBAL_CONCURRENCY in
+flight, each after a small random delay so the upstream sees a smooth rate.
+
+Modes (SYNC_SCHEDULER_MODE):
+  inline  run syncs in this process (the API with SYNC_SCHEDULER_ENABLED=True,
+          or standalone: python -m app.social.scheduler)
+  rq      enqueue app.workers.sync_worker.process_sync_job on the "sync" queue
+          for `rq worker sync`. Jobs are keyed by account (sync-<id>) and an
+          account already queued or running is skipped; only as many are
+          enqueued as keep SYNC_GLOBAL_CONCURRENCY jobs queued + running
+
+Lag (how overdue the most overdue scheduled account is), the due backlog,
+accounts never scheduled, queue depth and outcomes are reported under
+sync_scheduler in GET /metrics.
+"""
+import argparse
+import asyncio
+import heapq
+import random
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from app.config.settings import settings
+from app.social.sync import SyncEngine, SyncInProgress
+from app.utils.metrics import metrics
+
+NEVER = datetime.min
+# RQ states in which an account's job is still pending
+RQ_PENDING = ("queued", "started", "deferred", "scheduled")
+# Counting the due backlog stops here; beyond it the number is only "at least"
+BACKLOG_COUNT_LIMIT = 100_000
+
+
+class SyncScheduler:
+    def __init__(self, mode: str = None, concurrency: int = None):
+        self.mode = mode or settings.SYNC_SCHEDULER_MODE
+        self.concurrency = concurrency or settings.SYNC_GLOBAL_CONCURRENCY
+        self.database = None
+        self._heap = []  # (next_sync_at, account_id)
+        self._queued = set()
+        self._in_flight = {}  # account_id -> task
+        self._queue = None
+        # rq mode: jobs queued + running on the sync queue, as of the last tick
+        self._outstanding = 0
+        self.lag_seconds = 0.0
+        self.due = 0
+        self.unscheduled = 0
+        self.counts = {"dispatched": 0, "synced": 0, "enqueued": 0, "failed": 0, "skipped": 0}
+
+    async def run(self, database):
+        self.database = database
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"Sync scheduler tick failed: {e}")
+            await asyncio.sleep(settings.SYNC_SCHEDULER_POLL_SECONDS)
+
+    async def tick(self):
+        await self._refill()
+        await self._measure_backlog()
+        if self.mode == "rq":
+            self._outstanding = await asyncio.to_thread(self._rq_outstanding)
+        self._dispatch()
+
+    async def _refill(self):
+        now = datetime.utcnow()
+        room = settings.SYNC_SCHEDULER_BATCH - len(self._heap)
+        if room > 0:
+            known = list(self._queued | set(self._in_flight))
+            # Matches null/missing (never synced) as well as anything due by now
+            cursor = self.database.social_accounts.find(
+                {"next_sync_at": {"$not": {"$gt": now}}, "_id": {"$nin": known}}, {"next_sync_at": 1}
+            ).sort("next_sync_at", 1).limit(room)
+            async for account in cursor:
+                heapq.heappush(self._heap, (account.get("next_sync_at") or NEVER, account["_id"]))
+                self._queued.add(account["_id"])
+        metrics.set_gauge("sync.scheduler.queued", len(self._heap))
+
+    async def _measure_backlog(self):
+        """Lag and backlog from the whole collection, not just the accounts held in the heap"""
+        now = datetime.utcnow()
+        accounts = self.database.social_accounts
+        oldest = await accounts.find_one(
+            {"next_sync_at": {"$lte": now}}, {"next_sync_at": 1}, sort=[("next_sync_at", ASCENDING)]
+        )
+        self.lag_seconds = (now - oldest["next_sync_at"]).total_seconds() if oldest else 0.0
+        # Accounts from before scheduling (no next_sync_at) are due but have no time to be late against
+        self.unscheduled = await accounts.count_documents({"next_sync_at": None}, limit=BACKLOG_COUNT_LIMIT)
+        self.due = self.unscheduled + await accounts.count_documents(
+            {"next_sync_at": {"$lte": now}}, limit=BACKLOG_COUNT_LIMIT
+        )
+        metrics.set_gauge("sync.scheduler.lag_seconds", self.lag_seconds)
+        metrics.set_gauge("sync.scheduler.due", self.due)
+        metrics.set_gauge("sync.scheduler.unscheduled", self.unscheduled)
+
+    def _dispatch(self):
+        # In rq mode the slots are taken by jobs waiting or running on the queue
+        busy = self._outstanding if self.mode == "rq" else 0
+        while self._heap and len(self._in_flight) + busy < self.concurrency:
+            _, account_id = heapq.heappop(self._heap)
+            self._queued.discard(account_id)
+            self._in_flight[account_id] = asyncio.ensure_future(self._run_one(account_id))
+            self.counts["dispatched"] += 1
+
+    async def _run_one(self, account_id: str):
+        try:
+            await asyncio.sleep(random.uniform(0, settings.SYNC_DISPATCH_JITTER_SECONDS))
+            if self.mode == "rq":
+                await self._enqueue(account_id)
+                self.counts["enqueued"] += 1
+                # The job holds its slot until it leaves the queue
+                self._outstanding += 1
+            else:
+                await SyncEngine(self.database).sync(account_id)
+                self.counts["synced"] += 1
+        except SyncInProgress:
+            self.counts["skipped"] += 1
+        except Exception as e:
+            # SyncEngine has already pushed next_sync_at back
+            self.counts["failed"] += 1
+            print(f"Scheduled sync of {account_id} failed: {e}")
+        finally:
+            self._in_flight.pop(account_id, None)
+            if self.mode == "inline":
+                # Fill the freed slot now rather than at the next poll
+                self._dispatch()
+
+    def queue(self):
+        from redis import Redis
+        from rq import Queue
+
+        if self._queue is None:
+            self._queue = Queue("sync", connection=Redis.from_url(settings.REDIS_URL))
+        return self._queue
+
+    def _rq_outstanding(self) -> int:
+        queue = self.queue()
+        return queue.count + queue.started_job_registry.count
+
+    def _enqueue_job(self, account_id: str) -> bool:
+        """Enqueue the account's job unless one is still pending; False if skipped"""
+        from rq.exceptions import NoSuchJobError
+        from rq.job import Job
+        from app.workers.sync_worker import process_sync_job
+
+        queue = self.queue()
+        job_id = f"sync-{account_id}"
+        try:
+            if Job.fetch(job_id, connection=queue.connection).get_status() in RQ_PENDING:
+                return False
+        except NoSuchJobError:
+            pass
+        queue.enqueue(process_sync_job, account_id, job_id=job_id, job_timeout=settings.SYNC_JOB_TIMEOUT_SECONDS)
+        return True
+
+    async def _enqueue(self, account_id: str):
+        # Not due again before the job would have timed out; the sync then sets the real next_sync_at
+        now = datetime.utcnow()
+        await self.database.social_accounts.update_one({"_id": account_id}, {"$set": {
+            "next_sync_at": now + timedelta(seconds=settings.SYNC_JOB_TIMEOUT_SECONDS),
+            "sync_enqueued_at": now,
+        }})
+        if not await asyncio.to_thread(self._enqueue_job, account_id):
+            raise SyncInProgress(f"A sync job for {account_id} is already pending")
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "running": self.database is not None,
+            "queued": len(self._heap),
+            "in_flight": len(self._in_flight),
+            "rq_outstanding": self._outstanding,
+            "lag_seconds": self.lag_seconds,
+            "due": self.due,
+            "unscheduled": self.unscheduled,
+            **self.counts,
+        }
+
+
+sync_scheduler = SyncScheduler()
+metrics.register_collector("sync_scheduler", sync_scheduler.stats)
+
+
+async def _main(mode: str):
+    from app.db.mongo import db
+    from app.utils.http import http_client
+
+    db.connect()
+    scheduler = SyncScheduler(mode=mode)
+    print(f"Sync scheduler running ({scheduler.mode}, {scheduler.concurrency} at a time)")
+    try:
+        await scheduler.run(db.db)
+    finally:
+        await http_client.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep social accounts synced, most overdue first")
+    parser.add_argument("--mode", choices=["inline", "rq"], help="Default: SYNC_SCHEDULER_MODE")
+    args = parser.parse_args()
+    asyncio.run(_main(args.mode))
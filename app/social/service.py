@@ -1,21 +1,23 @@
 from app.db.mongo import get_database
 from app.config.settings import settings
+from app.utils.pagination import paginate
+from app.social.sync import SyncEngine, SyncError, SyncInProgress
+from app.utils.http import http_client
 from fastapi import HTTPException
 import uuid
 from datetime import datetime
 import httpx
 
 class SocialService:
-    async def get_accounts(self, creator_id: str):
+    async def get_accounts(self, creator_id: str, limit: int = 20, cursor: str = None):
         db = await get_database()
-        cursor = db.social_accounts.find({"creator_id": creator_id})
-        return await cursor.to_list(length=100)
+        return await paginate(db.social_accounts, {"creator_id": creator_id}, [("_id", 1)], limit, cursor)
 
     async def link_account(self, creator_id: str, code: str):
-        # Exchange code for tokens
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://oauth2.googleapis.com/token",
+        # Exchange code for tokens (an auth code is single-use, so this isn't retried)
+        try:
+            response = await http_client.post(
+                settings.GOOGLE_TOKEN_URL,
                 data={
                     "code": code,
                     "client_id": settings.YOUTUBE_CLIENT_ID,
@@ -24,35 +26,42 @@ class SocialService:
                     "grant_type": "authorization_code"
                 }
             )
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to retrieve token from Google")
-            
-            token_data = response.json()
-            
-            # Get channel info
-            # In a real app, we would use the access token to fetch channel details
-            # For MVP, we'll mock the channel ID or assume it comes from a userinfo endpoint
-            external_channel_id = "mock_channel_id_" + str(uuid.uuid4())[:8] 
-            
-            db = await get_database()
-            account = {
-                "_id": str(uuid.uuid4()),
-                "creator_id": creator_id,
-                "platform": "YOUTUBE",
-                "external_channel_id": external_channel_id,
-                "access_token": token_data.get("access_token"),
-                "refresh_token": token_data.get("refresh_token"),
-                "last_synced_at": datetime.utcnow()
-            }
-            
-            await db.social_accounts.insert_one(account)
-            return account
+        except httpx.HTTPError:
+            raise HTTPException(status_code=502, detail="Google token endpoint unavailable")
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Failed to retrieve token from Google")
+        
+        token_data = response.json()
+        
+        # Get channel info
+        # In a real app, we would use the access token to fetch channel details
+        # For MVP, we'll mock the channel ID or assume it comes from a userinfo endpoint
+        external_channel_id = "mock_channel_id_" + str(uuid.uuid4())[:8] 
+        
+        db = await get_database()
+        account = {
+            "_id": str(uuid.uuid4()),
+            "creator_id": creator_id,
+            "platform": "YOUTUBE",
+            "external_channel_id": external_channel_id,
+            "access_token": token_data.get("access_token"),
+            "refresh_token": token_data.get("refresh_token"),
+            "last_synced_at": datetime.utcnow(),
+            # Due at once; the first scheduled sync sets the real interval
+            "next_sync_at": datetime.utcnow()
+        }
+        
+        await db.social_accounts.insert_one(account)
+        return account
 
     async def sync_account(self, account_id: str):
-        # Mock sync logic
+        """Pull new videos, recent video stats and today's snapshot (see app/social/sync.py)"""
         db = await get_database()
-        await db.social_accounts.update_one(
-            {"_id": account_id},
-            {"$set": {"last_synced_at": datetime.utcnow()}}
-        )
-        return {"status": "synced"}
+        try:
+            return await SyncEngine(db).sync(account_id)
+        except LookupError:
+            raise HTTPException(status_code=404, detail="Social account not found")
+        except SyncInProgress:
+            raise HTTPException(status_code=409, detail="Account is already syncing")
+        except (SyncError, httpx.HTTPError) as e:
+            raise HTTPException(status_code=502, detail=f"YouTube sync failed: {e}")
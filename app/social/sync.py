@@ -0,0 +1,446 @@
+"""
+Incremental YouTube sync for one social account.
+
+Per-account state lives in sync_checkpoints (_id = account id):
+  - channel_etag / uploads_etag: sent as If-None-Match; a 304 means nothing
+    changed and the step is skipped
+  - last_published_at: the newest upload already stored. The uploads playlist
+    is newest-first, so paging stops at the first video at or before it
+  - page_token / pending_last_published_at: an interrupted backfill resumes
+    from the last page whose videos were stored
+  - view_count: lifetime channel views at the last sync; views_day_start is
+    the count before the first sync of views_day, so today's snapshot holds
+    the views gained since then however many times the account syncs today
+  - locked_until / lock_owner: a lease renewed while the sync runs; checkpoint
+    writes only land while this run still owns it
+
+Each run pages the uploads playlist for new videos, refreshes the statistics
+of videos published in the last SYNC_REFRESH_DAYS, upserts both with
+bulk_write and records today's channel snapshot. videos.list calls for
+different pages run concurrently, at most SYNC_ACCOUNT_CONCURRENCY at a time
+per account.
+
+Every run also sets the account's next_sync_at for app.social.scheduler:
+sooner for bigger channels, backing off after failures.
+
+Point YOUTUBE_API_BASE_URL at app.social.youtube_stub to run against a local
+fake instead of Google:
+
+    python -m app.social.sync ACCOUNT_ID
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.analytics.service import AnalyticsService, engagement_rates
+from app.config.settings import settings
+from app.utils.http import http_client
+from app.utils.metrics import metrics
+
+# videos.list takes at most 50 ids
+VIDEO_BATCH = 50
+LEASE = timedelta(minutes=10)
+
+
+class SyncError(Exception):
+    pass
+
+
+class SyncInProgress(SyncError):
+    pass
+
+
+class LeaseLost(SyncInProgress):
+    """Another sync took the account over (this one outlived its lease)"""
+
+
+def parse_time(value: str) -> datetime:
+    """RFC 3339 from the API -> naive UTC like the rest of the database"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _jittered(seconds: float) -> timedelta:
+    # Spread accounts out so ones synced together don't stay in lockstep
+    return timedelta(seconds=seconds * random.uniform(1 - settings.SYNC_INTERVAL_JITTER, 1 + settings.SYNC_INTERVAL_JITTER))
+
+
+def sync_interval(subscribers: int) -> timedelta:
+    """
+    Time until an account's next scheduled sync. Geometric between
+    SYNC_MAX_INTERVAL_SECONDS at SYNC_DORMANT_SUBSCRIBERS (or fewer) and
+    SYNC_MIN_INTERVAL_SECONDS at SYNC_POPULAR_SUBSCRIBERS (or more).
+    """
+    low, high = math.log10(settings.SYNC_DORMANT_SUBSCRIBERS), math.log10(settings.SYNC_POPULAR_SUBSCRIBERS)
+    t = min(max((math.log10(max(subscribers, 1)) - low) / (high - low), 0.0), 1.0)
+    shortest, longest = settings.SYNC_MIN_INTERVAL_SECONDS, settings.SYNC_MAX_INTERVAL_SECONDS
+    return _jittered(longest * (shortest / longest) ** t)
+
+
+def failure_backoff(failures: int) -> timedelta:
+    return _jittered(min(settings.SYNC_RETRY_BASE_SECONDS * 2 ** (failures - 1), settings.SYNC_MAX_INTERVAL_SECONDS))
+
+
+class YouTubeClient:
+    """Data API calls for one account: bearer token (refreshed once on a 401) or API key, ETags.
+    `http` is the shared http_client (retries, breaker) or, in tests, any httpx.AsyncClient."""
+
+    def __init__(self, http, database, account: dict):
+        self.http = http
+        self.database = database
+        self.account = account
+
+    async def get(self, path: str, params: dict, etag: str = None):
+        """Returns (json or None on 304, etag)"""
+        for attempt in range(2):
+            headers = {"If-None-Match": etag} if etag else {}
+            params = dict(params)
+            if self.account.get("access_token"):
+                headers["Authorization"] = f"Bearer {self.account['access_token']}"
+            elif settings.YOUTUBE_API_KEY:
+                params["key"] = settings.YOUTUBE_API_KEY
+            metrics.inc("sync.api_calls")
+            response = await self.http.get(f"{settings.YOUTUBE_API_BASE_URL}/{path}", params=params, headers=headers)
+            if response.status_code == 401 and attempt == 0 and self.account.get("refresh_token"):
+                await self._refresh_token()
+                continue
+            break
+        if response.status_code == 304:
+            metrics.inc("sync.not_modified")
+            return None, etag
+        if response.status_code != 200:
+            raise SyncError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+        body = response.json()
+        return body, body.get("etag") or response.headers.get("ETag")
+
+    async def _refresh_token(self):
+        response = await self.http.post(settings.GOOGLE_TOKEN_URL, data={
+            "client_id": settings.YOUTUBE_CLIENT_ID,
+            "client_secret": settings.YOUTUBE_CLIENT_SECRET,
+            "refresh_token": self.account["refresh_token"],
+            "grant_type": "refresh_token"
+        })
+        if response.status_code != 200:
+            raise SyncError(f"Token refresh failed with {response.status_code}")
+        self.account["access_token"] = response.json()["access_token"]
+        await self.database.social_accounts.update_one(
+            {"_id": self.account["_id"]}, {"$set": {"access_token": self.account["access_token"]}}
+        )
+
+
+class SyncEngine:
+    def __init__(self, database, http=None, concurrency: int = None):
+        self.database = database
+        self.http = http or http_client
+        self.concurrency = concurrency or settings.SYNC_ACCOUNT_CONCURRENCY
+
+    async def sync(self, account_id: str) -> dict:
+        account = await self.database.social_accounts.find_one({"_id": account_id})
+        if not account:
+            raise LookupError(f"Social account {account_id} not found")
+
+        checkpoint = await self._claim(account_id)
+        owner = checkpoint["lock_owner"]
+        heartbeat = asyncio.ensure_future(self._renew(account_id, owner))
+        started = time.monotonic()
+        try:
+            result = await self._sync(account, checkpoint)
+        except LeaseLost:
+            # The sync that took over owns the checkpoint and the account's schedule now
+            raise
+        except Exception as e:
+            metrics.inc("sync.failures")
+            try:
+                await self._release(account_id, owner, {"last_error": str(e)[:500]})
+            except LeaseLost:
+                raise e
+            failures = account.get("sync_failures", 0) + 1
+            await self.database.social_accounts.update_one({"_id": account_id}, {
+                "$set": {"sync_failures": failures, "next_sync_at": datetime.utcnow() + failure_backoff(failures)}
+            })
+            raise
+        finally:
+            heartbeat.cancel()
+        metrics.observe("sync.account", time.monotonic() - started)
+        return result
+
+    async def _claim(self, account_id: str) -> dict:
+        """Lease the account's checkpoint so two syncs of one account can't interleave"""
+        now = datetime.utcnow()
+        try:
+            return await self.database.sync_checkpoints.find_one_and_update(
+                {"_id": account_id, "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]},
+                {"$set": {"locked_until": now + LEASE, "lock_owner": uuid.uuid4().hex}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            raise SyncInProgress(f"Account {account_id} is already syncing")
+
+    async def _renew(self, account_id: str, owner: str):
+        """Push the lease forward while the sync runs, so a long backfill isn't taken over"""
+        while True:
+            await asyncio.sleep(LEASE.total_seconds() / 3)
+            result = await self.database.sync_checkpoints.update_one(
+                {"_id": account_id, "lock_owner": owner},
+                {"$set": {"locked_until": datetime.utcnow() + LEASE}}
+            )
+            if not result.matched_count:
+                return
+
+    async def _save(self, account_id: str, owner: str, fields: dict):
+        """Checkpoint write; raises LeaseLost if another sync has taken the account over"""
+        result = await self.database.sync_checkpoints.update_one(
+            {"_id": account_id, "lock_owner": owner}, {"$set": fields}
+        )
+        if not result.matched_count:
+            metrics.inc("sync.lease_lost")
+            raise LeaseLost(f"Lost the sync lease on {account_id}")
+
+    async def _release(self, account_id: str, owner: str, fields: dict):
+        await self._save(account_id, owner, {**fields, "locked_until": None, "lock_owner": None})
+
+    async def _sync(self, account: dict, checkpoint: dict) -> dict:
+        api = YouTubeClient(self.http, self.database, account)
+        account_id = account["_id"]
+        owner = checkpoint["lock_owner"]
+        now = datetime.utcnow()
+        result = {"status": "synced", "pages": 0, "videos_new": 0, "videos_updated": 0, "snapshot": False}
+
+        # 1. Channel statistics and the uploads playlist
+        channel, channel_etag = await api.get(
+            "channels", {"part": "contentDetails,statistics", "id": account["external_channel_id"]},
+            checkpoint.get("channel_etag")
+        )
+        if channel is not None:
+            if not channel.get("items"):
+                raise SyncError(f"Channel {account['external_channel_id']} not found upstream")
+            item = channel["items"][0]
+            stats = item.get("statistics", {})
+            channel_state = {
+                "channel_etag": channel_etag,
+                "uploads_playlist_id": item["contentDetails"]["relatedPlaylists"]["uploads"],
+                "subscribers": int(stats.get("subscriberCount", 0)),
+                "video_count": int(stats.get("videoCount", 0)),
+            }
+            view_count = int(stats.get("viewCount", 0))
+        else:
+            channel_state = {}
+            view_count = checkpoint.get("view_count")
+        state = {**checkpoint, **channel_state}
+
+        # 2. New uploads (newest first) and 3. fresh stats for recent videos
+        gate = asyncio.Semaphore(self.concurrency)
+        tasks = []
+
+        async def fetch(ids):
+            # Stored as soon as fetched: a page token is checkpointed only once its videos are in Mongo
+            async with gate:
+                videos = await self._fetch_videos(api, account_id, ids)
+            new = await self._store_videos(account_id, videos)
+            result["videos_new"] += new
+            result["videos_updated"] += len(videos) - new
+            return videos
+
+        def spawn(ids):
+            task = asyncio.ensure_future(fetch(ids))
+            tasks.append(task)
+            return task
+
+        seen_ids = set()
+        try:
+            await self._page_uploads(api, account_id, owner, state, spawn, seen_ids, result)
+            since = now - timedelta(days=settings.SYNC_REFRESH_DAYS)
+            recent = await self.database.videos.find(
+                {"social_account_id": account_id, "published_at": {"$gte": since}}, {"external_video_id": 1}
+            ).to_list(length=None)
+            stale = [v["external_video_id"] for v in recent if v["external_video_id"] not in seen_ids]
+            for i in range(0, len(stale), VIDEO_BATCH):
+                spawn(stale[i:i + VIDEO_BATCH])
+            fetched = [video for videos in await asyncio.gather(*tasks) for video in videos]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # 4. Today's snapshot, overwritten by every sync today; views are those gained since the day's baseline
+        today = datetime(now.year, now.month, now.day)
+        if checkpoint.get("views_day") == today:
+            baseline = checkpoint.get("views_day_start")
+        else:
+            # The last count seen before today (or, on a first sync, this one)
+            baseline = checkpoint.get("view_count")
+        if baseline is None:
+            baseline = view_count
+        snapshot = {
+            "_id": str(uuid.uuid4()),
+            "social_account_id": account_id,
+            "date": today,
+            "subscribers": state.get("subscribers", 0),
+            "views": max(view_count - baseline, 0) if view_count is not None else 0,
+            # Watch time and revenue come from the YouTube Analytics API, which this sync doesn't call
+            "watch_time": 0,
+            "estimated_revenue": 0.0,
+            "engagement_rate": await self._engagement_rate(account_id, fetched),
+        }
+        result["snapshot"] = await AnalyticsService().ingest_snapshot(snapshot, self.database)
+
+        await self._release(account_id, owner, {
+            **channel_state,
+            "view_count": view_count,
+            "views_day": today,
+            "views_day_start": baseline,
+            "last_synced_at": now,
+            "last_error": None,
+        })
+        await self.database.social_accounts.update_one({"_id": account_id}, {"$set": {
+            "last_synced_at": now,
+            "next_sync_at": now + sync_interval(state.get("subscribers", 0)),
+            "sync_failures": 0,
+        }})
+        metrics.inc("sync.accounts")
+        return result
+
+    async def _engagement_rate(self, account_id: str, fetched: list) -> float:
+        """
+        Rate over this run's videos. A run that fetched nothing (no uploads, no
+        recent videos to refresh) carries the last snapshot's rate forward
+        rather than recording 0.
+        """
+        if fetched:
+            return _engagement_rate(fetched)
+        latest = await self.database.channel_snapshots.find_one(
+            {"social_account_id": account_id}, {"engagement_rate": 1}, sort=[("date", -1)]
+        )
+        return (latest or {}).get("engagement_rate", 0.0)
+
+    async def _page_uploads(self, api: YouTubeClient, account_id: str, owner: str, state: dict, spawn, seen_ids: set, result: dict):
+        """Walk the uploads playlist down to the last stored video, checkpointing page tokens as pages land"""
+        playlist_id = state.get("uploads_playlist_id")
+        if not playlist_id:
+            return
+        last_published = state.get("last_published_at")
+        page_token = state.get("page_token")
+        resuming = page_token is not None
+        high_water = state.get("pending_last_published_at") if resuming else None
+        uploads_etag = state.get("uploads_etag")
+        # (task, token to resume from once that task's videos are stored)
+        in_flight = deque()
+
+        async def settle(limit: int):
+            # Checkpoint tokens strictly in page order, waiting once more than `limit` pages are queued
+            while in_flight and (in_flight[0][0].done() or len(in_flight) > limit):
+                task, token = in_flight.popleft()
+                await task
+                await self._save(account_id, owner, {"page_token": token})
+
+        while True:
+            params = {"part": "contentDetails", "playlistId": playlist_id, "maxResults": VIDEO_BATCH}
+            if page_token:
+                params["pageToken"] = page_token
+            # Only the first page's ETag says whether anything was uploaded
+            first_page = not page_token
+            page, etag = await api.get("playlistItems", params, uploads_etag if first_page else None)
+            if page is None:
+                return
+            result["pages"] += 1
+            if first_page:
+                state["uploads_etag"] = etag
+
+            ids, done = [], False
+            for item in page.get("items", []):
+                details = item["contentDetails"]
+                published = parse_time(details["videoPublishedAt"])
+                if last_published and published <= last_published:
+                    done = True
+                    break
+                high_water = max(high_water or published, published)
+                ids.append(details["videoId"])
+            seen_ids.update(ids)
+
+            page_token = None if done else page.get("nextPageToken")
+            if ids:
+                in_flight.append((spawn(ids), page_token))
+            await self._save(account_id, owner, {"pending_last_published_at": high_water})
+            await settle(self.concurrency)
+            if not page_token:
+                break
+
+        await settle(0)
+        newest = max(filter(None, [last_published, high_water]), default=None)
+        await self._save(account_id, owner, {
+            "page_token": None,
+            "pending_last_published_at": None,
+            "last_published_at": newest,
+            "uploads_etag": state.get("uploads_etag"),
+        })
+        state["last_published_at"] = newest
+
+    async def _fetch_videos(self, api: YouTubeClient, account_id: str, ids: list) -> list:
+        body, _ = await api.get("videos", {"part": "snippet,statistics", "id": ",".join(ids), "maxResults": VIDEO_BATCH})
+        videos = []
+        for item in body.get("items", []):
+            stats = item.get("statistics", {})
+            video = {
+                "social_account_id": account_id,
+                "external_video_id": item["id"],
+                "title": item["snippet"]["title"],
+                "published_at": parse_time(item["snippet"]["publishedAt"]),
+                "views": int(stats.get("viewCount", 0)),
+                "likes": int(stats.get("likeCount", 0)),
+                "comments_count": int(stats.get("commentCount", 0)),
+            }
+            videos.append({**video, **engagement_rates(video)})
+        return videos
+
+    async def _store_videos(self, account_id: str, videos: list) -> int:
+        """Upsert by (account, external id); returns how many were new"""
+        if not videos:
+            return 0
+        operations = [
+            UpdateOne(
+                {"social_account_id": account_id, "external_video_id": video["external_video_id"]},
+                {"$set": video, "$setOnInsert": {"_id": str(uuid.uuid4()), "shares": 0}},
+                upsert=True
+            )
+            for video in videos
+        ]
+        result = await self.database.videos.bulk_write(operations, ordered=False)
+        metrics.inc("sync.videos_upserted", len(operations))
+        return result.upserted_count
+
+
+def _engagement_rate(videos: list) -> float:
+    """(likes + comments) / views over the videos seen this run, as a percentage"""
+    views = sum(v["views"] for v in videos)
+    if not views:
+        return 0.0
+    return round(sum(v["likes"] + v["comments_count"] for v in videos) / views * 100, 2)
+
+
+async def _main(account_ids: list, base_url: Optional[str]):
+    from app.db.mongo import db
+
+    if base_url:
+        settings.YOUTUBE_API_BASE_URL = base_url
+    db.connect()
+    try:
+        engine = SyncEngine(db.db)
+        for account_id in account_ids:
+            print(f"{account_id}: {await engine.sync(account_id)}")
+    finally:
+        await http_client.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync social accounts from the YouTube Data API")
+    parser.add_argument("account_ids", nargs="+")
+    parser.add_argument("--base-url", help="Override YOUTUBE_API_BASE_URL (e.g. http://localhost:8100 for the stub)")
+    args = parser.parse_args()
+    asyncio.run(_main(args.account_ids, args.base_url))
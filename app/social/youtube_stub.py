@@ -0,0 +1,173 @@
+"""
+A local stand-in for the parts of the YouTube Data API v3 the sync uses:
+channels.list, playlistItems.list (uploads, newest first, pageToken paging)
+and videos.list, with ETags / If-None-Match -> 304.
+
+Every channel id exists and gets --videos uploads, derived from the id so
+runs are repeatable. POST /_stub/channels/{id}/uploads?count=N publishes N new
+videos, to exercise incremental syncs; --fail-rate makes that share of
+requests answer 503.
+
+    python -m app.social.youtube_stub --port 8100 --videos 500
+    YOUTUBE_API_BASE_URL=http://localhost:8100 python -m app.social.sync ACCOUNT_ID
+
+In tests, serve `create_app()` through httpx.ASGITransport instead of a port.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+EPOCH = datetime(2020, 1, 1)
+
+
+def _number(*parts) -> int:
+    return int.from_bytes(hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).digest(), "little")
+
+
+def _etag(body) -> str:
+    return '"' + hashlib.blake2b(json.dumps(body, sort_keys=True).encode(), digest_size=12).hexdigest() + '"'
+
+
+def _rfc3339(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class StubChannel:
+    def __init__(self, channel_id: str, videos: int):
+        self.channel_id = channel_id
+        self.uploads = []  # (video_id, published_at), oldest first
+        self.publish(videos, EPOCH)
+
+    def publish(self, count: int, start: datetime = None):
+        start = start or datetime.utcnow().replace(microsecond=0)
+        for _ in range(count):
+            n = len(self.uploads)
+            published = start + timedelta(hours=n * 20) if start == EPOCH else start + timedelta(seconds=n)
+            self.uploads.append((f"{self.channel_id}-v{n}", published))
+
+    def video(self, video_id: str) -> Optional[dict]:
+        _, _, index = video_id.rpartition("-v")
+        if not index.isdigit() or int(index) >= len(self.uploads):
+            return None
+        published = self.uploads[int(index)][1]
+        views = 100 + _number(video_id) % 100_000
+        return {
+            "id": video_id,
+            "snippet": {"title": f"Video {index}", "publishedAt": _rfc3339(published), "channelId": self.channel_id},
+            "statistics": {
+                "viewCount": str(views),
+                "likeCount": str(views * (1 + _number(video_id, "likes") % 6) // 100),
+                "commentCount": str(views * (1 + _number(video_id, "comments") % 10) // 1000),
+            },
+        }
+
+
+def create_app(videos: int = 200, fail_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="YouTube Data API stub")
+    channels = {}
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    def channel(channel_id: str) -> StubChannel:
+        if channel_id not in channels:
+            channels[channel_id] = StubChannel(channel_id, videos)
+        return channels[channel_id]
+
+    def respond(body: dict, if_none_match: Optional[str]):
+        etag = _etag(body)
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse({"etag": etag, **body}, headers={"ETag": etag})
+
+    @app.middleware("http")
+    async def flaky(request: Request, call_next):
+        app.state.requests += 1
+        if fail_rate and not request.url.path.startswith("/_stub") and rng.random() < fail_rate:
+            return JSONResponse({"error": {"code": 503, "message": "backendError"}}, status_code=503)
+        return await call_next(request)
+
+    @app.get("/channels")
+    async def list_channels(id: str, part: str = "", if_none_match: Optional[str] = Header(None)):
+        items = []
+        for channel_id in id.split(","):
+            c = channel(channel_id)
+            items.append({
+                "kind": "youtube#channel",
+                "id": channel_id,
+                "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id}},
+                "statistics": {
+                    "subscriberCount": str(1000 + _number(channel_id) % 1_000_000 + 10 * len(c.uploads)),
+                    "viewCount": str(sum(int(c.video(v)["statistics"]["viewCount"]) for v, _ in c.uploads)),
+                    "videoCount": str(len(c.uploads)),
+                },
+            })
+        return respond({"kind": "youtube#channelListResponse", "items": items}, if_none_match)
+
+    @app.get("/playlistItems")
+    async def list_playlist_items(playlistId: str, part: str = "", maxResults: int = Query(5, ge=0, le=50),
+                                  pageToken: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+        if not playlistId.startswith("UU"):
+            raise HTTPException(status_code=404, detail="playlistNotFound")
+        uploads = channel(playlistId[2:]).uploads[::-1]
+        offset = 0
+        if pageToken:
+            try:
+                offset = int(base64.urlsafe_b64decode(pageToken.encode()).decode())
+            except ValueError:
+                raise HTTPException(status_code=400, detail="invalidPageToken")
+        page = uploads[offset:offset + maxResults]
+        body = {
+            "kind": "youtube#playlistItemListResponse",
+            "pageInfo": {"totalResults": len(uploads), "resultsPerPage": maxResults},
+            "items": [
+                {"kind": "youtube#playlistItem", "contentDetails": {"videoId": video_id, "videoPublishedAt": _rfc3339(published)}}
+                for video_id, published in page
+            ],
+        }
+        if offset + maxResults < len(uploads):
+            body["nextPageToken"] = base64.urlsafe_b64encode(str(offset + maxResults).encode()).decode()
+        return respond(body, if_none_match)
+
+    @app.get("/videos")
+    async def list_videos(id: str, part: str = "", maxResults: int = 50):
+        ids = id.split(",")
+        if len(ids) > 50:
+            raise HTTPException(status_code=400, detail="tooManyIds")
+        items = []
+        for video_id in ids:
+            channel_id = video_id.rpartition("-v")[0]
+            video = channel(channel_id).video(video_id) if channel_id else None
+            if video:
+                items.append(video)
+        return {"kind": "youtube#videoListResponse", "etag": _etag(items), "items": items}
+
+    @app.post("/_stub/channels/{channel_id}/uploads")
+    async def publish(channel_id: str, count: int = 1):
+        channel(channel_id).publish(count)
+        return {"videos": len(channel(channel_id).uploads)}
+
+    @app.post("/token")
+    async def token(request: Request):
+        # Stands in for oauth2.googleapis.com/token (point GOOGLE_TOKEN_URL here)
+        form = await request.form()
+        return {"access_token": f"stub-{form.get('grant_type')}-{rng.randrange(10**9)}", "expires_in": 3599}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local YouTube Data API stub")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--videos", type=int, default=200, help="Uploads per channel")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of API requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.videos, args.fail_rate, args.seed), host="127.0.0.1", port=args.port)
@@ -0,0 +1,198 @@
+"""
+Caching with a TTL and a size bound.
+
+TTLCache is the synchronous in-process building block (LRU eviction).
+Response caches in front of services are created with `create_cache`, which
+returns an async cache backed either by a TTLCache (CACHE_BACKEND=memory, one
+worker) or by Redis at REDIS_URL (CACHE_BACKEND=redis, shared by workers).
+Both hand out copies, so callers may modify what they get back. A Redis
+error counts as a miss (or a skipped write) so reads fall through to Mongo.
+
+Every named cache reports hits, misses and evictions under "caches" on
+GET /metrics.
+"""
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from bson import json_util
+from redis.exceptions import RedisError
+from app.config.settings import settings
+from app.utils.metrics import metrics
+
+class TTLCache:
+    """
+    Small in-process cache with a per-entry TTL and a size bound.
+    When full, the least recently used entry is dropped.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float = None):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + (ttl_seconds or self.ttl_seconds), value)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class MemoryCache:
+    """
+    Async cache interface over an in-process TTLCache. Values are copied in
+    and out, like a round trip through Redis, so one request mutating its
+    result can't change what the next one reads.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return copy.deepcopy(self._cache.get(key))
+
+    async def set(self, key: str, value: Any, ttl_seconds: float = None):
+        self._cache.set(key, copy.deepcopy(value), ttl_seconds)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._cache.invalidate(key)
+
+    async def stats(self) -> dict:
+        return self._cache.stats()
+
+    async def close(self):
+        self._cache.clear()
+
+
+class RedisCache:
+    """Async cache shared by all workers. Size is bounded by Redis maxmemory/eviction policy."""
+
+    def __init__(self, name: str, ttl_seconds: float, url: str = None, client=None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._url = url or settings.REDIS_URL
+        self._client = client
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _redis(self):
+        if self._client is None:
+            import redis.asyncio as aioredis
+            self._client = aioredis.Redis.from_url(self._url)
+        return self._client
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._redis().get(self._key(key))
+        except RedisError:
+            self.errors += 1
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json_util.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float = None):
+        ttl_ms = int((ttl_seconds or self.ttl_seconds) * 1000)
+        try:
+            await self._redis().set(self._key(key), json_util.dumps(value), px=ttl_ms)
+        except RedisError:
+            self.errors += 1
+
+    async def delete(self, *keys: str):
+        # A failed delete leaves the entry to expire with its TTL
+        if not keys:
+            return
+        try:
+            await self._redis().delete(*(self._key(k) for k in keys))
+        except RedisError:
+            self.errors += 1
+
+    async def stats(self) -> dict:
+        try:
+            info = await self._redis().info("stats")
+        except RedisError:
+            info = {}
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            # Server-wide: Redis evicts across every key, not per cache
+            "evictions": info.get("evicted_keys"),
+            "expirations": info.get("expired_keys")
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_caches: Dict[str, Any] = {}
+
+def create_cache(name: str, ttl_seconds: float = None, max_size: int = None):
+    """Named response cache using the configured backend; registered for /metrics"""
+    ttl_seconds = ttl_seconds or settings.CACHE_TTL_SECONDS
+    if settings.CACHE_BACKEND == "redis":
+        cache = RedisCache(name, ttl_seconds)
+    else:
+        cache = MemoryCache(name, max_size or settings.CACHE_MAX_ENTRIES, ttl_seconds)
+    _caches[name] = cache
+    return cache
+
+async def cache_stats() -> dict:
+    return {name: await cache.stats() for name, cache in _caches.items()}
+
+async def close_caches():
+    for cache in _caches.values():
+        await cache.close()
+
+metrics.register_collector("caches", cache_stats)
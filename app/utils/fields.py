@@ -0,0 +1,85 @@
+"""
+Sparse fieldsets for read endpoints: ?fields=display_name,avatar_url,subscribers
+
+A FieldSelector is a route dependency built from the endpoint's response
+model. It turns `fields` into a Fields object whose `projection` goes to
+Mongo and whose `one`/`page` render the response through a model trimmed to
+the selected fields. `_id` is always returned. List endpoints can pass
+`exclude` to leave heavy nested fields out when no `fields` are given.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse
+from pydantic import ConfigDict, TypeAdapter, create_model
+
+class Fields:
+    def __init__(self, model, names: Optional[frozenset] = None):
+        self.model = model
+        # None means every field: the endpoint responds as it did before
+        self.names = names
+
+    @property
+    def full(self) -> bool:
+        return self.names is None
+
+    @property
+    def projection(self) -> Optional[dict]:
+        if self.names is None:
+            return None
+        fields = self.model.model_fields
+        return {(fields[name].alias or name): 1 for name in self.names}
+
+    def includes(self, name: str) -> bool:
+        return self.names is None or name in self.names
+
+    def one(self, doc: Optional[dict]):
+        if self.names is None or doc is None:
+            return doc
+        trimmed = _trimmed_model(self.model, self.names)
+        return JSONResponse(trimmed.model_validate(doc).model_dump(mode="json", by_alias=True))
+
+    def page(self, page: dict):
+        """Render a {"items", "next_cursor", ...} page"""
+        if self.names is None:
+            return page
+        adapter = _list_adapter(self.model, self.names)
+        items = adapter.dump_python(adapter.validate_python(page["items"]), mode="json", by_alias=True)
+        return JSONResponse({**page, "items": items})
+
+
+class FieldSelector:
+    """FastAPI dependency parsing `fields` against a response model"""
+
+    def __init__(self, model, exclude: Iterable[str] = ()):
+        self.model = model
+        self.lookup = {}
+        for name, field in model.model_fields.items():
+            self.lookup[name] = name
+            if field.alias:
+                self.lookup[field.alias] = name
+        self.id_field = self.lookup.get("_id")
+        exclude = set(exclude)
+        self.default = frozenset(n for n in model.model_fields if n not in exclude) if exclude else None
+
+    def __call__(self, fields: Optional[str] = Query(None, description="Comma-separated fields to return")) -> Fields:
+        if not fields:
+            return Fields(self.model, self.default)
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = sorted(f for f in requested if f not in self.lookup)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        names = {self.lookup[f] for f in requested}
+        if self.id_field:
+            names.add(self.id_field)
+        return Fields(self.model, frozenset(names))
+
+
+@lru_cache(maxsize=256)
+def _trimmed_model(model, names: frozenset):
+    definitions = {name: (field.annotation, field) for name, field in model.model_fields.items() if name in names}
+    return create_model(f"{model.__name__}Fields", __config__=ConfigDict(populate_by_name=True), **definitions)
+
+@lru_cache(maxsize=256)
+def _list_adapter(model, names: frozenset):
+    return TypeAdapter(List[_trimmed_model(model, names)])
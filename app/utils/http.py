@@ -0,0 +1,191 @@
+"""
+The one outbound HTTP client (Google OAuth, the YouTube Data API, the GPU worker).
+
+A single httpx.AsyncClient is opened at startup and closed at shutdown, so
+connections to each upstream are pooled and kept alive instead of paying a
+TCP + TLS handshake per call. On top of it, per host:
+  - at most HTTP_PER_HOST_CONCURRENCY requests in flight
+  - retries with full-jitter exponential backoff on 429/5xx and transport
+    errors (idempotent methods only unless retry=True), honouring Retry-After
+  - a circuit breaker: HTTP_BREAKER_FAILURES consecutive failures fail calls
+    fast with CircuitOpenError for HTTP_BREAKER_RESET_SECONDS, then one trial
+    request decides whether it closes again
+  - latency timings under http.<host> and per-host counts in GET /metrics
+
+Processes without the FastAPI lifecycle (CLIs, RQ jobs) get the client opened
+on first use and should `await http_client.close()` when done.
+"""
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+import httpx
+from app.config.settings import settings
+from app.utils.metrics import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class CircuitOpenError(httpx.HTTPError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int, reset_seconds: float):
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._trial = False
+        if self.state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def settle(self):
+        """End an attempt; a half-open trial that record() never resolved frees its slot"""
+        if self.state == "half_open":
+            self._trial = False
+
+    def record(self, ok: bool):
+        if ok:
+            self.state, self.failures = "closed", 0
+            return
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                metrics.inc("http.circuit_opened")
+            self.state, self.opened_at = "open", time.monotonic()
+
+
+class _Host:
+    def __init__(self):
+        self.gate = asyncio.Semaphore(settings.HTTP_PER_HOST_CONCURRENCY)
+        self.breaker = CircuitBreaker(settings.HTTP_BREAKER_FAILURES, settings.HTTP_BREAKER_RESET_SECONDS)
+        self.in_flight = 0
+        self.counts = {"requests": 0, "errors": 0, "retries": 0, "rejected": 0}
+
+
+class OutboundHTTP:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, _Host] = {}
+
+    def open(self):
+        if self._client is not None:
+            return
+        http2 = settings.HTTP_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401  (httpx[http2])
+            except ImportError:
+                print("HTTP_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+                http2 = False
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS)
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        # Semaphores belong to the loop that used them; CLIs and jobs run a fresh loop per call
+        self._hosts.clear()
+
+    def _host(self, host: str) -> _Host:
+        if host not in self._hosts:
+            self._hosts[host] = _Host()
+        return self._hosts[host]
+
+    async def request(self, method: str, url: str, retry: Optional[bool] = None, **kwargs) -> httpx.Response:
+        """httpx request through the pool, host limit, retries and breaker.
+        Non-idempotent methods are sent once unless retry=True."""
+        self.open()
+        method = method.upper()
+        host = httpx.URL(url).host
+        upstream = self._host(host)
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        attempts = settings.HTTP_MAX_RETRIES + 1 if retry else 1
+
+        for attempt in range(attempts):
+            if not upstream.breaker.allow():
+                upstream.counts["rejected"] += 1
+                raise CircuitOpenError(f"Circuit open for {host}")
+            if attempt:
+                upstream.counts["retries"] += 1
+            upstream.counts["requests"] += 1
+            started = time.monotonic()
+            try:
+                try:
+                    async with upstream.gate:
+                        upstream.in_flight += 1
+                        try:
+                            response = await self._client.request(method, url, **kwargs)
+                        finally:
+                            upstream.in_flight -= 1
+                except httpx.TransportError:
+                    upstream.counts["errors"] += 1
+                    upstream.breaker.record(False)
+                    if attempt + 1 >= attempts:
+                        raise
+                    delay = _backoff(attempt)
+                else:
+                    metrics.observe(f"http.{host}", time.monotonic() - started)
+                    if response.status_code not in RETRY_STATUSES:
+                        upstream.breaker.record(True)
+                        return response
+                    upstream.counts["errors"] += 1
+                    # 429 means "slow down", not "down"; only 5xx trips the breaker
+                    upstream.breaker.record(response.status_code == 429)
+                    if attempt + 1 >= attempts:
+                        return response
+                    delay = _retry_after(response) or _backoff(attempt)
+                    await response.aclose()
+            finally:
+                # Cancelled, or failed some other way: let the next call be the trial
+                upstream.breaker.settle()
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            host: {"circuit": h.breaker.state, "in_flight": h.in_flight, **h.counts}
+            for host, h in self._hosts.items()
+        }
+
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: uniform in [0, base * 2^attempt], capped"""
+    return random.uniform(0, min(settings.HTTP_RETRY_MAX_SECONDS, settings.HTTP_RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value and value.isdigit():
+        return min(float(value), settings.HTTP_RETRY_MAX_SECONDS)
+    return None
+
+
+http_client = OutboundHTTP()
+metrics.register_collector("http", http_client.stats)
@@ -0,0 +1,57 @@
+"""
+Process-local metrics exposed on GET /metrics.
+
+Counters and gauges are plain numbers keyed by dotted names; timings keep a
+count, total and max. Subsystems that already track their own numbers (caches,
+pools) register a collector that is called when a snapshot is taken.
+"""
+import inspect
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Union
+
+class Metrics:
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, dict] = {}
+        self._collectors: Dict[str, Callable[[], Union[dict, Awaitable[dict]]]] = {}
+
+    def inc(self, name: str, value: float = 1):
+        self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        timing = self._timings.get(name)
+        if timing is None:
+            timing = self._timings[name] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        timing["count"] += 1
+        timing["total_seconds"] += seconds
+        timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    def snapshot_counters(self, prefix: str) -> Dict[str, float]:
+        """Counters under a dotted prefix, with the prefix stripped"""
+        return {name[len(prefix):]: value for name, value in self._counters.items() if name.startswith(prefix)}
+
+    def register_collector(self, name: str, collector):
+        """collector() (sync or async) returns a dict included under `name` in snapshots"""
+        self._collectors[name] = collector
+
+    async def snapshot(self) -> dict:
+        timings = {
+            name: {**t, "avg_seconds": t["total_seconds"] / t["count"] if t["count"] else 0.0}
+            for name, t in self._timings.items()
+        }
+        collected = {}
+        for name, collector in self._collectors.items():
+            value = collector()
+            collected[name] = await value if inspect.isawaitable(value) else value
+        return {
+            "counters": dict(self._counters),
+            "gauges": dict(self._gauges),
+            "timings": timings,
+            **collected
+        }
+
+metrics = Metrics()
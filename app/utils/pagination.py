@@ -0,0 +1,104 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+from bson import Decimal128, ObjectId, json_util
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Sort keys are plain values; anything else in a cursor (sub-documents like
+# {"$ne": null}, arrays) would be spliced into the query as an operator
+CURSOR_VALUE_TYPES = (type(None), bool, int, float, str, datetime, ObjectId, Decimal128)
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+def encode_cursor(values: list) -> str:
+    """Opaque cursor holding the sort-key values of the last item on a page"""
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or not all(isinstance(v, CURSOR_VALUE_TYPES) for v in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_query(query: dict, sort: list, cursor: Optional[str] = None) -> dict:
+    """
+    Add the keyset condition for `cursor` to `query`.
+    `sort` is a list of (field, direction) pairs and must end with a unique
+    field (normally _id) so every item has exactly one position.
+    """
+    if not cursor:
+        return query
+    values = decode_cursor(cursor)
+    if len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # (a > x) OR (a == x AND b > y) OR ... for each prefix of the sort key.
+    # {field: None} matches both null and a missing field.
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {sort[j][0]: values[j] for j in range(i)}
+        condition = _after(field, direction, values[i])
+        if condition is None:
+            continue
+        branch.update(condition)
+        branches.append(branch)
+
+    if not branches:
+        # The cursor sits on the very last possible position
+        branches = [{"_id": {"$exists": False}}]
+    after = {"$or": branches}
+    return {"$and": [query, after]} if query else after
+
+def _after(field: str, direction: int, value) -> Optional[dict]:
+    """
+    Condition for `field` sorting strictly after `value`. Null and missing
+    sort before every other value, so they come last in a descending sort
+    and first in an ascending one; a plain $lt/$gt never matches them.
+    """
+    if direction < 0:
+        if value is None:
+            return None
+        return {"$or": [{field: {"$lt": value}}, {field: None}]}
+    if value is None:
+        return {field: {"$ne": None}}
+    return {field: {"$gt": value}}
+
+def build_page(items: list, sort: list, limit: int) -> dict:
+    """Trim a `limit + 1` fetch to a page and derive next_cursor from its last item"""
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = None
+    if has_more and items:
+        next_cursor = encode_cursor([_get_path(items[-1], field) for field, _ in sort])
+    return {"items": items, "next_cursor": next_cursor}
+
+async def paginate(collection, query: dict, sort: list, limit: int, cursor: Optional[str] = None,
+                   projection: dict = None, collation: dict = None) -> dict:
+    """Run one keyset-paginated find and return {"items", "next_cursor"}"""
+    projection = with_sort_fields(projection, sort)
+    items = await collection.find(
+        keyset_query(query, sort, cursor), projection, collation=collation
+    ).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+    return build_page(items, sort, limit)
+
+def with_sort_fields(projection: Optional[dict], sort: list) -> Optional[dict]:
+    """An inclusion projection must keep the sort keys, or next_cursor can't be built"""
+    if not projection or not all(projection.values()):
+        return projection
+    return {**projection, **{field: 1 for field, _ in sort}}
+
+def _get_path(doc: dict, field: str):
+    value = doc
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
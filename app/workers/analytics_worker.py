@@ -0,0 +1,107 @@
+import asyncio
+import random
+from datetime import datetime
+from pymongo import UpdateOne
+from app.config.settings import settings
+from app.db.mongo import db
+from app.utils.cache import close_caches
+
+# Materializes creator analytics in bulk so the creator GET paths stay read-only.
+# Runs from RQ (materialize_analytics_job on the "analytics" queue, enqueued every
+# ANALYTICS_MATERIALIZE_INTERVAL_SECONDS by schedule_materialize) or by hand:
+#     python -m app.workers.analytics_worker [batch_size]
+
+MATERIALIZE_JOB_ID = "materialize-analytics"
+
+def analytics_update(creator: dict, generate) -> dict:
+    """$set document that makes a creator's analytics ready"""
+    if not creator.get("total_videos"):
+        update = generate()
+    else:
+        # Backfill ad_revenue from existing views
+        total_views = creator.get("total_views", 0)
+        ad_revenue = creator.get("ad_revenue") or round(total_views * random.uniform(0.001, 0.005), 2)
+        if ad_revenue == 0 and total_views > 0:
+            ad_revenue = round(total_views * 0.003, 2)  # Fallback
+        update = {"ad_revenue": ad_revenue, "last_analytics_update": datetime.utcnow().isoformat()}
+    update["analytics_status"] = "ready"
+    return update
+
+async def materialize_creator_analytics(database, batch_size: int = 1000) -> int:
+    """Fill in analytics for every creator not yet marked ready, one bulk_write per batch"""
+    from app.creators.service import CreatorService, creator_cache, creator_cache_keys
+
+    generate = CreatorService().generate_mock_analytics
+
+    async def flush(batch, creator_ids):
+        result = await database.creators.bulk_write(batch, ordered=False)
+        # Cached profiles still say "pending". Only a shared (redis) cache can be
+        # reached from here; in-process caches in API workers age out with their TTL.
+        await creator_cache.delete(*(key for creator_id in creator_ids for key in creator_cache_keys(creator_id)))
+        return result.modified_count
+
+    cursor = database.creators.find(
+        {"analytics_status": {"$ne": "ready"}},
+        {"total_videos": 1, "total_views": 1, "ad_revenue": 1}
+    ).sort("_id", 1).batch_size(batch_size)
+
+    updated = 0
+    batch, creator_ids = [], []
+    async for creator in cursor:
+        # The status guard keeps a concurrent run from overwriting fresh numbers
+        batch.append(UpdateOne(
+            {"_id": creator["_id"], "analytics_status": {"$ne": "ready"}},
+            {"$set": analytics_update(creator, generate)}
+        ))
+        creator_ids.append(creator["_id"])
+        if len(batch) >= batch_size:
+            updated += await flush(batch, creator_ids)
+            batch, creator_ids = [], []
+    if batch:
+        updated += await flush(batch, creator_ids)
+    return updated
+
+async def async_materialize_analytics(batch_size: int = 1000):
+    db.connect()
+    try:
+        updated = await materialize_creator_analytics(db.db, batch_size)
+        print(f"Materialized analytics for {updated} creators")
+    finally:
+        # Cache clients belong to this job's event loop
+        await close_caches()
+        db.close()
+
+def materialize_analytics_job(batch_size: int = 1000):
+    asyncio.run(async_materialize_analytics(batch_size))
+
+def enqueue_materialize(queue) -> bool:
+    """Enqueue materialize_analytics_job unless a run is already queued or running"""
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job
+    from app.social.scheduler import RQ_PENDING
+
+    try:
+        if Job.fetch(MATERIALIZE_JOB_ID, connection=queue.connection).get_status() in RQ_PENDING:
+            return False
+    except NoSuchJobError:
+        pass
+    queue.enqueue(materialize_analytics_job, job_id=MATERIALIZE_JOB_ID,
+                  job_timeout=settings.ANALYTICS_MATERIALIZE_TIMEOUT_SECONDS)
+    return True
+
+async def schedule_materialize(queue=None):
+    """Enqueue the job every ANALYTICS_MATERIALIZE_INTERVAL_SECONDS; run in one API worker"""
+    from redis import Redis
+    from rq import Queue
+
+    queue = queue or Queue("analytics", connection=Redis.from_url(settings.REDIS_URL))
+    while True:
+        try:
+            await asyncio.to_thread(enqueue_materialize, queue)
+        except Exception as e:
+            print(f"Could not enqueue analytics materialization: {e}")
+        await asyncio.sleep(settings.ANALYTICS_MATERIALIZE_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    import sys
+    materialize_analytics_job(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
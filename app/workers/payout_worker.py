@@ -0,0 +1,18 @@
+import asyncio
+from app.db.mongo import db
+
+# RQ runs jobs synchronously, so each job gets its own event loop and DB connection
+
+async def async_process_payout_report(report_id: str):
+    from app.projects.payouts import PayoutEngine
+
+    db.connect()
+    print(f"Processing revenue report {report_id}")
+    try:
+        report = await PayoutEngine().run(report_id)
+        print(f"Revenue report {report_id} completed: {report['payouts_created']} payouts")
+    finally:
+        db.close()
+
+def process_payout_report(report_id: str):
+    asyncio.run(async_process_payout_report(report_id))
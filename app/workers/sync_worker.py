@@ -0,0 +1,25 @@
+import asyncio
+from app.db.mongo import db
+from app.utils.cache import close_caches
+from app.utils.http import http_client
+
+# Jobs enqueued by the sync scheduler in rq mode (queue: sync); one event loop,
+# DB connection, HTTP pool and cache clients per job, like the payout worker
+
+async def async_process_sync_job(account_id: str):
+    from app.social.sync import SyncEngine, SyncInProgress
+
+    db.connect()
+    try:
+        result = await SyncEngine(db.db).sync(account_id)
+        print(f"Synced {account_id}: {result}")
+    except SyncInProgress:
+        print(f"{account_id} is already syncing elsewhere; skipped")
+    finally:
+        # ingest_snapshot drops growth_cache entries; its client belongs to this job's loop
+        await close_caches()
+        await http_client.close()
+        db.close()
+
+def process_sync_job(account_id: str):
+    asyncio.run(async_process_sync_job(account_id))
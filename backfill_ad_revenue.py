@@ -1,53 +1,18 @@
 import asyncio
-import random
 from app.db.mongo import db
-from app.config.settings import settings
+from app.migrations.runner import run_migrations, print_progress
+
+# Kept for muscle memory; the backfill now lives in app/migrations and can also
+# be run with `python -m app.migrations.runner 0001_backfill_ad_revenue`.
 
 async def backfill_ad_revenue():
     print("Connecting to DB...")
     db.connect()
-    database = db.db
-    
-    cursor = database.creators.find({})
-    creators = await cursor.to_list(length=1000)
-    
-    print(f"Found {len(creators)} creators. Starting backfill...")
-    
-    updated_count = 0
-    for c in creators:
-        creator_id = c["_id"]
-        total_views = c.get("total_views", 0)
-        ad_revenue = c.get("ad_revenue")
-        
-        # If ad_revenue is missing or 0, update it
-        if ad_revenue is None or ad_revenue == 0:
-            if total_views == 0:
-                # If views are 0, maybe give them some views so they have revenue?
-                # The user wants believable data. 0 views -> 0 revenue is believable.
-                # But if they have 0 views, maybe we should give them some views to make it look active?
-                # Let's assume if they have 0 views, we leave it, unless it's a mock user.
-                # But for the purpose of "believable data", let's ensure they have some views if they are a creator.
-                total_views = random.randint(1000, 50000)
-                await database.creators.update_one(
-                    {"_id": creator_id},
-                    {"$set": {"total_views": total_views}}
-                )
-                print(f"Updated views for {c.get('display_name')} to {total_views}")
-
-            new_ad_revenue = round(total_views * random.uniform(0.001, 0.005), 2)
-            # Ensure non-zero if views > 0
-            if new_ad_revenue == 0 and total_views > 0:
-                new_ad_revenue = round(total_views * 0.003, 2)
-                
-            await database.creators.update_one(
-                {"_id": creator_id},
-                {"$set": {"ad_revenue": new_ad_revenue}}
-            )
-            print(f"Updated {c.get('display_name')}: Views={total_views}, Revenue={new_ad_revenue}")
-            updated_count += 1
-            
-    print(f"Backfill complete. Updated {updated_count} creators.")
-    db.close()
+    try:
+        [result] = await run_migrations(db.db, ["0001_backfill_ad_revenue"], progress=print_progress)
+    finally:
+        db.close()
+    print(f"Backfill {result.get('status')}. Updated {result.get('modified', 0)} creators.")
 
 if __name__ == "__main__":
     asyncio.run(backfill_ad_revenue())
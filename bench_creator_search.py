@@ -0,0 +1,115 @@
+"""
+Benchmark creator search: in-process trigram index vs the Mongo $regex path.
+
+Generates N synthetic creators, builds the trigram index in memory and times a
+set of substring and misspelt queries. With --mongo the same creators are
+seeded into a separate database (default: tapp_bench) and the old
+case-insensitive $regex query is timed as well.
+
+Usage:
+    python bench_creator_search.py [--creators 1000000] [--mongo] [--reseed]
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("DB_NAME", "tapp_bench")
+
+from app.discover.search_index import TrigramIndex
+
+FIRST = ["Tech", "Travel", "Gaming", "Cooking", "Fitness", "Music", "Daily", "Urban", "Pixel", "Retro",
+         "Happy", "Wild", "Smart", "Crazy", "Chill", "Epic", "Mystic", "Solar", "Nova", "Lucky"]
+SECOND = ["Guru", "Tales", "Zone", "Kitchen", "Lab", "Beats", "Vlogs", "Nomad", "Studio", "Corner",
+          "Hub", "Squad", "World", "Diaries", "Factory", "Journey", "Arena", "Garage", "Planet", "Den"]
+GENRES = ["Tech", "Gaming", "Travel", "Education", "Food", "Music", "Fitness", "Comedy"]
+REGIONS = ["India", "USA", "UK", "Canada", "Australia", "Germany", "France", "Brazil"]
+BIO_WORDS = ["reviews", "gadgets", "backpacking", "japan", "recipes", "workouts", "tutorials", "speedruns",
+             "unboxing", "budget", "street", "food", "coding", "history", "science", "podcast", "weekly"]
+
+QUERIES = ["guru", "kitchen", "tech lab", "backpacking", "speedrun", "nomad 12", "japn", "recipies", "gadgts"]
+
+
+def generate(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "display_name": f"{rng.choice(FIRST)} {rng.choice(SECOND)} {i % 1000}",
+            "bio": " ".join(rng.choices(BIO_WORDS, k=6)),
+            "primary_genre": rng.choice(GENRES),
+            "region": rng.choice(REGIONS),
+        }
+
+
+def summarize(label: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(f"{label:<32} p50={statistics.median(samples):9.3f}ms  p95={p95:9.3f}ms")
+
+
+def bench_index(n: int, repeats: int):
+    index = TrigramIndex()
+    start = time.perf_counter()
+    for doc in generate(n):
+        index.add(doc)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Built trigram index over {len(index)} creators in {time.perf_counter() - start:.1f}s (peak RSS {peak_mb:.0f} MB)")
+
+    for query in QUERIES:
+        samples = []
+        for _ in range(repeats):
+            t = time.perf_counter()
+            hits = index.search(query, limit=20)
+            samples.append((time.perf_counter() - t) * 1000)
+        summarize(f"index  '{query}' ({len(hits)} hits)", samples)
+
+
+def bench_regex(n: int, repeats: int, reseed: bool):
+    from pymongo import MongoClient
+    from app.config.settings import settings
+
+    client = MongoClient(settings.MONGODB_URL)
+    collection = client[settings.DB_NAME].creators
+    if reseed or collection.estimated_document_count() != n:
+        print(f"Seeding {n} creators into {settings.DB_NAME}...")
+        collection.delete_many({})
+        batch = []
+        for doc in generate(n):
+            batch.append(doc)
+            if len(batch) == 10_000:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.insert_many(batch, ordered=False)
+
+    for query in QUERIES:
+        regex = {"$regex": query, "$options": "i"}
+        samples = []
+        for _ in range(repeats):
+            t = time.perf_counter()
+            hits = list(collection.find({"$or": [{"display_name": regex}, {"bio": regex}, {"primary_genre": regex}]}).limit(20))
+            samples.append((time.perf_counter() - t) * 1000)
+        summarize(f"$regex '{query}' ({len(hits)} hits)", samples)
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--creators", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--mongo", action="store_true", help="Also time the $regex path against a local mongod")
+    parser.add_argument("--reseed", action="store_true")
+    args = parser.parse_args()
+
+    bench_index(args.creators, args.repeats)
+    if args.mongo:
+        bench_regex(args.creators, max(1, args.repeats // 4), args.reseed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Throughput benchmark for the revenue payout engine.
+
+Seeds one project with N investments into a separate database (default:
+tapp_bench), runs PayoutEngine for a fresh report and prints payouts/sec for
+a few batch sizes.
+
+Usage:
+    python bench_payouts.py [--investments 200000] [--batch-sizes 500,1000,5000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DB_NAME", "tapp_bench")
+
+from pymongo import MongoClient, ASCENDING
+from app.config.settings import settings
+from app.db.mongo import db
+from app.projects.payouts import PayoutEngine
+
+PROJECT_ID = "bench-payout-project"
+INSERT_BATCH = 10_000
+
+
+def seed(database, n_investments: int):
+    print(f"Seeding {n_investments} investments for {PROJECT_ID} into {settings.DB_NAME}...")
+    database.projects.delete_many({"_id": PROJECT_ID})
+    database.investments.delete_many({"project_id": PROJECT_ID})
+    database.projects.insert_one({
+        "_id": PROJECT_ID, "creator_id": "bench", "title": "Payout benchmark", "description": "",
+        "goal_amount": 1_000_000, "min_investment": 10, "status": "LIVE", "projected_roi": 10,
+        "created_at": datetime.utcnow(), "total_invested": 0, "investor_count": 0
+    })
+    created_at = datetime.utcnow() - timedelta(days=1)
+    remaining = n_investments
+    while remaining > 0:
+        size = min(INSERT_BATCH, remaining)
+        database.investments.insert_many([
+            {
+                "_id": str(uuid.uuid4()),
+                "project_id": PROJECT_ID,
+                "investor_id": str(uuid.uuid4()),
+                "amount": random.randint(10, 500),
+                "status": "SUCCESS",
+                "created_at": created_at,
+            }
+            for _ in range(size)
+        ], ordered=False)
+        remaining -= size
+    database.investments.create_index([("project_id", ASCENDING), ("_id", ASCENDING)])
+    print("Seed complete.")
+
+
+async def run(batch_sizes: list, n_investments: int):
+    db.connect()
+    for batch_size in batch_sizes:
+        engine = PayoutEngine(batch_size=batch_size)
+        report = await engine.create_report(PROJECT_ID, 250_000.0)
+        start = time.perf_counter()
+        report = await engine.run(report["_id"])
+        elapsed = time.perf_counter() - start
+        print(
+            f"batch_size={batch_size:<6} payouts={report['payouts_created']:<8} "
+            f"elapsed={elapsed:7.2f}s  throughput={report['payouts_created'] / elapsed:10.0f} payouts/s"
+        )
+        await db.db.revenue_payouts.delete_many({"report_id": report["_id"]})
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--investments", type=int, default=200_000)
+    parser.add_argument("--batch-sizes", default="500,1000,5000")
+    parser.add_argument("--reseed", action="store_true")
+    args = parser.parse_args()
+
+    client = MongoClient(settings.MONGODB_URL)
+    database = client[settings.DB_NAME]
+    if args.reseed or database.investments.count_documents({"project_id": PROJECT_ID}) != args.investments:
+        seed(database, args.investments)
+    client.close()
+
+    asyncio.run(run([int(b) for b in args.batch_sizes.split(",")], args.investments))
+
+
+if __name__ == "__main__":
+    main()
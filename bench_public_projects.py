@@ -0,0 +1,140 @@
+"""
+Benchmark for GET /projects/public page latency.
+
+Seeds a separate database (default: tapp_bench) with 10k projects and 1M
+investments, then times ProjectService.list_public_projects against the old
+per-project N+1 enrichment.
+
+Usage:
+    python bench_public_projects.py [--projects 10000] [--investments 1000000] [--reseed]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DB_NAME", "tapp_bench")
+
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from app.config.settings import settings
+from app.db.mongo import db
+from app.projects.service import ProjectService
+
+BATCH_SIZE = 10_000
+
+
+def seed(database, n_projects: int, n_investments: int):
+    print(f"Seeding {n_projects} projects / {n_investments} investments into {settings.DB_NAME}...")
+    database.creators.delete_many({})
+    database.projects.delete_many({})
+    database.investments.delete_many({})
+
+    creator_ids = [str(uuid.uuid4()) for _ in range(max(1, n_projects // 10))]
+    database.creators.insert_many([
+        {"_id": cid, "user_id": str(uuid.uuid4()), "display_name": f"Creator {i}", "avatar_url": ""}
+        for i, cid in enumerate(creator_ids)
+    ])
+
+    now = datetime.utcnow()
+    project_ids = [str(uuid.uuid4()) for _ in range(n_projects)]
+    database.projects.insert_many([
+        {
+            "_id": pid,
+            "creator_id": random.choice(creator_ids),
+            "title": f"Project {i}",
+            "description": "Benchmark project",
+            "goal_amount": random.randint(1_000, 100_000),
+            "min_investment": 10,
+            "status": "LIVE",
+            "projected_roi": random.randint(5, 20),
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i, pid in enumerate(project_ids)
+    ])
+
+    # Skewed so a handful of projects carry most of the investments
+    weights = [1 / (rank + 1) for rank in range(n_projects)]
+    remaining = n_investments
+    while remaining > 0:
+        size = min(BATCH_SIZE, remaining)
+        targets = random.choices(project_ids, weights=weights, k=size)
+        database.investments.insert_many([
+            {
+                "_id": str(uuid.uuid4()),
+                "project_id": pid,
+                "investor_id": str(uuid.uuid4()),
+                "amount": random.randint(10, 500),
+                "status": "SUCCESS",
+                "created_at": now,
+            }
+            for pid in targets
+        ], ordered=False)
+        remaining -= size
+
+    database.projects.create_index([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    database.projects.create_index([("status", ASCENDING), ("goal_amount", DESCENDING), ("_id", DESCENDING)])
+    database.investments.create_index([("project_id", ASCENDING)])
+    print("Seed complete.")
+
+
+async def legacy_list_public_projects(skip: int, limit: int):
+    """The previous N+1 implementation, kept here for comparison only."""
+    database = db.db
+    projects = await database.projects.find({"status": "LIVE"}).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
+    for project in projects:
+        creator = await database.creators.find_one({"_id": project["creator_id"]})
+        if creator:
+            project["creator_name"] = creator.get("display_name", "Unknown")
+            project["creator_avatar"] = creator.get("avatar_url", "")
+        investments = await database.investments.find({"project_id": project["_id"]}).to_list(length=1000)
+        project["total_invested"] = sum(inv.get("amount", 0) for inv in investments)
+        project["investor_count"] = len(investments)
+    return projects
+
+
+async def time_calls(label: str, fn, pages: list, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        for skip in pages:
+            start = time.perf_counter()
+            await fn(skip)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms  n={len(samples)}")
+
+
+async def run(repeats: int, limit: int):
+    db.connect()
+    service = ProjectService()
+    pages = [0, limit * 5, limit * 50]
+
+    await time_calls("aggregation (new)", lambda skip: service.list_public_projects(skip, limit, "LIVE", "recent"), pages, repeats)
+    await time_calls("per-project N+1 (old)", lambda skip: legacy_list_public_projects(skip, limit), pages, repeats)
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=10_000)
+    parser.add_argument("--investments", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--reseed", action="store_true")
+    args = parser.parse_args()
+
+    client = MongoClient(settings.MONGODB_URL)
+    database = client[settings.DB_NAME]
+    if args.reseed or database.projects.estimated_document_count() != args.projects:
+        seed(database, args.projects, args.investments)
+    client.close()
+
+    asyncio.run(run(args.repeats, args.limit))
+
+
+if __name__ == "__main__":
+    main()
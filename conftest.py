@@ -0,0 +1,44 @@
+"""
+Tests that need MongoDB run against a local mongod (TEST_MONGODB_URL, default
+mongodb://localhost:27017), each in a throwaway database with the declared
+indexes, and are skipped when none is reachable:
+
+    docker compose up -d mongo && pytest
+"""
+import asyncio
+import os
+import uuid
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+MONGODB_URL = os.environ.get("TEST_MONGODB_URL", "mongodb://localhost:27017")
+
+
+@pytest.fixture(scope="session")
+def mongo_url():
+    try:
+        MongoClient(MONGODB_URL, serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"No MongoDB at {MONGODB_URL}")
+    return MONGODB_URL
+
+
+@pytest.fixture
+def run_with_db(mongo_url):
+    """run_with_db(fn) runs `await fn(database)` on its own event loop and returns the result"""
+    from app.db.indexes import ensure_indexes
+
+    def run(fn):
+        async def main():
+            client = AsyncIOMotorClient(mongo_url)
+            database = client[f"test_{uuid.uuid4().hex[:12]}"]
+            try:
+                await ensure_indexes(database)
+                return await fn(database)
+            finally:
+                await client.drop_database(database.name)
+                client.close()
+        return asyncio.run(main())
+    return run
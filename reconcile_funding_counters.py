@@ -0,0 +1,36 @@
+import argparse
+import asyncio
+from app.db.mongo import db
+from app.investments.service import InvestmentService
+
+async def reconcile(batch_size: int, fix: bool, settle_seconds: int, max_drift: int):
+    print("Connecting to DB...")
+    db.connect()
+
+    report = await InvestmentService().reconcile_funding_counters(
+        batch_size=batch_size, fix=fix, settle_seconds=settle_seconds, max_drift=max_drift
+    )
+
+    for item in report["drift"]:
+        print(
+            f"Drift on {item['project_id']}: "
+            f"total_invested {item['stored_total_invested']} -> {item['actual_total_invested']}, "
+            f"investor_count {item['stored_investor_count']} -> {item['actual_investor_count']}"
+        )
+    if report["drift_truncated"]:
+        print(f"... and {report['projects_drifted'] - len(report['drift'])} more")
+    action = "Fixed" if fix else "Found"
+    print(f"Checked {report['projects_checked']} projects. {action} {report['projects_drifted']} with drift.")
+    if report["projects_settling"]:
+        print(f"Skipped {report['projects_settling']} with investments in the last {settle_seconds}s; run again later.")
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute project funding counters from the investments collection")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without rewriting counters")
+    parser.add_argument("--settle-seconds", type=int, default=60,
+                        help="Skip projects with an investment started this recently")
+    parser.add_argument("--max-drift", type=int, default=100, help="List at most this many drifted projects")
+    args = parser.parse_args()
+    asyncio.run(reconcile(args.batch_size, not args.dry_run, args.settle_seconds, args.max_drift))
@@ -1,235 +1,535 @@
-from pymongo import MongoClient
-from datetime import datetime, timedelta
-import random
+"""
+Seed a local MongoDB with synthetic TAPP data.
+
+Users are generated in chunks. Each chunk gets its own NumPy generator seeded
+from (--seed, chunk number), builds every document for its users with array
+operations (creators, brands, social accounts, snapshots, videos, projects,
+investments, compatibility scores) and inserts them in batches. Chunks run in
+a pool of worker processes, so the output only depends on --seed,
+--chunk-size, --as-of and the distribution options, not on --workers.
+
+Distributions:
+  - subscribers follow a Zipf law (--subscriber-zipf) scaled by --min-subscribers
+  - investments per project follow a Zipf law (--investment-zipf), capped
+  - video, snapshot and revenue numbers are derived from each creator's subscribers
+
+Every user is user<N>@example.com with password "password"; user0-9 always
+include creators, brands and fans.
+
+Usage:
+    python seed.py                                  # 10 demo users
+    python seed.py --users 1000000 --workers 8      # load-test dataset
+"""
+import argparse
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+from pymongo import MongoClient
 
-# ----------------------------
-# MongoDB Setup
-# ----------------------------
-client = MongoClient("mongodb://localhost:27017")
-db = client["tapp_db"]
-
-# Drop existing collections for clean seed
-db.users.delete_many({})
-db.creators.delete_many({})
-db.brands.delete_many({})
-db.social_accounts.delete_many({})
-db.channel_snapshots.delete_many({})
-db.videos.delete_many({})
-db.compatibility.delete_many({})
-db.projects.delete_many({})
-db.investments.delete_many({})
-
-# ----------------------------
-# Helper functions
-# ----------------------------
-def rand_id():
-    return str(uuid.uuid4())
-
-def rand_views():
-    return random.randint(10_000, 2_000_000)
-
-def rand_engagement():
-    return round(random.uniform(0.5, 10.0), 2)
 
-def rand_revenue():
-    return round(random.uniform(50, 5000), 2)
+GENRES = np.array(["Tech", "Gaming", "Travel", "Education", "Music", "Fitness", "Food", "Comedy"])
+REGIONS = np.array(["India", "USA", "UK", "Canada", "Brazil", "Germany"])
+COUNTRIES = np.array(["India", "USA", "UK", "Canada", "Australia", "Germany", "France"])
+CONTENT_TYPES = np.array(["Tutorial", "Vlog", "Review", "Gaming", "Entertainment"])
+TRENDS = np.array(["growing", "growing", "stable", "declining"])
+INDUSTRIES = np.array(["Tech", "Fashion", "Food", "Travel", "Gaming", "Finance"])
+BUDGET_BANDS = np.array(["$1k-$5k", "$5k-$10k", "$10k+"])
+VIDEO_TITLES = np.array([
+    "My Day in Delhi", "Tech Review 2025", "Travel Vlog: Japan",
+    "AI Tools You Should Use", "How to grow fast on YouTube"
+])
+PROJECT_TITLES = np.array([
+    "New Documentary Series", "Studio Upgrade", "Travel Series Season 2",
+    "Indie Game Launch", "Cooking Show Pilot"
+])
+GOAL_AMOUNTS = np.array([1000, 5000, 10000, 25000, 50000])
+MIN_INVESTMENTS = np.array([10, 25, 50])
+
+COLLECTIONS = [
+    "users", "creators", "brands", "social_accounts", "channel_snapshots",
+    "videos", "compatibility", "projects", "investments"
+]
+
+# Roles repeat every ROLE_BLOCK users in a fixed order. Multiplying by the
+# stride spreads them out so any run of consecutive users gets a mix.
+ROLE_BLOCK = 100
+ROLE_STRIDE = 7
+ROLE_STRIDE_INVERSE = 43  # 7 * 43 = 301 = 1 (mod 100)
+ROLES = np.array(["CREATOR", "BRAND", "FAN"])
+CREATOR, BRAND, FAN = 0, 1, 2
+
+DAY = 86_400
 
 
 # ----------------------------
-# 1. Users
+# Helpers
 # ----------------------------
-users = []
-for i in range(10):
-    users.append({
-        "_id": rand_id(),
-        "email": f"user{i}@example.com",
-        "password_hash": "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYqJkqvJL7K",  # "password"
-        "role": random.choice(["CREATOR", "BRAND", "FAN"]),
-        "created_at": datetime.utcnow()
-    })
-
-db.users.insert_many(users)
-print("[+] Inserted Users")
+def role_slots(cfg) -> tuple:
+    """Slot boundaries [creator_end, brand_end) within a ROLE_BLOCK"""
+    creator_end = round(cfg.creator_share * ROLE_BLOCK)
+    brand_end = creator_end + round(cfg.brand_share * ROLE_BLOCK)
+    return creator_end, brand_end
+
+def user_roles(cfg, user_idx: np.ndarray) -> np.ndarray:
+    creator_end, brand_end = role_slots(cfg)
+    slot = (user_idx * ROLE_STRIDE) % ROLE_BLOCK
+    return np.where(slot < creator_end, CREATOR, np.where(slot < brand_end, BRAND, FAN))
+
+def sample_users(rng, cfg, n: int, role: int) -> np.ndarray:
+    """n random user indices (with replacement) that have the given role"""
+    creator_end, brand_end = role_slots(cfg)
+    lo, hi = [(0, creator_end), (creator_end, brand_end), (brand_end, ROLE_BLOCK)][role]
+    if hi <= lo or n == 0:
+        return np.empty(0, dtype=np.int64)
+    blocks = -(-cfg.users // ROLE_BLOCK)
+    picked = np.empty(n, dtype=np.int64)
+    todo = np.arange(n)
+    # The last block may be partial; redraw the few that fall past the end
+    while len(todo):
+        idx = rng.integers(0, blocks, len(todo)) * ROLE_BLOCK + (rng.integers(lo, hi, len(todo)) * ROLE_STRIDE_INVERSE) % ROLE_BLOCK
+        ok = idx < cfg.users
+        picked[todo[ok]] = idx[ok]
+        todo = todo[~ok]
+    return picked
+
+def entity_ids(namespace: uuid.UUID, kind: str, idx) -> list:
+    """Stable ids for entities keyed by user index, so other chunks can reference them"""
+    return [str(uuid.uuid5(namespace, f"{kind}:{i}")) for i in idx.tolist()]
+
+def random_ids(rng, n: int) -> list:
+    raw = rng.bytes(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+def datetimes(as_of: datetime, seconds_ago: np.ndarray) -> list:
+    stamps = np.datetime64(as_of, "s") - seconds_ago.astype("timedelta64[s]")
+    return stamps.astype("datetime64[us]").tolist()
+
+def zipf(rng, a: float, n: int, cap: int) -> np.ndarray:
+    return np.minimum(rng.zipf(a, n), cap)
+
+def pick(rng, values: np.ndarray, n: int) -> list:
+    return values[rng.integers(0, len(values), n)].tolist()
 
 
 # ----------------------------
-# 2. Creator Profiles
+# Generators (one chunk of users)
 # ----------------------------
-creators = []
-for u in users:
-    if u["role"] == "CREATOR":
+def gen_users(rng, cfg, user_idx, roles, user_ids):
+    created_at = datetimes(cfg.as_of, rng.integers(0, 365 * DAY, len(user_idx)))
+    return [
+        {
+            "_id": uid,
+            "email": f"user{i}@example.com",
+            "password_hash": cfg.password_hash,
+            "role": role,
+            "created_at": created,
+        }
+        for uid, i, role, created in zip(user_ids, user_idx.tolist(), ROLES[roles].tolist(), created_at)
+    ]
+
+def creator_numbers(rng, cfg, n: int) -> dict:
+    """Vectorized equivalent of CreatorService.generate_mock_analytics for n creators"""
+    subscribers = np.minimum(
+        zipf(rng, cfg.subscriber_zipf, n, cfg.max_subscribers) * cfg.min_subscribers * rng.uniform(1, 2, n),
+        cfg.max_subscribers
+    ).astype(np.int64)
+    total_videos = rng.integers(10, 501, n)
+    total_views = subscribers * rng.integers(50, 201, n)
+    age_groups = np.stack([
+        rng.integers(5, 21, n), rng.integers(25, 46, n), rng.integers(20, 36, n),
+        rng.integers(10, 21, n), rng.integers(5, 16, n)
+    ], axis=1)
+    # Top 3-5 audience countries: order countries by random keys per row
+    country_order = np.argsort(rng.random((n, len(COUNTRIES))), axis=1)
+    return {
+        "subscribers": subscribers,
+        "total_videos": total_videos,
+        "total_views": total_views,
+        "ad_revenue": np.round(total_views * rng.uniform(0.001, 0.005, n), 2),
+        "avg_views_per_video": np.round(total_views / total_videos, 2),
+        "engagement_rate": np.round(rng.uniform(2.5, 8.5, n), 2),
+        "subscriber_growth_rate": np.round(rng.uniform(-5, 25, n), 2),
+        "posting_frequency": np.round(rng.uniform(0.5, 7, n), 1),
+        "top_performing_genre": rng.integers(0, len(CONTENT_TYPES), n),
+        "performance_trend": rng.integers(0, len(TRENDS), n),
+        "age_groups": age_groups,
+        "male": rng.integers(40, 71, n),
+        "female": rng.integers(30, 61, n),
+        "countries": country_order,
+        "country_count": rng.integers(3, 6, n),
+    }
+
+def gen_creators(rng, cfg, user_idx, user_ids, creator_ids, numbers):
+    n = len(user_idx)
+    genres = pick(rng, GENRES, n)
+    regions = pick(rng, REGIONS, n)
+    updated = cfg.as_of.isoformat()
+    columns = {k: numbers[k].tolist() for k in (
+        "subscribers", "total_videos", "total_views", "ad_revenue", "avg_views_per_video",
+        "engagement_rate", "subscriber_growth_rate", "posting_frequency", "male", "female", "country_count"
+    )}
+    age_groups = numbers["age_groups"].tolist()
+    countries = COUNTRIES[numbers["countries"]].tolist()
+    content_types = CONTENT_TYPES[numbers["top_performing_genre"]].tolist()
+    trends = TRENDS[numbers["performance_trend"]].tolist()
+
+    creators = []
+    for j in range(n):
+        ages = age_groups[j]
         creators.append({
-            "_id": rand_id(),
-            "user_id": u["_id"],
-            "display_name": f"Creator {random.randint(1, 999)}",
-            "bio": "Content creator focusing on tech and lifestyle.",
-            "primary_genre": random.choice(["Tech", "Gaming", "Travel", "Education"]),
-            "region": random.choice(["India", "USA", "UK"]),
+            "_id": creator_ids[j],
+            "user_id": user_ids[j],
+            "display_name": f"Creator {user_idx[j]}",
+            "bio": f"{genres[j]} content creator from {regions[j]}.",
+            "primary_genre": genres[j],
+            "region": regions[j],
             "avatar_url": "https://dummyimage.com/200x200",
+            "subscribers": columns["subscribers"][j],
+            "total_videos": columns["total_videos"][j],
+            "total_views": columns["total_views"][j],
+            "ad_revenue": columns["ad_revenue"][j],
+            "avg_views_per_video": columns["avg_views_per_video"][j],
+            "engagement_rate": columns["engagement_rate"][j],
+            "subscriber_growth_rate": columns["subscriber_growth_rate"][j],
+            "posting_frequency": columns["posting_frequency"][j],
+            "top_performing_genre": content_types[j],
+            "audience_demographics": {
+                "age_groups": {"13-17": ages[0], "18-24": ages[1], "25-34": ages[2], "35-44": ages[3], "45+": ages[4]},
+                "gender": {"male": columns["male"][j], "female": columns["female"][j]},
+                "top_countries": countries[j][:columns["country_count"][j]],
+            },
+            "performance_trend": trends[j],
+            "last_analytics_update": updated,
+            "analytics_status": "ready",
         })
-
-if creators:
-    db.creators.insert_many(creators)
-    print("[+] Inserted Creator Profiles")
-
-
-# ----------------------------
-# 3. Brand Profiles
-# ----------------------------
-brands = []
-for u in users:
-    if u["role"] == "BRAND":
-        brands.append({
-            "_id": rand_id(),
-            "user_id": u["_id"],
-            "brand_name": f"Brand {random.randint(1, 999)}",
-            "industry": random.choice(["Tech", "Fashion", "Food", "Travel"]),
-            "region": random.choice(["India", "USA", "UK"]),
-            "budget_band": random.choice(["$1k-$5k", "$5k-$10k", "$10k+"]),
-        })
-
-if brands:
-    db.brands.insert_many(brands)
-    print("[+] Inserted Brand Profiles")
-
-
-# ----------------------------
-# 4. Social Accounts
-# ----------------------------
-social_accounts = []
-for c in creators:
-    social_accounts.append({
-        "_id": rand_id(),
-        "creator_id": c["_id"],
-        "platform": "YOUTUBE",
-        "external_channel_id": f"YT-{rand_id()}",
-        "access_token": "encrypted_access_token",
-        "refresh_token": "encrypted_refresh_token",
-        "last_synced_at": datetime.utcnow()
-    })
-
-if social_accounts:
-    db.social_accounts.insert_many(social_accounts)
-    print("[+] Inserted Social Accounts")
-
-
-# ----------------------------
-# 5. Channel Snapshots
-# ----------------------------
-channel_snapshots = []
-for acc in social_accounts:
-    channel_snapshots.append({
-        "_id": rand_id(),
-        "social_account_id": acc["_id"],
-        "date": datetime.utcnow(),
-        "subscribers": random.randint(1_000, 500_000),
-        "views": rand_views(),
-        "watch_time": random.randint(10_000, 200_000),
-        "estimated_revenue": rand_revenue(),
-        "engagement_rate": rand_engagement(),
-    })
-
-if channel_snapshots:
-    db.channel_snapshots.insert_many(channel_snapshots)
-    print("[+] Inserted Channel Snapshots")
-
-
-# ----------------------------
-# 6. Videos
-# ----------------------------
-videos = []
-for acc in social_accounts:
-    for _ in range(5):  # 5 videos per creator
-        videos.append({
-            "_id": rand_id(),
-            "social_account_id": acc["_id"],
-            "external_video_id": f"VID-{rand_id()}",
-            "title": random.choice([
-                "My Day in Delhi", "Tech Review 2025", "Travel Vlog: Japan",
-                "AI Tools You Should Use", "How to grow fast on YouTube"
-            ]),
-            "published_at": datetime.utcnow() - timedelta(days=random.randint(1, 200)),
-            "views": rand_views(),
-            "likes": random.randint(100, 50_000),
-            "comments_count": random.randint(10, 5000),
-            "shares": random.randint(10, 2000),
-        })
-
-if videos:
-    db.videos.insert_many(videos)
-    print("[+] Inserted Videos")
-
-
-# ----------------------------
-# 7. Compatibility Scores
-# ----------------------------
-compat_list = []
-for c in creators:
-    for brand in brands:
-        compat_list.append({
-            "_id": rand_id(),
-            "creator_id": c["_id"],
-            "target_id": brand["user_id"],
+    return creators
+
+def gen_social_accounts(rng, cfg, creator_ids, account_ids):
+    synced = datetimes(cfg.as_of, rng.integers(0, DAY, len(account_ids)))
+    return [
+        {
+            "_id": account_id,
+            "creator_id": creator_id,
+            "platform": "YOUTUBE",
+            "external_channel_id": f"YT-{account_id}",
+            "access_token": "encrypted_access_token",
+            "refresh_token": "encrypted_refresh_token",
+            "last_synced_at": last_synced,
+        }
+        for account_id, creator_id, last_synced in zip(account_ids, creator_ids, synced)
+    ]
+
+def gen_snapshots(rng, cfg, account_ids, numbers):
+    """One snapshot per account per day for the last --snapshot-days days"""
+    days = cfg.snapshot_days
+    n = len(account_ids)
+    if days == 0 or n == 0:
+        return []
+    days_ago = np.arange(days)
+    # Walk subscribers back from today's count at each creator's monthly growth rate
+    monthly = 1 + numbers["subscriber_growth_rate"] / 100
+    subscribers = (numbers["subscribers"][:, None] / monthly[:, None] ** (days_ago[None, :] / 30)).astype(np.int64)
+    daily_views = (numbers["total_views"] / 365)[:, None] * rng.lognormal(0, 0.3, (n, days))
+    views = daily_views.astype(np.int64)
+    watch_time = (daily_views * rng.uniform(0.05, 0.2, (n, days))).astype(np.int64)
+    revenue = np.round(daily_views * rng.uniform(0.001, 0.005, (n, days)), 2)
+    engagement = np.round(np.clip(numbers["engagement_rate"][:, None] + rng.normal(0, 0.5, (n, days)), 0.1, None), 2)
+
+    midnight = datetime(cfg.as_of.year, cfg.as_of.month, cfg.as_of.day)
+    dates = [midnight - timedelta(days=d) for d in range(days)]
+    ids = random_ids(rng, n * days)
+    subscribers, views, watch_time, revenue, engagement = (
+        a.ravel().tolist() for a in (subscribers, views, watch_time, revenue, engagement)
+    )
+    return [
+        {
+            "_id": ids[k],
+            "social_account_id": account_ids[k // days],
+            "date": dates[k % days],
+            "subscribers": subscribers[k],
+            "views": views[k],
+            "watch_time": watch_time[k],
+            "estimated_revenue": revenue[k],
+            "engagement_rate": engagement[k],
+        }
+        for k in range(n * days)
+    ]
+
+def gen_videos(rng, cfg, account_ids, numbers):
+    per_account = rng.poisson(cfg.videos_per_creator, len(account_ids))
+    n = int(per_account.sum())
+    owner = np.repeat(np.arange(len(account_ids)), per_account)
+    views = (numbers["avg_views_per_video"][owner] * rng.lognormal(0, 1, n)).astype(np.int64)
+    likes = (views * rng.uniform(0.01, 0.06, n)).astype(np.int64)
+    comments = (views * rng.uniform(0.001, 0.01, n)).astype(np.int64)
+    shares = (views * rng.uniform(0.0005, 0.005, n)).astype(np.int64)
+    # Same as analytics.service.engagement_rates
+    seen = np.maximum(views, 1)
+    like_rate = np.where(views > 0, np.round(likes / seen, 6), 0.0)
+    comment_rate = np.where(views > 0, np.round(comments / seen, 6), 0.0)
+    published = datetimes(cfg.as_of, rng.integers(DAY, 365 * DAY, n))
+    titles = pick(rng, VIDEO_TITLES, n)
+    ids = random_ids(rng, n)
+    owner, views, likes, comments, shares, like_rate, comment_rate = (
+        a.tolist() for a in (owner, views, likes, comments, shares, like_rate, comment_rate)
+    )
+    return [
+        {
+            "_id": ids[k],
+            "social_account_id": account_ids[owner[k]],
+            "external_video_id": f"VID-{ids[k]}",
+            "title": titles[k],
+            "published_at": published[k],
+            "views": views[k],
+            "likes": likes[k],
+            "comments_count": comments[k],
+            "shares": shares[k],
+            "like_rate": like_rate[k],
+            "comment_rate": comment_rate[k],
+        }
+        for k in range(n)
+    ]
+
+def gen_brands(rng, cfg, user_idx, user_ids, brand_ids):
+    n = len(user_idx)
+    industries = pick(rng, INDUSTRIES, n)
+    regions = pick(rng, REGIONS, n)
+    bands = pick(rng, BUDGET_BANDS, n)
+    return [
+        {
+            "_id": brand_ids[j],
+            "user_id": user_ids[j],
+            "brand_name": f"Brand {i}",
+            "industry": industries[j],
+            "region": regions[j],
+            "budget_band": bands[j],
+        }
+        for j, i in enumerate(user_idx.tolist())
+    ]
+
+def gen_compatibility(rng, cfg, namespace, creator_ids):
+    """--compat-per-creator scores against random brands (the old seed did every pair)"""
+    n = len(creator_ids) * cfg.compat_per_creator
+    brand_users = sample_users(rng, cfg, n, BRAND)
+    if len(brand_users) == 0:
+        return []
+    owner = np.repeat(np.arange(len(creator_ids)), cfg.compat_per_creator).tolist()
+    target_ids = entity_ids(namespace, "user", brand_users)
+    scores = np.round(rng.uniform(0.1, 1.0, n), 2).tolist()
+    breakdown = rng.integers(0, 101, (n, 3)).tolist()
+    ids = random_ids(rng, n)
+    return [
+        {
+            "_id": ids[k],
+            "creator_id": creator_ids[owner[k]],
+            "target_id": target_ids[k],
             "target_type": "BRAND",
-            "score": round(random.uniform(0.1, 1.0), 2),
+            "score": scores[k],
             "breakdown": {
-                "genre_match": random.randint(0, 100),
-                "audience_overlap": random.randint(0, 100),
-                "budget_fit": random.randint(0, 100)
+                "genre_match": breakdown[k][0],
+                "audience_overlap": breakdown[k][1],
+                "budget_fit": breakdown[k][2]
             },
-            "calculated_at": datetime.utcnow()
-        })
-
-if compat_list:
-    db.compatibility.insert_many(compat_list)
-    print("[+] Inserted Compatibility Scores")
-
-
-# ----------------------------
-# 8. Crowdfunding Projects
-# ----------------------------
-projects = []
-for c in creators:
-    projects.append({
-        "_id": rand_id(),
-        "creator_id": c["user_id"],
-        "title": "New Documentary Series",
-        "description": "An in-depth exploration of creator life.",
-        "goal_amount": 5000,
-        "min_investment": 10,
-        "status": "LIVE",
-        "projected_roi": random.randint(5, 20),
-        "created_at": datetime.utcnow(),
-    })
-
-if projects:
-    db.projects.insert_many(projects)
-    print("[+] Inserted Projects")
+            "calculated_at": cfg.as_of,
+        }
+        for k in range(n)
+    ]
+
+def gen_projects_and_investments(rng, cfg, namespace, user_idx, creator_ids):
+    """Projects for a share of creators; investments per project are Zipf-distributed"""
+    has_project = rng.random(len(user_idx)) < cfg.project_share
+    owners = np.flatnonzero(has_project)
+    n = len(owners)
+    project_ids = entity_ids(namespace, "project", user_idx[owners])
+    goal = GOAL_AMOUNTS[rng.integers(0, len(GOAL_AMOUNTS), n)]
+    min_investment = MIN_INVESTMENTS[rng.integers(0, len(MIN_INVESTMENTS), n)]
+    status = np.where(rng.random(n) < 0.9, "LIVE", "COMPLETED").tolist()
+    roi = rng.integers(5, 21, n).tolist()
+    project_age = rng.integers(DAY, 180 * DAY, n)
+    created_at = datetimes(cfg.as_of, project_age)
+    titles = pick(rng, PROJECT_TITLES, n)
+
+    counts = zipf(rng, cfg.investment_zipf, n, cfg.max_investments_per_project)
+    investors = sample_users(rng, cfg, int(counts.sum()), FAN)
+    if len(investors) == 0:
+        counts = np.zeros(n, dtype=np.int64)
+    m = int(counts.sum())
+    inv_project = np.repeat(np.arange(n), counts)
+    amounts = np.maximum(
+        np.round(rng.lognormal(np.log(50), 0.8, m)),
+        min_investment[inv_project]
+    ).astype(np.int64)
+    # Investments land between project creation and as_of
+    inv_age = (project_age[inv_project] * rng.random(m)).astype(np.int64)
+    totals = np.bincount(inv_project, weights=amounts, minlength=n)
+
+    goal, min_investment, totals, counts = (a.tolist() for a in (goal, min_investment, totals, counts))
+    projects = [
+        {
+            "_id": project_ids[j],
+            "creator_id": creator_ids[owners[j]],
+            "title": titles[j],
+            "description": "An in-depth exploration of creator life.",
+            "goal_amount": goal[j],
+            "min_investment": min_investment[j],
+            "status": status[j],
+            "projected_roi": roi[j],
+            "created_at": created_at[j],
+            "total_invested": totals[j],
+            "investor_count": counts[j],
+        }
+        for j in range(n)
+    ]
+
+    ids = random_ids(rng, m)
+    investor_ids = entity_ids(namespace, "user", investors)
+    invested_at = datetimes(cfg.as_of, inv_age)
+    inv_project, amounts = inv_project.tolist(), amounts.tolist()
+    investments = [
+        {
+            "_id": ids[k],
+            "project_id": project_ids[inv_project[k]],
+            "investor_id": investor_ids[k],
+            "amount": amounts[k],
+            "status": "SUCCESS",
+            "created_at": invested_at[k],
+        }
+        for k in range(m)
+    ]
+    return projects, investments
+
+def generate_chunk(cfg, chunk: int) -> dict:
+    """Every document owned by users [chunk * chunk_size, (chunk + 1) * chunk_size)"""
+    rng = np.random.default_rng([cfg.seed, chunk])
+    namespace = uuid.uuid5(uuid.NAMESPACE_URL, f"tapp-seed:{cfg.seed}")
+    start = chunk * cfg.chunk_size
+    user_idx = np.arange(start, min(start + cfg.chunk_size, cfg.users))
+    roles = user_roles(cfg, user_idx)
+    user_ids = entity_ids(namespace, "user", user_idx)
+    docs = {"users": gen_users(rng, cfg, user_idx, roles, user_ids)}
+
+    is_creator = roles == CREATOR
+    c_idx = user_idx[is_creator]
+    c_user_ids = [u for u, c in zip(user_ids, is_creator.tolist()) if c]
+    creator_ids = entity_ids(namespace, "creator", c_idx)
+    account_ids = entity_ids(namespace, "account", c_idx)
+    numbers = creator_numbers(rng, cfg, len(c_idx))
+    docs["creators"] = gen_creators(rng, cfg, c_idx, c_user_ids, creator_ids, numbers)
+    docs["social_accounts"] = gen_social_accounts(rng, cfg, creator_ids, account_ids)
+    docs["channel_snapshots"] = gen_snapshots(rng, cfg, account_ids, numbers)
+    docs["videos"] = gen_videos(rng, cfg, account_ids, numbers)
+    docs["compatibility"] = gen_compatibility(rng, cfg, namespace, creator_ids)
+    docs["projects"], docs["investments"] = gen_projects_and_investments(rng, cfg, namespace, c_idx, creator_ids)
+
+    is_brand = roles == BRAND
+    b_idx = user_idx[is_brand]
+    b_user_ids = [u for u, b in zip(user_ids, is_brand.tolist()) if b]
+    docs["brands"] = gen_brands(rng, cfg, b_idx, b_user_ids, entity_ids(namespace, "brand", b_idx))
+    return docs
 
 
 # ----------------------------
-# 9. Investments
+# Insertion
 # ----------------------------
-investments = []
-fans = [u for u in users if u["role"] == "FAN"]
-if fans and projects:
-    for p in projects:
-        for _ in range(random.randint(1, 3)):  # random fans invest
-            fan = random.choice(fans)
-            investments.append({
-                "_id": rand_id(),
-                "project_id": p["_id"],
-                "investor_id": fan["_id"],
-                "amount": random.randint(10, 200),
-                "status": "SUCCESS",
-                "created_at": datetime.utcnow()
-            })
-
-if investments:
-    db.investments.insert_many(investments)
-    print("[+] Inserted Investments")
-
-print("\n-----------------------------")
-print("🎉 Dummy data successfully seeded into MongoDB!")
-print("-----------------------------")
+_client = None
+
+def seed_chunk(cfg, chunk: int) -> dict:
+    """Generate and insert one chunk (runs in a worker process)"""
+    global _client
+    if _client is None:
+        _client = MongoClient(cfg.mongo_url)
+    database = _client[cfg.db]
+
+    counts = {}
+    for name, docs in generate_chunk(cfg, chunk).items():
+        for i in range(0, len(docs), cfg.batch_size):
+            database[name].insert_many(docs[i:i + cfg.batch_size], ordered=False)
+        counts[name] = len(docs)
+    return counts
+
+def main(cfg):
+    client = MongoClient(cfg.mongo_url)
+    database = client[cfg.db]
+    for name in COLLECTIONS:
+        database[name].drop()
+    database.channel_snapshot_rollups.drop()
+    client.close()
+
+    chunks = -(-cfg.users // cfg.chunk_size)
+    print(f"Seeding {cfg.users} users into {cfg.db} ({chunks} chunks, {cfg.workers} workers, seed {cfg.seed})")
+    totals = dict.fromkeys(COLLECTIONS, 0)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=cfg.workers) as pool:
+        for done, counts in enumerate(pool.map(seed_chunk, [cfg] * chunks, range(chunks)), 1):
+            for name, count in counts.items():
+                totals[name] += count
+            elapsed = time.perf_counter() - started
+            print(f"  chunk {done}/{chunks}: {sum(totals.values())} docs in {elapsed:.1f}s "
+                  f"({sum(totals.values()) / elapsed:,.0f} docs/s)")
+
+    for name in COLLECTIONS:
+        print(f"[+] {name}: {totals[name]}")
+
+    import asyncio
+    import os
+    os.environ.setdefault("MONGODB_URL", cfg.mongo_url)
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.analytics.rollups import rebuild_rollups
+    from app.db.indexes import ensure_indexes
+
+    async def finish():
+        motor_client = AsyncIOMotorClient(cfg.mongo_url)
+        try:
+            if not cfg.no_indexes:
+                print("Building indexes...")
+                await ensure_indexes(motor_client[cfg.db])
+            print("Rolling up channel snapshots...")
+            await rebuild_rollups(motor_client[cfg.db])
+        finally:
+            motor_client.close()
+
+    asyncio.run(finish())
+
+    print("\n-----------------------------")
+    print(f"🎉 Dummy data successfully seeded into MongoDB in {time.perf_counter() - started:.1f}s!")
+    print("-----------------------------")
+
+
+def parse_args(argv=None):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(description="Seed MongoDB with synthetic TAPP data")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42, help="Same seed + options = same data")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, default=today,
+                        help="Timestamps are generated relative to this date (default: today)")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="tapp_db")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes generating and inserting chunks")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Users per chunk")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="Documents per insert_many")
+    parser.add_argument("--creator-share", type=float, default=0.2)
+    parser.add_argument("--brand-share", type=float, default=0.05)
+    parser.add_argument("--subscriber-zipf", type=float, default=1.7, help="Zipf exponent for subscribers (> 1)")
+    parser.add_argument("--min-subscribers", type=int, default=1_000)
+    parser.add_argument("--max-subscribers", type=int, default=50_000_000)
+    parser.add_argument("--videos-per-creator", type=float, default=5, help="Mean (Poisson)")
+    parser.add_argument("--snapshot-days", type=int, default=30)
+    parser.add_argument("--compat-per-creator", type=int, default=3)
+    parser.add_argument("--project-share", type=float, default=0.3, help="Share of creators with a project")
+    parser.add_argument("--investment-zipf", type=float, default=1.6, help="Zipf exponent for investments per project (> 1)")
+    parser.add_argument("--max-investments-per-project", type=int, default=10_000)
+    parser.add_argument("--no-indexes", action="store_true", help="Skip building indexes after loading")
+    cfg = parser.parse_args(argv)
+    if cfg.creator_share + cfg.brand_share > 1:
+        parser.error("--creator-share + --brand-share must be <= 1")
+
+    from app.auth.utils import get_password_hash
+    # One bcrypt hash shared by every seeded user
+    cfg.password_hash = get_password_hash("password")
+    return cfg
+
+
+if __name__ == "__main__":
+    main(parse_args())
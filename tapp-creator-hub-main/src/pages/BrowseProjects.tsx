@@ -28,7 +28,7 @@ const BrowseProjects = () => {
                 sort_by: sortBy,
                 limit: 50
             });
-            setProjects(data);
+            setProjects(data.items);
         } catch (err) {
             console.error('Failed to load projects:', err);
         } finally {
@@ -34,7 +34,6 @@ const Community = () => {
   const loadCreators = async () => {
     try {
       const params: any = {
-        skip: 0,
         limit: 20,
       };
       if (genre) params.genre = genre;
@@ -44,7 +43,7 @@ const Community = () => {
 
       console.log('Searching with params:', params);
       const result = await discover(params);
-      setCreators(Array.isArray(result) ? result : result?.data || []);
+      setCreators(Array.isArray(result) ? result : result?.items || []);
     } catch (err) {
       console.error('Failed to load creators:', err);
     }
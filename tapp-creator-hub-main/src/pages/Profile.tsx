@@ -90,7 +90,7 @@ const Profile = () => {
 
       if (!targetCreatorId) return;
 
-      const allProjects = await apiClient.listProjects({});
+      const { items: allProjects } = await apiClient.listProjects({ limit: 100 });
       const creatorProjects = allProjects.filter((p: any) => p.creator_id === targetCreatorId);
 
       const activeProjects = creatorProjects.filter((p: any) =>
@@ -39,15 +39,15 @@ const Projects = () => {
       setUserId(user.id);
 
       // Get all projects
-      const data = await listProjects({});
+      const data = await listProjects({ limit: 100 });
       console.log('All projects loaded:', data);
 
-      // Handle both array and object with data property
+      // Handle both array and a { items, next_cursor } page
       let allProjects = [];
       if (Array.isArray(data)) {
         allProjects = data;
-      } else if (data && typeof data === 'object' && 'data' in data) {
-        allProjects = (data as any).data || [];
+      } else if (data && typeof data === 'object' && 'items' in data) {
+        allProjects = (data as any).items || [];
       }
 
       // Get user's creator profile to filter projects
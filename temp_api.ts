@@ -231,7 +231,7 @@ class APIClient {
     max_subs?: number;
     min_engagement?: number;
     sort_by?: string;
-    skip?: number;
+    cursor?: string;
     limit?: number;
   } = {}) {
     const queryParams = new URLSearchParams();
@@ -245,7 +245,7 @@ class APIClient {
     return this.request(`/discover/creators${qs}`);
   }
 
-  async discoverBrands(params: { skip?: number; limit?: number } = {}) {
+  async discoverBrands(params: { cursor?: string; limit?: number } = {}) {
     const queryParams = new URLSearchParams();
     Object.entries(params).forEach(([key, value]) => {
       if (value !== undefined && value !== null) {
@@ -290,9 +290,14 @@ class APIClient {
     return this.request(`/projects/${projectId}`);
   }
 
-  async listProjects(params: { creator_id?: string; skip?: number; limit?: number } = {}) {
-    // Backend list_projects doesn't take params yet, but let's leave it compatible
-    return this.request(`/projects`);
+  async listProjects(params: { cursor?: string; limit?: number } = {}) {
+    // Returns { items, next_cursor }; pass next_cursor back to get the following page
+    const queryParams = new URLSearchParams();
+    if (params.cursor) queryParams.append('cursor', params.cursor);
+    if (params.limit) queryParams.append('limit', params.limit.toString());
+
+    const qs = queryParams.toString() ? `?${queryParams.toString()}` : '';
+    return this.request(`/projects${qs}`);
   }
 
   async updateProject(projectId: string, data: any) {
@@ -376,7 +381,7 @@ class APIClient {
    */
   async getPublicProjects(params: any = {}) {
     const queryParams = new URLSearchParams();
-    if (params.skip) queryParams.append('skip', params.skip.toString());
+    if (params.cursor) queryParams.append('cursor', params.cursor);
     if (params.limit) queryParams.append('limit', params.limit.toString());
     if (params.status) queryParams.append('status', params.status);
     if (params.sort_by) queryParams.append('sort_by', params.sort_by);
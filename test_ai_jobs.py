@@ -0,0 +1,56 @@
+"""Comment analysis through RQ: POST /ai/comment-analysis -> process_ai_job -> GET /ai/jobs/{id}"""
+import httpx
+import pytest
+from fastapi import FastAPI
+from rq import Queue
+from app.ai_insights import routes
+from app.auth.routes import get_current_user
+from app.config.settings import settings
+from app.db.mongo import db
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def api_app():
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/ai")
+    app.dependency_overrides[get_current_user] = lambda: {"_id": "user-1", "role": "creator"}
+    return app
+
+
+def test_comment_analysis_job_runs_through_the_queue(run_with_db, mongo_url, monkeypatch):
+    monkeypatch.setattr(settings, "GPU_WORKER_URL", "")
+    # is_async=False runs process_ai_job inside enqueue, as an RQ worker would
+    monkeypatch.setattr(routes.service, "_queue", Queue("ai_jobs", connection=fakeredis.FakeStrictRedis(), is_async=False))
+
+    async def scenario(database):
+        # The API reads through the shared db handle; the job connects with settings on its own loop
+        monkeypatch.setattr(settings, "MONGODB_URL", mongo_url)
+        monkeypatch.setattr(settings, "DB_NAME", database.name)
+        monkeypatch.setattr(db, "client", None)
+        monkeypatch.setattr(db, "db", database)
+        await database.videos.insert_many([
+            {"_id": "video-1", "social_account_id": "acc-1", "external_video_id": "yt-1", "title": "First"},
+            {"_id": "video-2", "social_account_id": "acc-1", "external_video_id": "yt-2", "title": "Second"},
+        ])
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api_app()), base_url="http://api") as http:
+            created = await http.post("/ai/comment-analysis", json={
+                "video_ids": ["video-1", "video-2", "missing"], "query": "sentiment"
+            })
+            assert created.status_code == 200
+            job_id = created.json()["_id"]
+
+            db.db = database  # the job's connect() replaced it
+            response = await http.get(f"/ai/jobs/{job_id}")
+
+        assert response.status_code == 200
+        job = response.json()
+        assert job["status"] == "COMPLETED"
+        assert job["stage"] == "completed" and job["progress"] == 100
+        assert job["started_at"] is not None and job["completed_at"] is not None
+        assert job["result"]["videos_analyzed"] == 2
+        assert job["result"]["comments_analyzed"] == 6
+        assert set(job["result"]["sentiment"]) == {"positive", "neutral", "negative"}
+
+    run_with_db(scenario)
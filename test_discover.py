@@ -0,0 +1,42 @@
+"""Creator discovery over the trigram search index (local mongod; see conftest.py)"""
+from app.config.settings import settings
+from app.db.mongo import db
+from app.discover import service as discover_service
+from app.discover.models import CreatorSort
+from app.discover.search_index import TrigramIndex, build_creator_index
+from app.discover.service import DiscoverService
+
+
+def test_sorted_text_search_flags_truncation(run_with_db, monkeypatch):
+    async def scenario(database):
+        monkeypatch.setattr(db, "db", database)
+        await database.creators.insert_many([
+            {"_id": f"c{i}", "user_id": f"u{i}", "display_name": f"Gaming Channel {i}", "bio": "",
+             "primary_genre": "Gaming", "region": "USA", "subscribers": 1000 * i}
+            for i in range(8)
+        ])
+        index = TrigramIndex()
+        await build_creator_index(database, index)
+        monkeypatch.setattr(discover_service, "creator_search_index", index)
+        discover = DiscoverService()
+
+        # Every match fits under the limit: complete and in subscriber order
+        monkeypatch.setattr(settings, "CREATOR_SEARCH_MAX_RESULTS", 10)
+        page = await discover.search_creators(search="gaming", sort_by=CreatorSort.SUBSCRIBERS, limit=20)
+        assert [c["_id"] for c in page["items"]] == [f"c{i}" for i in range(7, -1, -1)]
+        assert page["results_truncated"] is False
+
+        # More matches than the limit: only that many are sorted, and the response says so
+        monkeypatch.setattr(settings, "CREATOR_SEARCH_MAX_RESULTS", 5)
+        page = await discover.search_creators(search="gaming", sort_by=CreatorSort.SUBSCRIBERS, limit=20)
+        assert len(page["items"]) == 5 and page["next_cursor"] is None
+        assert page["results_truncated"] is True
+
+        page = await discover.search_creators(search="gaming", limit=20)
+        assert len(page["items"]) == 5 and page["results_truncated"] is True
+
+        # Without a text search Mongo sorts every match
+        page = await discover.search_creators(sort_by=CreatorSort.SUBSCRIBERS, limit=20)
+        assert len(page["items"]) == 8 and page["results_truncated"] is False
+
+    run_with_db(scenario)
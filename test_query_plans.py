@@ -0,0 +1,88 @@
+"""Every service query must be served by an index (local mongod; see conftest.py)"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.analytics.service import VIDEO_SORTS, AnalyticsService
+from app.creators.service import CreatorService
+from app.db.indexes import ensure_indexes
+from app.db.mongo import db
+from app.db.query_plans import QueryRecorder, check_recorded_queries, check_service_queries
+from app.discover.models import CreatorSort
+from app.discover.service import DiscoverService
+from app.investments.service import InvestmentService
+from app.projects.service import ProjectService
+from app.social.service import SocialService
+
+
+def test_declared_queries_use_indexes(run_with_db):
+    assert run_with_db(check_service_queries) == []
+
+
+async def _seed(database):
+    now = datetime.utcnow()
+    await database.creators.insert_many([
+        {"_id": f"c{i}", "user_id": f"u{i}", "display_name": f"Creator {i}", "primary_genre": "Tech", "region": "USA",
+         "subscribers": 1000 * i, "engagement_rate": i / 10, "subscriber_growth_rate": i / 100, "avg_views_per_video": 100.0 * i}
+        for i in range(3)
+    ])
+    await database.social_accounts.insert_many([{"_id": f"a{i}", "creator_id": "c0"} for i in range(3)])
+    await database.videos.insert_many([
+        {"_id": f"v{i}", "social_account_id": "a0", "external_video_id": f"x{i}", "published_at": now - timedelta(days=i),
+         "views": 10 * i, "like_rate": i / 100, "comment_rate": i / 1000}
+        for i in range(3)
+    ])
+    await database.projects.insert_many([
+        {"_id": f"p{i}", "status": "LIVE", "created_at": now - timedelta(days=i), "goal_amount": 1000.0 * i, "creator_id": "c0"}
+        for i in range(3)
+    ])
+    await database.investments.insert_many([
+        {"_id": f"i{i}", "investor_id": "u0", "project_id": "p0", "amount": 10.0, "created_at": now - timedelta(days=i)}
+        for i in range(3)
+    ])
+
+
+async def _exercise_services():
+    """Call the read paths with small pages, following one next_cursor each to cover the keyset queries"""
+    async def both_pages(call, **kwargs):
+        page = await call(limit=1, **kwargs)
+        if page["next_cursor"]:
+            await call(limit=1, cursor=page["next_cursor"], **kwargs)
+
+    await CreatorService().get_creator_by_user_id("u1")
+    discover = DiscoverService()
+    for sort_by in CreatorSort:
+        await both_pages(discover.search_creators, sort_by=sort_by)
+        await both_pages(discover.search_creators, sort_by=sort_by, genre="tech")
+        await both_pages(discover.search_creators, sort_by=sort_by, region="usa")
+        await both_pages(discover.search_creators, sort_by=sort_by, genre="tech", region="usa")
+    await both_pages(discover.search_brands)
+    for sort_by in ("recent", "goal"):
+        await both_pages(ProjectService().list_public_projects, sort_by=sort_by, projection={"title": 1})
+    await both_pages(ProjectService().get_projects)
+    await both_pages(InvestmentService().get_my_investments, user_id="u0")
+    await both_pages(SocialService().get_accounts, creator_id="c0")
+    for sort_by in VIDEO_SORTS:
+        await both_pages(AnalyticsService().get_creator_videos, creator_id="c0", sort_by=sort_by)
+
+
+def test_recorded_service_queries_use_indexes(mongo_url):
+    async def main():
+        recorder = QueryRecorder()
+        client = AsyncIOMotorClient(mongo_url, event_listeners=[recorder])
+        database = client[f"test_{uuid.uuid4().hex[:12]}"]
+        previous = db.db
+        db.db = database
+        try:
+            await ensure_indexes(database)
+            await _seed(database)
+            recorder.queries.clear()
+            await _exercise_services()
+            assert recorder.queries, "no find commands were recorded"
+            return await check_recorded_queries(database, recorder)
+        finally:
+            db.db = previous
+            await client.drop_database(database.name)
+            client.close()
+
+    assert asyncio.run(main()) == []
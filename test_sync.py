@@ -0,0 +1,108 @@
+"""SyncEngine against the local YouTube stub (app/social/youtube_stub.py) and a local mongod"""
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from app.config.settings import settings
+from app.social.sync import LEASE, LeaseLost, SyncEngine, SyncInProgress
+from app.social.youtube_stub import create_app
+
+ACCOUNT = {"_id": "acc-1", "creator_id": "creator-1", "platform": "YOUTUBE", "external_channel_id": "UCtest"}
+
+
+@pytest.fixture(autouse=True)
+def stub_base_url(monkeypatch):
+    monkeypatch.setattr(settings, "YOUTUBE_API_BASE_URL", "http://youtube.stub")
+
+
+def stub_client(stub):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=stub))
+
+
+def test_incremental_sync(run_with_db):
+    stub = create_app(videos=120)
+
+    async def scenario(database):
+        await database.social_accounts.insert_one(dict(ACCOUNT))
+        async with stub_client(stub) as http:
+            engine = SyncEngine(database, http=http)
+            first = await engine.sync("acc-1")
+            assert first["videos_new"] == 120
+            assert await database.videos.count_documents({"social_account_id": "acc-1"}) == 120
+
+            # Nothing uploaded: the playlist answers 304 and no video is new
+            again = await engine.sync("acc-1")
+            assert again["videos_new"] == 0 and again["pages"] == 0
+
+            await http.post("http://youtube.stub/_stub/channels/UCtest/uploads", params={"count": 7})
+            latest = await engine.sync("acc-1")
+            assert latest["videos_new"] == 7
+        assert await database.videos.count_documents({"social_account_id": "acc-1"}) == 127
+
+        checkpoint = await database.sync_checkpoints.find_one({"_id": "acc-1"})
+        assert checkpoint["locked_until"] is None and checkpoint["page_token"] is None
+        account = await database.social_accounts.find_one({"_id": "acc-1"})
+        assert account["next_sync_at"] > datetime.utcnow()
+
+    run_with_db(scenario)
+
+
+def test_same_day_syncs_update_todays_snapshot(run_with_db, monkeypatch):
+    # No video counts as recent, so a sync with no uploads fetches no video at all
+    monkeypatch.setattr(settings, "SYNC_REFRESH_DAYS", 0)
+    stub = create_app(videos=20)
+
+    async def scenario(database):
+        await database.social_accounts.insert_one(dict(ACCOUNT))
+        async with stub_client(stub) as http:
+            engine = SyncEngine(database, http=http)
+            await engine.sync("acc-1")
+            first = await database.channel_snapshots.find_one({"social_account_id": "acc-1"})
+            assert first["engagement_rate"] > 0
+
+            # A no-op sync (304s, nothing to refresh) keeps today's engagement rate
+            await engine.sync("acc-1")
+            again = await database.channel_snapshots.find_one({"social_account_id": "acc-1"})
+            assert again["engagement_rate"] == first["engagement_rate"]
+
+            await http.post("http://youtube.stub/_stub/channels/UCtest/uploads", params={"count": 3})
+            await engine.sync("acc-1")
+            await http.post("http://youtube.stub/_stub/channels/UCtest/uploads", params={"count": 2})
+            await engine.sync("acc-1")
+            channel = (await http.get("http://youtube.stub/channels", params={"id": "UCtest"})).json()["items"][0]
+
+        snapshots = await database.channel_snapshots.find({"social_account_id": "acc-1"}).to_list(length=None)
+        assert len(snapshots) == 1
+        snapshot = snapshots[0]
+        # Views gained since the first sync today (its count is the baseline), and the latest subscribers
+        checkpoint = await database.sync_checkpoints.find_one({"_id": "acc-1"})
+        assert snapshot["views"] == checkpoint["view_count"] - checkpoint["views_day_start"] > 0
+        assert snapshot["subscribers"] == int(channel["statistics"]["subscriberCount"])
+
+        day = await database.channel_snapshot_rollups.find_one({"social_account_id": "acc-1", "granularity": "day"})
+        assert day["count"] == 1 and day["views"] == snapshot["views"]
+        assert day["subscribers_close"] == snapshot["subscribers"]
+
+    run_with_db(scenario)
+
+
+def test_lease_is_exclusive_and_owned(run_with_db):
+    async def scenario(database):
+        await database.social_accounts.insert_one(dict(ACCOUNT))
+        first, second = SyncEngine(database), SyncEngine(database)
+        stale = await first._claim("acc-1")
+        with pytest.raises(SyncInProgress):
+            await second._claim("acc-1")
+
+        # The first run outlives its lease and another takes over
+        await database.sync_checkpoints.update_one(
+            {"_id": "acc-1"}, {"$set": {"locked_until": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        current = await second._claim("acc-1")
+        with pytest.raises(LeaseLost):
+            await first._release("acc-1", stale["lock_owner"], {"last_error": None})
+
+        checkpoint = await database.sync_checkpoints.find_one({"_id": "acc-1"})
+        assert checkpoint["lock_owner"] == current["lock_owner"]
+        assert checkpoint["locked_until"] > datetime.utcnow() + LEASE / 2
+
+    run_with_db(scenario)